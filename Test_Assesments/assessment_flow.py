@@ -2,10 +2,49 @@
 Assessment Flow Manager - Controls the exercise sequence
 """
 
+import json
+import os
+import tempfile
 import time
-from exercises import Squats, Pushups, Situps, Plank, VerticalJump, OneLegStand
+import zlib
 # Add this import since BaseExercise and FitnessComponent are now in root
 from base_exercise import BaseExercise, FitnessComponent
+from exercises.registry import get_exercise_info
+
+def create_exercise(ex_type, target=None, user_height_cm=170):
+    """Build one exercise by type name, falling back to its default target"""
+    return get_exercise_info(ex_type).create(target, user_height_cm)  # Imports its module on first use
+
+# 2: zlib-compressed JSON (was marshal) with the exercise clock time
+CHECKPOINT_VERSION = 2
+
+DEFAULT_FLOW = ['squats', 'pushups', 'situps', 'plank', 'vertical_jump', 'one_leg_stand']
+
+def normalize_spec(spec, user_height_cm=170):
+    """Validate a flow spec and fill in defaults
+
+    A spec looks like {'user_height_cm': 175, 'exercises': ['plank', {'type': 'squats', 'target': 10}]}.
+    {'flow': 'default'} (or no exercises) selects the default scientific flow.
+    """
+    spec = dict(spec or {})
+    entries = spec.get('exercises') or []
+    flow = spec.get('flow', 'custom' if entries else 'default')
+    if flow == 'default' and not entries:
+        entries = DEFAULT_FLOW
+
+    exercises = []
+    for entry in entries:
+        entry = {'type': entry} if isinstance(entry, str) else dict(entry)
+        get_exercise_info(entry.get('type'))  # Raises ValueError for unknown types
+        if entry.get('target') is not None:
+            entry['target'] = int(entry['target'])
+        exercises.append(entry)
+
+    return {
+        'flow': flow,
+        'user_height_cm': float(spec.get('user_height_cm', user_height_cm)),
+        'exercises': exercises,
+    }
 
 class FitnessAssessment:
     def __init__(self, user_height_cm=170):
@@ -16,53 +55,81 @@ class FitnessAssessment:
         self.assessment_score = 0
         self.custom_flow = False
         self.selected_exercises = []  # Added for tracking selected exercises
+        self.spec = None
+        self.cost = None  # utils.session_cost.SessionCost of the current run, saved with the results
+        self.segments = []  # utils.segmentation.Segment list when the flow was detected automatically
+        self.resume_t = None  # Exercise clock time the checkpoint expected the next frame at
+
+    @classmethod
+    def from_spec(cls, spec):
+        """Build an assessment from a declarative flow spec (no prompts)"""
+        spec = normalize_spec(spec)
+        assessment = cls(user_height_cm=spec['user_height_cm'])
+        assessment.setup_from_spec(spec)
+        return assessment
+
+    def setup_from_spec(self, spec):
+        """Create the exercise list described by a flow spec"""
+        spec = normalize_spec(spec, self.user_height_cm)
+        self.spec = spec
+        self.exercises = [create_exercise(entry['type'], entry.get('target'), self.user_height_cm)
+                          for entry in spec['exercises']]
+        self.selected_exercises = self.exercises.copy()  # Track selected exercises
+        self.custom_flow = spec['flow'] == 'custom'
 
     def setup_default_flow(self):
         """Setup the default scientific flow recommended by fitness coaches"""
-        self.exercises = [
-            Squats("Squats", FitnessComponent.STRENGTH, ideal_reps=15),
-            Pushups("Push-ups", FitnessComponent.STRENGTH, ideal_reps=12),
-            Situps("Sit-ups", FitnessComponent.ENDURANCE, ideal_reps=20),
-            Plank("Plank", FitnessComponent.ENDURANCE, ideal_time=60),
-            VerticalJump("Vertical Jump", FitnessComponent.POWER, user_height_cm=self.user_height_cm),
-            OneLegStand("One-Leg Stand", FitnessComponent.BALANCE, ideal_time=30)
-        ]
-        self.selected_exercises = self.exercises.copy()  # Track selected exercises
-        self.custom_flow = False
+        self.setup_from_spec({'flow': 'default'})
 
     def setup_custom_flow(self, selected_exercise_types):
         """Setup a custom flow based on user selection"""
-        self.exercises = []
-        self.custom_flow = True
-
-        for ex_type in selected_exercise_types:
-            try:
-                if ex_type == 'squats':
-                    reps_input = input("How many squats would you like to do? (Default 15): ") or "15"
-                    reps = int(reps_input) if reps_input.isdigit() else 15
-                    self.exercises.append(Squats("Squats", FitnessComponent.STRENGTH, ideal_reps=reps))
-                elif ex_type == 'pushups':
-                    reps_input = input("How many push-ups would you like to do? (Default 12): ") or "12"
-                    reps = int(reps_input) if reps_input.isdigit() else 12
-                    self.exercises.append(Pushups("Push-ups", FitnessComponent.STRENGTH, ideal_reps=reps))
-                elif ex_type == 'situps':
-                    reps_input = input("How many sit-ups would you like to do? (Default 20): ") or "20"
-                    reps = int(reps_input) if reps_input.isdigit() else 20
-                    self.exercises.append(Situps("Sit-ups", FitnessComponent.ENDURANCE, ideal_reps=reps))
-                elif ex_type == 'plank':
-                    time_input = input("How long would you like to plank (seconds)? (Default 60): ") or "60"
-                    time_sec = int(time_input) if time_input.isdigit() else 60
-                    self.exercises.append(Plank("Plank", FitnessComponent.ENDURANCE, ideal_time=time_sec))
-                elif ex_type == 'vertical_jump':
-                    self.exercises.append(VerticalJump("Vertical Jump", FitnessComponent.POWER, user_height_cm=self.user_height_cm))
-                elif ex_type == 'one_leg_stand':
-                    time_input = input("How long would you like to balance (seconds)? (Default 30): ") or "30"
-                    time_sec = int(time_input) if time_input.isdigit() else 30
-                    self.exercises.append(OneLegStand("One-Leg Stand", FitnessComponent.BALANCE, ideal_time=time_sec))
-            except ValueError:
-                print("Invalid input, using default value.")
-        
-        self.selected_exercises = self.exercises.copy()  # Track selected exercises
+        from cli import prompt_exercise_targets
+        self.setup_from_spec({'flow': 'custom',
+                              'exercises': prompt_exercise_targets(selected_exercise_types)})
+
+    def snapshot(self, clock_t=None):
+        """Checkpoint bytes: flow spec, position in the flow, every exercise's state and the clock time
+
+        The format is zlib-compressed JSON, so a checkpoint can be resumed by
+        another worker or Python version.
+        """
+        if self.spec is None:
+            raise ValueError("Only assessments built from a flow spec can be checkpointed")
+        checkpoint = {'version': CHECKPOINT_VERSION, 'spec': self.spec, 'index': self.current_exercise_idx,
+                      'clock_t': clock_t, 'exercises': [exercise.snapshot_state() for exercise in self.exercises]}
+        return zlib.compress(json.dumps(checkpoint, separators=(',', ':')).encode(), 1)
+
+    @classmethod
+    def from_snapshot(cls, data):
+        """Rebuild an assessment from snapshot() bytes; it continues where it stopped"""
+        try:
+            checkpoint = json.loads(zlib.decompress(data))
+        except (zlib.error, ValueError) as e:
+            raise ValueError(f"Not an assessment checkpoint: {e}") from e
+        if not isinstance(checkpoint, dict) or checkpoint.get('version') != CHECKPOINT_VERSION:
+            version = checkpoint.get('version') if isinstance(checkpoint, dict) else None
+            raise ValueError(f"Unsupported checkpoint version {version}")
+        assessment = cls.from_spec(checkpoint['spec'])
+        for exercise, state in zip(assessment.exercises, checkpoint['exercises']):
+            exercise.restore_state(state)
+        idx = checkpoint['index']
+        assessment.current_exercise_idx = idx
+        assessment.current_exercise = assessment.exercises[idx] if idx >= 0 else None
+        assessment.resume_t = checkpoint['clock_t']
+        return assessment
+
+    def save_checkpoint(self, path, clock_t=None):
+        """Atomically write snapshot() to path"""
+        data = self.snapshot(clock_t)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load_checkpoint(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_snapshot(f.read())
 
     def next_exercise(self):
         """Move to the next exercise in the flow"""
@@ -102,69 +169,45 @@ class FitnessAssessment:
         print(f"OVERALL SCORE: {self.assessment_score:.1f}/100")
         print("="*50)
 
-    def save_results(self):
+    def save_results(self, metrics=None):
         """Save results to CSV with feedback"""
         from utils.results_manager import save_assessment_results
-        success, msg = save_assessment_results(self.exercises)
+        if metrics is not None:
+            success, msg = metrics.timed_save('results', save_assessment_results, self.exercises, cost=self.cost)
+        else:
+            success, msg = save_assessment_results(self.exercises, cost=self.cost)
         print(msg)
 
-    def run_assessment(self, args):
+    def run_assessment(self, args, timer=None, pose_pool=None, profiler=None, metrics=None):
         """Main assessment execution method"""
-        from utils.assessment_runner import run_exercises
-
-        print("FITNESS ASSESSMENT SYSTEM")
-        print("="*40)
-        print("Choose your assessment flow:")
-        print("1. Default scientific flow (recommended by fitness coaches)")
-        print("2. Custom flow (choose your own exercises)")
-
-        choice = input("Enter your choice (1 or 2): ").strip()
-
-        if choice == "2":
-            print("\nAvailable exercises:")
-            print("1. Squats (Strength)")
-            print("2. Push-ups (Strength)")
-            print("3. Sit-ups (Endurance)")
-            print("4. Plank (Endurance)")
-            print("5. Vertical Jump (Power)")
-            print("6. One-Leg Stand (Balance)")
-
-            selected = input("Enter exercise numbers separated by commas (e.g., 1,3,5): ").strip()
-            exercise_nums = []
-            for x in selected.split(","):
-                if x.strip().isdigit():
-                    exercise_nums.append(int(x.strip()))
-
-            selected_types = []
-            for num in exercise_nums:
-                mapping = {1:'squats', 2:'pushups', 3:'situps', 4:'plank', 5:'vertical_jump', 6:'one_leg_stand'}
-                if num in mapping:
-                    selected_types.append(mapping[num])
-
-            if selected_types:
-                self.setup_custom_flow(selected_types)
-            else:
-                print("No valid exercises selected. Using default flow.")
-                self.setup_default_flow()
+        prewarmed = None
+        if not getattr(args, 'no_prewarm', False):
+            # Open the camera and load the pose model while the menu is on screen
+            from utils.prewarm import Prewarmer
+            prewarmed = Prewarmer(args, timer, build_pose=pose_pool is None).start()
+
+        from cli import prompt_flow_spec, print_instructions
+        if self.exercises:
+            # Resumed from a checkpoint; the flow is already chosen
+            print(f"Resuming assessment at {self.current_exercise.name}")
         else:
-            self.setup_default_flow()
-
-        print("\nStarting assessment...")
-        print("Instructions:")
-        print("- Make sure you have enough space around you")
-        print("- Position yourself so your whole body is visible in the camera")
-        print("- Follow the on-screen instructions for each exercise")
-        print("- Press 'n' to move to the next exercise")
-        print("- Press 'q' to quit the assessment")
-        print("- Press 's' to save your results")
+            self.setup_from_spec(prompt_flow_spec(self.user_height_cm))
+
+        print_instructions()
         input("\nPress Enter to begin...")
+        if timer is not None:
+            timer.mark("menu finished")
 
         # Run the exercises
-        run_exercises(self, args)
+        from utils.assessment_runner import run_exercises
+        from utils.session_cost import SessionCost, assessment_type
+        self.cost = SessionCost('live', assessment_type(self.spec))
+        run_exercises(self, args, prewarmed=prewarmed, timer=timer, pose_pool=pose_pool, profiler=profiler,
+                      metrics=metrics)
 
         # Calculate and display results
         self.calculate_overall_score()
         self.display_results()
 
         # Save results automatically
-        self.save_results()
\ No newline at end of file
+        self.save_results(metrics)
\ No newline at end of file
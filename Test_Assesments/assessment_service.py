@@ -0,0 +1,558 @@
+#!/usr/bin/env python3
+"""
+Assessment Service - Local HTTP backend for recorded test uploads (Flutter client)
+
+Standard library only. Uploads are queued as jobs and scored by a worker pool
+that shares warm pose estimators and the pose cache.
+
+    POST /jobs?exercises=squats&target=15&user_height_cm=170
+         body: raw video bytes (or an .npz of landmark arrays with
+         Content-Type: application/x-npz)
+         -> 202 {"job_id": ...}, or 429 when the queue is full
+    GET  /jobs/<job_id>   -> status and, when done, the result rows
+    GET  /health          -> queue depth and worker counters
+
+Resumable uploads are analyzed while they arrive (see utils/streaming_upload):
+
+    POST /uploads?exercises=plank            -> 201 {"upload_id": ...}
+         optional Upload-Length header with the total size in bytes
+    PUT  /uploads/<id>  Upload-Offset: N     body: next chunk -> 204, new Upload-Offset
+         -> 409 with the server's Upload-Offset when N does not match
+    HEAD /uploads/<id>                       -> Upload-Offset to resume from
+    GET  /uploads/<id>                       -> progress, live reps and, when done, results
+    POST /uploads/<id>/complete              -> 202; results follow the last frames
+"""
+import os
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'  # Suppress TensorFlow info and warnings
+
+import argparse
+import json
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+NPZ_CONTENT_TYPE = "application/x-npz"
+
+
+class QueueFull(Exception):
+    """The job queue had no room; body_read says whether the upload was already consumed"""
+
+    def __init__(self, body_read):
+        super().__init__("Job queue is full, retry later")
+        self.body_read = body_read
+
+
+class Job:
+    def __init__(self, spec, upload_path, content_type):
+        self.job_id = uuid.uuid4().hex
+        self.spec = spec
+        self.upload_path = upload_path
+        self.content_type = content_type
+        self.status = "queued"
+        self.error = None
+        self.result = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+
+    def to_dict(self):
+        data = {
+            'job_id': self.job_id,
+            'status': self.status,
+            'created': self.created,
+        }
+        if self.started:
+            data['queue_wait_s'] = round(self.started - self.created, 3)
+        if self.finished:
+            data['processing_s'] = round(self.finished - self.started, 3)
+        if self.error:
+            data['error'] = self.error
+        if self.result is not None:
+            data['result'] = self.result
+        return data
+
+
+def score_landmarks(spec, entry):
+    """Run the spec's exercises over a landmark entry; returns the structured results"""
+    from assessment_flow import FitnessAssessment
+    from utils.video_runner import analyze_landmarks
+    from utils.results_manager import build_result_rows
+
+    assessment = FitnessAssessment.from_spec(spec)
+    for exercise in assessment.exercises:
+        analyze_landmarks(exercise, entry)
+    overall = assessment.calculate_overall_score()
+    return {
+        'overall_score': round(overall, 1),
+        'frames': int(len(entry['timestamps'])),
+        'exercises': build_result_rows(assessment.exercises),
+    }
+
+
+def load_npz_entry(path):
+    """Landmark upload in the PoseCache entry layout"""
+    import numpy as np
+    with np.load(path, allow_pickle=False) as data:
+        entry = {name: data[name] for name in data.files}
+    if 'detected' not in entry:
+        entry['detected'] = np.ones(len(entry['landmarks']), dtype=bool)
+    if 'frame_size' not in entry:
+        entry['frame_size'] = np.array([960, 540], dtype=np.int32)
+    return entry
+
+
+class AssessmentService:
+    """Job queue plus worker pool; the HTTP handler is a thin layer over this"""
+
+    def __init__(self, workers=2, queue_size=16, model_complexity=1, cache_dir=None,
+                 upload_dir=None, max_jobs=1000, save_csv=None, pose_pool=None):
+        self.jobs = OrderedDict()
+        self.uploads = OrderedDict()
+        self.max_jobs = max_jobs
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.workers = workers
+        self.model_complexity = model_complexity
+        self.save_csv = save_csv
+        self.upload_dir = upload_dir or tempfile.mkdtemp(prefix="assessment_uploads_")
+        self._lock = threading.Lock()
+        self._threads = []
+        self._pose_pool = pose_pool
+        self._stream_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stream-worker")
+
+        self.cache = None
+        if cache_dir:
+            from utils.pose_cache import PoseCache
+            self.cache = PoseCache(cache_dir)
+
+        # Counters
+        self.accepted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.busy_workers = 0
+
+    def start(self):
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self):
+        for _ in self._threads:
+            self.queue.put(None)
+        for t in self._threads:
+            t.join()
+        self._stream_executor.shutdown(wait=True)
+        if self._pose_pool is not None:
+            self._pose_pool.close()
+
+    def _pool(self):
+        # Created on the first video job, so landmark-only traffic never loads a model
+        with self._lock:
+            if self._pose_pool is None:
+                from utils.pose_pool import PosePool
+                self._pose_pool = PosePool(size=self.workers, model_complexity=self.model_complexity,
+                                           prewarm=False)
+            return self._pose_pool
+
+    def submit(self, spec, body_stream, length, content_type):
+        """Store the upload and enqueue a job
+
+        Raises QueueFull when there is no room and ValueError when the body
+        ends before length bytes (the client went away mid-upload).
+        """
+        from assessment_flow import normalize_spec
+        spec = normalize_spec(spec)
+
+        if self.queue.full():
+            with self._lock:
+                self.rejected += 1
+            raise QueueFull(body_read=False)
+
+        suffix = ".npz" if content_type == NPZ_CONTENT_TYPE else ".video"
+        fd, path = tempfile.mkstemp(dir=self.upload_dir, suffix=suffix)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                remaining = length
+                while remaining > 0:
+                    chunk = body_stream.read(min(1 << 20, remaining))
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    remaining -= len(chunk)
+        except OSError:  # Socket timeout or reset mid-body
+            os.remove(path)
+            raise
+        if remaining:
+            os.remove(path)
+            raise ValueError(f"Upload ended after {length - remaining} of {length} bytes")
+
+        job = Job(spec, path, content_type)
+        with self._lock:
+            self.jobs[job.job_id] = job
+            self._trim_jobs()
+        try:
+            self.queue.put_nowait(job)
+        except queue.Full:
+            # Lost the race for the last slot while the upload was being written
+            with self._lock:
+                self.jobs.pop(job.job_id, None)
+                self.rejected += 1
+            os.remove(path)
+            raise QueueFull(body_read=True)
+        with self._lock:
+            self.accepted += 1
+        return job
+
+    def _trim_jobs(self):
+        # Caller holds self._lock; forget the oldest finished jobs
+        while len(self.jobs) > self.max_jobs:
+            for job_id, job in self.jobs.items():
+                if job.status in ("done", "failed"):
+                    del self.jobs[job_id]
+                    break
+            else:
+                return
+
+    def get(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def create_upload(self, spec, total_length=None):
+        """Open a resumable upload whose frames are scored as chunks arrive"""
+        from assessment_flow import normalize_spec
+        from utils.streaming_upload import StreamingUpload
+        spec = normalize_spec(spec)
+
+        upload_id = uuid.uuid4().hex
+        path = os.path.join(self.upload_dir, f"{upload_id}.part")
+        upload = StreamingUpload(upload_id, spec, path, total_length)
+        with self._lock:
+            self.uploads[upload_id] = upload
+            self._trim_uploads()
+        return upload
+
+    def _trim_uploads(self):
+        # Caller holds self._lock; forget the oldest finished uploads
+        while len(self.uploads) > self.max_jobs:
+            for upload_id, upload in self.uploads.items():
+                if upload.status in ("done", "failed"):
+                    del self.uploads[upload_id]
+                    break
+            else:
+                return
+
+    def get_upload(self, upload_id):
+        with self._lock:
+            return self.uploads.get(upload_id)
+
+    def append_upload(self, upload, offset, body_stream, length):
+        """Append a chunk and queue analysis of the newly decodable frames"""
+        new_offset = upload.append(offset, body_stream, length)
+        upload.schedule(self._stream_executor, lambda: self._pool().checkout())
+        return new_offset
+
+    def complete_upload(self, upload):
+        upload.mark_complete()
+        upload.schedule(self._stream_executor, lambda: self._pool().checkout())
+
+    def process(self, job):
+        """Extract (or load) landmarks and score them"""
+        if job.content_type == NPZ_CONTENT_TYPE:
+            entry = load_npz_entry(job.upload_path)
+        else:
+            from utils.video_runner import extract_landmarks
+            entry = extract_landmarks(job.upload_path, self.model_complexity,
+                                      cache=self.cache, pose_pool=self._pool())
+        return score_landmarks(job.spec, entry)
+
+    def _worker_loop(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                break
+            with self._lock:
+                self.busy_workers += 1
+            job.status = "running"
+            job.started = time.time()
+            try:
+                job.result = self.process(job)
+                job.status = "done"
+                if self.save_csv:
+                    self._append_csv(job.result['exercises'])
+                with self._lock:
+                    self.completed += 1
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+                with self._lock:
+                    self.failed += 1
+            finally:
+                job.finished = time.time()
+                with self._lock:
+                    self.busy_workers -= 1
+                if os.path.exists(job.upload_path):
+                    os.remove(job.upload_path)
+
+    def _append_csv(self, rows):
+        import csv
+        from utils.results_manager import RESULT_FIELDS
+        with self._lock:
+            file_exists = os.path.isfile(self.save_csv)
+            with open(self.save_csv, "a", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+                if not file_exists:
+                    writer.writeheader()
+                writer.writerows(rows)
+
+    def health(self):
+        with self._lock:
+            data = {
+                'queue_depth': self.queue.qsize(),
+                'queue_capacity': self.queue.maxsize,
+                'workers': self.workers,
+                'busy_workers': self.busy_workers,
+                'accepted': self.accepted,
+                'rejected': self.rejected,
+                'completed': self.completed,
+                'failed': self.failed,
+            }
+        if self.cache is not None:
+            data['pose_cache'] = self.cache.stats()
+        with self._lock:
+            data['active_uploads'] = sum(1 for u in self.uploads.values()
+                                         if u.status in ("uploading", "finalizing"))
+        if self._pose_pool is not None:
+            data['pose_pool'] = self._pose_pool.metrics()
+        return data
+
+
+def spec_from_query(params, user_height_cm=170):
+    """Build a flow spec from ?exercises=squats,plank&target=15&user_height_cm=175"""
+    names = []
+    for value in params.get('exercises', []) + params.get('exercise', []):
+        names.extend(n.strip() for n in value.split(",") if n.strip())
+    targets = params.get('target', [])
+    exercises = []
+    for i, name in enumerate(names):
+        entry = {'type': name}
+        if i < len(targets) and targets[i].isdigit():
+            entry['target'] = int(targets[i])
+        exercises.append(entry)
+    return {
+        'user_height_cm': float(params.get('user_height_cm', [user_height_cm])[0]),
+        'exercises': exercises,
+    }
+
+
+class AssessmentRequestHandler(BaseHTTPRequestHandler):
+    service = None  # Set by make_server
+    max_upload_bytes = 512 * 1024 * 1024
+    timeout = 60  # Socket timeout, so a client that stalls mid-body cannot hold a thread forever
+
+    def log_message(self, format, *args):
+        pass  # Keep the console quiet under load
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_length(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > self.max_upload_bytes:
+            self._send_json(413, {'error': "Upload too large"})
+            return None
+        return length
+
+    def _upload_from_path(self, path):
+        upload = self.service.get_upload(path[len("/uploads/"):].split("/")[0])
+        if upload is None:
+            self._send_json(404, {'error': "Unknown upload"})
+        return upload
+
+    def do_HEAD(self):
+        path = urlparse(self.path).path.rstrip("/")
+        upload = self.service.get_upload(path[len("/uploads/"):]) if path.startswith("/uploads/") else None
+        self.send_response(200 if upload is not None else 404)
+        if upload is not None:
+            self.send_header("Upload-Offset", str(upload.offset))
+            if upload.total_length is not None:
+                self.send_header("Upload-Length", str(upload.total_length))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+
+    def do_PUT(self):
+        path = urlparse(self.path).path.rstrip("/")
+        if not path.startswith("/uploads/"):
+            self._send_json(404, {'error': "Not found"})
+            return
+        upload = self._upload_from_path(path)
+        if upload is None:
+            return
+        length = self._read_length()
+        if length is None:
+            return
+        offset = self.headers.get("Upload-Offset")
+        if offset is None or not offset.isdigit():
+            self._send_json(400, {'error': "Upload-Offset header required"})
+            return
+
+        from utils.streaming_upload import OffsetMismatch
+        try:
+            new_offset = self.service.append_upload(upload, int(offset), self.rfile, length)
+        except OffsetMismatch as e:
+            self.close_connection = True  # The unread chunk is still on the socket
+            self._send_json(409, {'error': str(e), 'offset': e.expected},
+                            {"Upload-Offset": str(e.expected)})
+            return
+        except ValueError as e:
+            self.close_connection = True
+            self._send_json(400, {'error': str(e)})
+            return
+        except OSError as e:
+            # Timeout or reset mid-chunk: the bytes that arrived are kept, resume from there
+            self.close_connection = True
+            try:
+                self._send_json(400, {'error': f"Upload interrupted: {e}", 'offset': upload.offset},
+                                {"Upload-Offset": str(upload.offset)})
+            except OSError:
+                pass  # The client is gone; HEAD/GET reports the offset
+            return
+        self.send_response(204)
+        self.send_header("Upload-Offset", str(new_offset))
+        self.end_headers()
+
+    def do_GET(self):
+        path = urlparse(self.path).path.rstrip("/")
+        if path == "/health":
+            self._send_json(200, self.service.health())
+        elif path.startswith("/uploads/"):
+            upload = self._upload_from_path(path)
+            if upload is not None:
+                self._send_json(200, upload.to_dict(), {"Upload-Offset": str(upload.offset)})
+        elif path.startswith("/jobs/"):
+            job = self.service.get(path[len("/jobs/"):])
+            if job is None:
+                self._send_json(404, {'error': "Unknown job"})
+            else:
+                self._send_json(200, job.to_dict())
+        else:
+            self._send_json(404, {'error': "Not found"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        path = url.path.rstrip("/")
+        if path == "/uploads":
+            self._create_upload(url)
+            return
+        if path.startswith("/uploads/") and path.endswith("/complete"):
+            self._complete_upload(path)
+            return
+        if path != "/jobs":
+            self._send_json(404, {'error': "Not found"})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0:
+            self._send_json(400, {'error': "Empty upload"})
+            return
+        if length > self.max_upload_bytes:
+            self._send_json(413, {'error': "Upload too large"})
+            return
+
+        try:
+            spec = spec_from_query(parse_qs(url.query))
+            content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip()
+            job = self.service.submit(spec, self.rfile, length, content_type)
+        except QueueFull as e:
+            if not e.body_read:
+                # Drain the body so the client sees the 429 instead of a reset
+                remaining = length
+                while remaining > 0:
+                    chunk = self.rfile.read(min(1 << 20, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+            self._send_json(429, {'error': str(e)}, {"Retry-After": "2"})
+            return
+        except ValueError as e:
+            self.close_connection = True  # The body may be partly unread
+            self._send_json(400, {'error': str(e)})
+            return
+        self._send_json(202, {'job_id': job.job_id, 'status': job.status},
+                        {"Location": f"/jobs/{job.job_id}"})
+
+
+    def _create_upload(self, url):
+        total = self.headers.get("Upload-Length")
+        if total is not None and (not total.isdigit() or int(total) > self.max_upload_bytes):
+            self._send_json(413 if total.isdigit() else 400, {'error': "Invalid Upload-Length"})
+            return
+        try:
+            upload = self.service.create_upload(spec_from_query(parse_qs(url.query)),
+                                                int(total) if total is not None else None)
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        self._send_json(201, upload.to_dict(), {"Location": f"/uploads/{upload.upload_id}",
+                                                "Upload-Offset": "0"})
+
+    def _complete_upload(self, path):
+        upload = self._upload_from_path(path)
+        if upload is None:
+            return
+        from utils.streaming_upload import OffsetMismatch
+        try:
+            self.service.complete_upload(upload)
+        except OffsetMismatch as e:
+            self._send_json(409, {'error': str(e), 'offset': e.expected},
+                            {"Upload-Offset": str(e.expected)})
+            return
+        self._send_json(202, upload.to_dict(), {"Location": f"/uploads/{upload.upload_id}"})
+
+
+def make_server(service, host="127.0.0.1", port=8080):
+    handler = type("BoundHandler", (AssessmentRequestHandler,), {'service': service})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local assessment HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=2, help="Concurrent scoring jobs")
+    parser.add_argument("--queue-size", type=int, default=16, help="Queued jobs before returning 429")
+    parser.add_argument("--model-complexity", type=int, default=1, choices=[0, 1, 2])
+    parser.add_argument("--cache-dir", help="Pose inference cache directory")
+    parser.add_argument("--save-csv", help="Also append results to this CSV file")
+    args = parser.parse_args()
+
+    service = AssessmentService(workers=args.workers, queue_size=args.queue_size,
+                                model_complexity=args.model_complexity,
+                                cache_dir=args.cache_dir, save_csv=args.save_csv)
+    service.start()
+    server = make_server(service, args.host, args.port)
+    print(f"Assessment service listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+
+
+if __name__ == "__main__":
+    main()
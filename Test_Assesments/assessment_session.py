@@ -0,0 +1,194 @@
+"""
+Assessment Session - Re-entrant, non-interactive assessment API
+
+A session is built from a declarative flow spec and driven by pushing landmark
+frames. It never prompts, prints or touches a camera or window, so any number
+of isolated sessions can live in one event loop or thread pool. The console
+app (assessment_runner) is a thin client of this API.
+"""
+
+import numpy as np
+
+from assessment_flow import FitnessAssessment
+from base_exercise import FrameClock
+from utils.events import EventType
+from utils.pose_utils import landmarks_from_array, landmarks_to_array
+
+
+class AssessmentSession:
+    """One athlete's assessment: exercise flow, exercise state and frame clock"""
+
+    def __init__(self, spec=None, assessment=None, events=None, checkpoint_path=None,
+                 checkpoint_interval=5.0, smoother=None, metrics=None):
+        if assessment is None:
+            assessment = FitnessAssessment.from_spec(spec)
+        self.assessment = assessment
+        self.clock = FrameClock()
+        # Frame timestamps are shifted by clock_offset. A resumed assessment sets it
+        # on its first frame so that exercise time carries on from the checkpoint
+        # instead of counting the downtime (a plank would otherwise be held through it).
+        self.clock_offset = 0.0
+        self._resume_t = assessment.resume_t
+        self._frame_interval = 0.0
+        for exercise in assessment.exercises:
+            exercise.clock = self.clock
+            exercise.events = events
+
+        # Optional timestamp-driven landmark filter (utils.smoothing.LandmarkSmoother)
+        self.smoother = smoother
+        self.frames = 0
+        self.frames_without_pose = 0
+        self.finished = False
+        self.last_landmarks = None
+        # Checkpoints cost well under 1 ms, so every few seconds is negligible
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self._last_checkpoint = None
+        # Optional utils.metrics.RunnerMetrics; checkpoint writes are timed
+        self.metrics = metrics
+        if assessment.current_exercise is None:
+            assessment.next_exercise()
+        # A resumed assessment reports only reps made after the resume as new
+        ex = assessment.current_exercise
+        self._last_reps = ex.reps if ex is not None else 0
+        self._last_errors = ex.form_errors if ex is not None else 0
+
+    @classmethod
+    def resume(cls, checkpoint_path, events=None, checkpoint_interval=5.0, smoother=None):
+        """Continue a session from the checkpoint file it was writing"""
+        assessment = FitnessAssessment.load_checkpoint(checkpoint_path)
+        return cls(assessment=assessment, events=events, checkpoint_path=checkpoint_path,
+                   checkpoint_interval=checkpoint_interval, smoother=smoother)
+
+    @property
+    def current_exercise(self):
+        return self.assessment.current_exercise
+
+    def state(self):
+        """Current exercise state; new_* counts are relative to the previous call"""
+        ex = self.assessment.current_exercise
+        if ex is None:
+            return {'exercise': None, 'finished': True}
+        new_reps = ex.reps - self._last_reps
+        new_errors = ex.form_errors - self._last_errors
+        self._last_reps = ex.reps
+        self._last_errors = ex.form_errors
+        return {
+            'exercise': ex.name,
+            'exercise_index': self.assessment.current_exercise_idx,
+            'reps': ex.reps,
+            'form_errors': ex.form_errors,
+            'duration': round(ex.duration, 2),
+            'new_reps': new_reps,
+            'new_form_errors': new_errors,
+            'finished': self.finished,
+        }
+
+    def push_frame(self, landmarks, timestamp, frame_width=960, frame_height=540, all_exercises=False,
+                   targets=None):
+        """Advance the current exercise by one frame and return its incremental state
+
+        landmarks is a (33, 4) array of x, y, z, visibility, a list of MediaPipe
+        style landmarks, or None when no pose was detected in the frame.
+        all_exercises feeds the frame to every exercise in the flow, as run_video
+        does for recorded clips that have no exercise boundaries; targets feeds
+        it to the given exercises instead (utils.fan_out). timestamp is in the
+        caller's time; exercises see it plus clock_offset. The (smoothed)
+        landmarks are kept in last_landmarks: the list the exercises saw, or
+        the array when targets was empty and nothing needed converting.
+        """
+        if self.finished:
+            raise RuntimeError("Session already finished")
+        self.frames += 1
+        if self._resume_t is not None:
+            self.clock_offset = self._resume_t - timestamp
+            self._resume_t = None
+        timestamp += self.clock_offset
+        if self.frames > 1:
+            self._frame_interval = timestamp - self.clock.t
+        self.clock.t = timestamp
+
+        ex = self.assessment.current_exercise
+        self.last_landmarks = None
+        if landmarks is None:
+            self.frames_without_pose += 1
+        elif ex is not None:
+            if self.smoother is not None:
+                if not isinstance(landmarks, np.ndarray):
+                    landmarks = landmarks_to_array(landmarks)
+                landmarks = self.smoother(landmarks, timestamp)
+            if targets is None:
+                targets = self.assessment.exercises if all_exercises else [ex]
+            if targets and isinstance(landmarks, np.ndarray):
+                landmarks = landmarks_from_array(landmarks)
+            self.last_landmarks = landmarks
+            for target in targets:
+                target.update(landmarks, frame_width, frame_height)
+
+        if self.checkpoint_path is not None:
+            if self._last_checkpoint is None:
+                self._last_checkpoint = timestamp
+            elif timestamp - self._last_checkpoint >= self.checkpoint_interval:
+                self.checkpoint()
+        return self.state()
+
+    def checkpoint(self):
+        """Write the assessment checkpoint now"""
+        # The time the next frame is due: a resumed session's first frame lands there
+        next_t = self.clock.t + max(self._frame_interval, 0.0)
+        if self.metrics is not None:
+            self.metrics.timed_save('checkpoint', self.assessment.save_checkpoint, self.checkpoint_path, next_t)
+        else:
+            self.assessment.save_checkpoint(self.checkpoint_path, next_t)
+        self._last_checkpoint = self.clock.t
+
+    def _complete_current(self):
+        ex = self.assessment.current_exercise
+        # calculate_score() also sets ex.score, so only run it for a listener
+        if ex is not None and ex.events is not None and not self.finished:
+            ex.emit(EventType.EXERCISE_COMPLETED, reps=ex.reps, duration=ex.duration,
+                    form_errors=ex.form_errors, score=ex.calculate_score())
+
+    def next_exercise(self):
+        """Move to the next exercise; returns False when the flow is complete"""
+        self._complete_current()
+        self._last_reps = 0
+        self._last_errors = 0
+        if self.assessment.next_exercise():
+            if self.checkpoint_path is not None:
+                self.checkpoint()
+            return True
+        self.finished = True
+        return False
+
+    def select_exercise(self, index):
+        """Make the flow's index-th exercise current (out of order, e.g. by segmentation)
+
+        Unlike next_exercise() the one left is not completed, since a
+        continuous recording may come back to it.
+        """
+        assessment = self.assessment
+        assessment.current_exercise_idx = index
+        assessment.current_exercise = ex = assessment.exercises[index]
+        self._last_reps = ex.reps
+        self._last_errors = ex.form_errors
+        if self.checkpoint_path is not None:
+            self.checkpoint()
+
+    def results(self):
+        """Final scores and the same per-exercise rows save_assessment_results writes"""
+        from utils.results_manager import build_result_rows
+        overall = self.assessment.calculate_overall_score()
+        rows = build_result_rows(self.assessment.exercises)
+        return {
+            'overall_score': round(overall, 1),
+            'frames': self.frames,
+            'frames_without_pose': self.frames_without_pose,
+            'exercises': rows,
+        }
+
+    def finish(self):
+        """Close the session and return its results"""
+        self._complete_current()
+        self.finished = True
+        return self.results()
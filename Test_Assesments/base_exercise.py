@@ -3,7 +3,15 @@ Base Exercise Class - Defines the interface for all exercises
 """
 
 from enum import Enum
+from collections import deque
+import base64
+import json
 import time
+import zlib
+
+from utils.analysis_scheduler import AnalysisScheduler
+from utils.rep_history import RepHistory
+from utils.rolling_stats import RollingStats
 
 class FitnessComponent(Enum):
     STRENGTH = 1
@@ -11,6 +19,80 @@ class FitnessComponent(Enum):
     POWER = 3
     BALANCE = 4
 
+class FrameClock:
+    """Clock that reports the timestamp of the frame being analyzed"""
+
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+# Bump when exercise state changes meaning (3: per-rep lists became RepHistory,
+# 4: JSON instead of marshal, so snapshots move between Python versions)
+SNAPSHOT_VERSION = 4
+# Runtime wiring rather than exercise state; the restoring runner supplies its own
+SNAPSHOT_EXCLUDE = frozenset(('clock', 'events'))
+
+def _encode_state(value):
+    """Reduce a state value to JSON types; objects with a '$' key are type tags"""
+    if type(value).__module__ == 'numpy':
+        # Checked before the builtins: np.float64 subclasses float. NumPy itself is
+        # not imported here so that importing this module stays cheap.
+        if value.ndim == 0:
+            return value.item()
+        return {'$': 'ndarray', 'dtype': value.dtype.str, 'shape': list(value.shape),
+                'data': base64.b64encode(value.tobytes()).decode('ascii')}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, bytes):
+        return {'$': 'bytes', 'data': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, dict):  # Keys may be any encodable value, not just strings
+        return {'$': 'dict', 'items': [[_encode_state(k), _encode_state(v)] for k, v in value.items()]}
+    if isinstance(value, list):
+        return [_encode_state(v) for v in value]
+    if isinstance(value, deque):
+        return {'$': 'deque', 'items': [_encode_state(v) for v in value], 'maxlen': value.maxlen}
+    if isinstance(value, tuple):
+        return {'$': 'tuple', 'items': [_encode_state(v) for v in value]}
+    if isinstance(value, Enum):
+        return {'$': 'enum', 'type': type(value).__name__, 'name': value.name}
+    if type(value).__name__ in _SNAPSHOT_TYPES:
+        return {'$': 'object', 'type': type(value).__name__, 'state': _encode_state(value.__getstate__())}
+    raise TypeError(f"Cannot snapshot value of type {type(value).__name__}")
+
+def _decode_state(value):
+    if isinstance(value, list):
+        return [_decode_state(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    tag = value['$']
+    if tag == 'dict':
+        return {_decode_state(k): _decode_state(v) for k, v in value['items']}
+    if tag == 'deque':
+        return deque((_decode_state(v) for v in value['items']), maxlen=value['maxlen'])
+    if tag == 'tuple':
+        return tuple(_decode_state(v) for v in value['items'])
+    if tag == 'bytes':
+        return base64.b64decode(value['data'])
+    if tag == 'ndarray':
+        import numpy as np
+        data = base64.b64decode(value['data'])
+        return np.frombuffer(data, dtype=value['dtype']).reshape(value['shape']).copy()
+    if tag == 'enum':
+        return _SNAPSHOT_ENUMS[value['type']][value['name']]
+    if tag == 'object':
+        cls = _SNAPSHOT_TYPES[value['type']]
+        obj = cls.__new__(cls)
+        obj.__setstate__(_decode_state(value['state']))
+        return obj
+    raise ValueError(f"Unknown snapshot tag: {tag}")
+
+_SNAPSHOT_ENUMS = {'FitnessComponent': FitnessComponent}
+# Helper classes stored on exercises; they implement __getstate__/__setstate__
+_SNAPSHOT_TYPES = {'RollingStats': RollingStats, 'AnalysisScheduler': AnalysisScheduler,
+                   'RepHistory': RepHistory}
+
 class BaseExercise:
     def __init__(self, name, component, ideal_reps=None, ideal_time=None):
         self.name = name
@@ -22,6 +104,9 @@ class BaseExercise:
         self.score = 0.0
         self.form_errors = 0
         self.start_time = None
+        self.clock = time.time  # Runners may swap in a frame-timestamp clock
+        self.events = None  # Optional utils.events.EventBus
+        self.analyses = None  # Optional utils.analysis_scheduler.AnalysisScheduler
         
     def update(self, landmarks, frame_width, frame_height):
         """Update exercise state based on pose landmarks"""
@@ -30,6 +115,37 @@ class BaseExercise:
     def draw_feedback(self, frame, landmarks, frame_width, frame_height):
         """Draw real-time feedback on the frame"""
         raise NotImplementedError("Subclasses must implement draw_feedback()")
+
+    def snapshot_state(self):
+        """JSON-serializable state of the exercise (not the clock or event bus)"""
+        return {'version': SNAPSHOT_VERSION, 'class': type(self).__name__,
+                'state': {k: _encode_state(v) for k, v in self.__dict__.items() if k not in SNAPSHOT_EXCLUDE}}
+
+    def restore_state(self, snapshot):
+        """Load snapshot_state() taken from an exercise of the same class"""
+        version, cls_name = snapshot.get('version'), snapshot.get('class')
+        if version != SNAPSHOT_VERSION or cls_name != type(self).__name__:
+            raise ValueError(f"Snapshot of {cls_name} v{version} cannot restore {type(self).__name__}")
+        for key, value in snapshot['state'].items():
+            setattr(self, key, _decode_state(value))
+        return self
+
+    def snapshot(self):
+        """Compact binary snapshot: snapshot_state() as zlib-compressed JSON"""
+        return zlib.compress(json.dumps(self.snapshot_state(), separators=(',', ':')).encode(), 1)
+
+    def restore(self, data):
+        """Load snapshot() bytes taken from an exercise of the same class"""
+        return self.restore_state(json.loads(zlib.decompress(data)))
+
+    def emit(self, event_type, **metrics):
+        """Publish an event to the attached bus (no-op when none is attached)"""
+        if self.events is not None:
+            self.events.publish(event_type, self.name, self.clock(), metrics)
+
+    def form_alerts(self, landmarks, frame_width, frame_height):
+        """Real-time form alert strings for this frame (drawn on the HUD, pushed to remote clients)"""
+        return []
         
     def calculate_score(self):
         """Calculate the exercise score"""
@@ -51,7 +167,13 @@ class BaseExercise:
     
     def finalize_score(self):
         """Finalize the score calculation (override in subclasses if needed)"""
+        self.run_final_analyses()
         return self.calculate_score()
+
+    def run_final_analyses(self):
+        """Run the analyses scheduled for the end of the exercise"""
+        if self.analyses is not None:
+            self.analyses.finalize(self)
     
     def reset(self):
         """Reset exercise state"""
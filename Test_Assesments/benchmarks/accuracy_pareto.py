@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Accuracy versus cost - which pose settings are worth their CPU
+
+Runs a labeled clip corpus through every combination of pose model
+complexity, input resolution, inference stride and landmark smoothing, and
+for each combination records CPU time per input frame next to the error
+against ground truth for every exercise class: reps for the rep counters,
+hold seconds for plank and one-leg stand, jump count and height for the
+vertical jump. Rows on the Pareto front (nothing else is both cheaper and
+more accurate) are starred.
+
+The corpus is any mix of:
+
+    clip.mp4 + clip.truth.json   video; every axis applies (needs MediaPipe)
+    clip.npz                     landmarks with an embedded truth, e.g. from
+                                 generate_motion.py --out; inference already
+                                 happened, so only stride and smoothing apply
+
+Truth files use the synthetic generator's keys: {"movement": "squats",
+"reps": 12}, {"movement": "plank", "hold_s": 30}, {"movement":
+"vertical_jump", "jumps": 5, "height_cm": [31.2, ...]}. Without --corpus a
+synthetic corpus (every movement, a few seeds, noisy) is generated:
+
+    python benchmarks/accuracy_pareto.py
+    python benchmarks/accuracy_pareto.py --corpus clips/ --complexity 0,1,2 \\
+        --resolutions native,960x540,640x360 --strides 1,2,3 --smoothing off,1.5:5 --json pareto.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.mkv', '.webm')
+HOLD_MOVEMENTS = ('plank', 'one_leg_stand')
+
+
+class Clip:
+    """One labeled corpus item; entry is set for landmark clips, path for videos"""
+    __slots__ = ('name', 'movement', 'truth', 'path', 'entry')
+
+    def __init__(self, name, movement, truth, path=None, entry=None):
+        self.name = name
+        self.movement = movement
+        self.truth = truth
+        self.path = path
+        self.entry = entry
+
+
+def load_corpus(paths):
+    from assessment_service import load_npz_entry
+
+    files = []
+    for path in paths:
+        files.extend(sorted(glob.glob(os.path.join(path, "*"))) if os.path.isdir(path) else [path])
+    clips = []
+    for path in files:
+        stem, ext = os.path.splitext(path)
+        if ext == '.npz':
+            entry = load_npz_entry(path)
+            if 'truth' not in entry:
+                print(f"skipping {path}: no embedded truth")
+                continue
+            truth = json.loads(str(entry.pop('truth')))
+            clips.append(Clip(os.path.basename(path), truth['movement'], truth, entry=entry))
+        elif ext.lower() in VIDEO_EXTENSIONS:
+            if not os.path.exists(stem + ".truth.json"):
+                print(f"skipping {path}: no {os.path.basename(stem)}.truth.json")
+                continue
+            with open(stem + ".truth.json", encoding="utf-8") as f:
+                truth = json.load(f)
+            clips.append(Clip(os.path.basename(path), truth.get('movement') or truth['exercise'], truth, path=path))
+    return clips
+
+
+def synthetic_corpus(seeds, seconds):
+    from utils.synthetic_motion import MOVEMENTS, generate
+
+    clips = []
+    for movement, (defaults, _, _) in MOVEMENTS.items():
+        for seed in range(seeds):
+            params = {'noise': 0.003, 'dropout': 0.01, 'dropout_burst': 3}
+            if 'tempo_jitter' in defaults:
+                params['tempo_jitter'] = 0.15
+            clip = generate(movement, seconds, seed=seed, **params)
+            clips.append(Clip(f"{movement}-{seed}", movement, clip.truth, entry=clip.entry()))
+    return clips
+
+
+def stride_entry(entry, stride):
+    """Every stride-th frame of a landmark entry, as if inference ran that often"""
+    if stride == 1:
+        return entry
+    out = dict(entry)
+    for key in ('landmarks', 'detected', 'timestamps'):
+        out[key] = entry[key][::stride]
+    return out
+
+
+def make_smoother(spec):
+    """'off' -> None, 'min_cutoff:beta' -> LandmarkSmoother"""
+    if spec == 'off':
+        return None
+    from utils.smoothing import LandmarkSmoother
+    min_cutoff, beta = (float(v) for v in spec.split(":"))
+    return LandmarkSmoother(min_cutoff=min_cutoff, beta=beta)
+
+
+def score(clip, exercise):
+    """(error in the clip's natural unit, relative error) against the truth"""
+    truth = clip.truth
+    if clip.movement == 'vertical_jump':
+        heights = exercise.jump_heights_flight
+        count_err = abs(heights.count - truth['jumps'])
+        true_h = float(np.mean(truth['height_cm'])) if truth['height_cm'] else 0.0
+        height_err = abs((heights.mean if heights else 0.0) - true_h)
+        rel = (count_err / max(truth['jumps'], 1) + (height_err / true_h if true_h else 0.0)) / 2
+        return (count_err, height_err), rel
+    if clip.movement in HOLD_MOVEMENTS:
+        err = abs(exercise.duration - truth['hold_s'])
+        return (err,), err / max(truth['hold_s'], 1.0)
+    err = abs(exercise.reps - truth['reps'])
+    return (err,), err / max(truth['reps'], 1)
+
+
+def analyze(clip, entry, smoothing):
+    """Run the clip's exercise; returns (errors, relative error, CPU seconds)"""
+    from assessment_flow import create_exercise
+    from utils.video_runner import analyze_landmarks
+
+    exercise = create_exercise(clip.movement)
+    smoother = make_smoother(smoothing)
+    started = time.process_time()
+    analyze_landmarks(exercise, entry, smoother)
+    cpu = time.process_time() - started
+    errors, rel = score(clip, exercise)
+    return errors, rel, cpu
+
+
+def parse_resolution(spec):
+    if spec == 'native':
+        return None, None
+    w, h = spec.lower().split("x")
+    return int(w), int(h)
+
+
+def run_corpus(clips, complexities, resolutions, strides, smoothings):
+    """{config tuple: [(clip, errors, relative error, cpu seconds, input frames), ...]}"""
+    from utils.video_runner import extract_landmarks
+
+    results = {}
+    for clip in clips:
+        if clip.entry is not None:
+            frames = len(clip.entry['landmarks'])
+            for stride in strides:
+                entry = stride_entry(clip.entry, stride)
+                for smoothing in smoothings:
+                    errors, rel, cpu = analyze(clip, entry, smoothing)
+                    results.setdefault(('-', '-', stride, smoothing), []).append((clip, errors, rel, cpu, frames))
+            continue
+        for complexity in complexities:
+            for resolution in resolutions:
+                width, height = parse_resolution(resolution)
+                for stride in strides:
+                    started = time.process_time()
+                    entry = extract_landmarks(clip.path, complexity, width, height, stride=stride)
+                    pose_cpu = time.process_time() - started
+                    frames = int(round(entry['timestamps'][-1] * float(entry['fps']))) + 1 if len(entry['timestamps']) else 0
+                    for smoothing in smoothings:
+                        errors, rel, cpu = analyze(clip, entry, smoothing)
+                        results.setdefault((complexity, resolution, stride, smoothing), []).append(
+                            (clip, errors, rel, pose_cpu + cpu, frames))
+        print(f"  {clip.name} done")
+    return results
+
+
+def summarize(results):
+    """One row per config: cost, overall and per-exercise errors, Pareto flag"""
+    rows = []
+    for config, runs in results.items():
+        frames = sum(r[4] for r in runs)
+        row = {'complexity': config[0], 'resolution': config[1], 'stride': config[2], 'smoothing': config[3],
+               'cpu_ms_per_frame': 1000.0 * sum(r[3] for r in runs) / max(frames, 1),
+               'error_pct': 100.0 * float(np.mean([r[2] for r in runs])), 'exercises': {}}
+        by_movement = {}
+        for clip, errors, _, _, _ in runs:
+            by_movement.setdefault(clip.movement, []).append(errors)
+        for movement, errors in by_movement.items():
+            row['exercises'][movement] = [round(float(v), 3) for v in np.mean(errors, axis=0)]
+        rows.append(row)
+    for row in rows:
+        row['pareto'] = not any(
+            other['cpu_ms_per_frame'] <= row['cpu_ms_per_frame'] and other['error_pct'] <= row['error_pct']
+            and (other['cpu_ms_per_frame'] < row['cpu_ms_per_frame'] or other['error_pct'] < row['error_pct'])
+            for other in rows)
+    rows.sort(key=lambda r: (r['cpu_ms_per_frame'], r['error_pct']))
+    return rows
+
+
+def format_error(movement, values):
+    if movement == 'vertical_jump':
+        return f"{values[0]:.2f}j/{values[1]:.1f}cm"
+    if movement in HOLD_MOVEMENTS:
+        return f"{values[0]:.2f}s"
+    return f"{values[0]:.2f}"
+
+
+def print_table(rows):
+    movements = sorted({m for row in rows for m in row['exercises']})
+    header = f"  {'cplx':>4s} {'resolution':>10s} {'stride':>6s} {'smoothing':>9s} {'cpu ms/f':>8s} {'err %':>6s}"
+    print(header + "".join(f" {m[:13]:>13s}" for m in movements))
+    for row in rows:
+        cells = "".join(f" {format_error(m, row['exercises'][m]) if m in row['exercises'] else '-':>13s}"
+                        for m in movements)
+        print(f"{'*' if row['pareto'] else ' '} {str(row['complexity']):>4s} {row['resolution']:>10s} "
+              f"{row['stride']:6d} {row['smoothing']:>9s} {row['cpu_ms_per_frame']:8.3f} {row['error_pct']:6.2f}"
+              + cells)
+    print("* Pareto front. Errors are mean absolute: reps, hold seconds, jumps/jump height.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pareto table of pose settings: CPU per frame versus accuracy")
+    parser.add_argument("--corpus", action="append", help="Clip or directory of clips (repeatable)")
+    parser.add_argument("--synthetic", type=int, default=3, help="Seeds per movement when no corpus is given")
+    parser.add_argument("--seconds", type=float, default=30.0, help="Synthetic clip length")
+    parser.add_argument("--complexity", default="0,1,2", help="Model complexities (videos only)")
+    parser.add_argument("--resolutions", default="native,960x540,640x360",
+                        help="Inference resolutions WxH or 'native' (videos only)")
+    parser.add_argument("--strides", default="1,2,3", help="Run pose on every n-th frame")
+    parser.add_argument("--smoothing", default="off,1.5:5,0.8:2",
+                        help="'off' or One-Euro 'min_cutoff:beta' settings")
+    parser.add_argument("--json", help="Also write the rows here")
+    args = parser.parse_args()
+
+    clips = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.synthetic, args.seconds)
+    if not clips:
+        raise SystemExit("No labeled clips found.")
+    complexities = [int(c) for c in args.complexity.split(",")]
+    resolutions = [r.strip() for r in args.resolutions.split(",")]
+    strides = [int(s) for s in args.strides.split(",")]
+    smoothings = [s.strip() for s in args.smoothing.split(",")]
+
+    print(f"{len(clips)} clips ({sum(c.path is not None for c in clips)} videos)")
+    results = run_corpus(clips, complexities, resolutions, strides, smoothings)
+    # Landmark clips and videos measure different costs, so each gets its own front
+    tables = {'video': summarize({k: v for k, v in results.items() if k[0] != '-'}),
+              'landmarks': summarize({k: v for k, v in results.items() if k[0] == '-'})}
+    for kind, title in (('video', "videos"), ('landmarks', "landmark clips (analysis cost only)")):
+        if tables[kind]:
+            print(f"\n{title}")
+            print_table(tables[kind])
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({kind: rows for kind, rows in tables.items() if rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Per-frame exercise update() cost
+
+Replays a synthetic squat clip through every registered exercise and reports
+the mean and p95 cost of update() per frame. Landmark objects are prebuilt,
+so only the exercise logic is timed. Run it on two revisions to compare:
+
+    python benchmarks/bench_exercise_update.py --frames 3000 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def measure_update_cost(ex_type, landmarks, timestamps, repeat=5, width=960, height=540):
+    """Per-frame update() times in microseconds over `repeat` fresh runs"""
+    from assessment_flow import create_exercise
+    from base_exercise import FrameClock
+
+    samples = []
+    for _ in range(repeat):
+        exercise = create_exercise(ex_type)
+        clock = FrameClock()
+        exercise.clock = clock
+        perf = time.perf_counter
+        for lms, ts in zip(landmarks, timestamps):
+            clock.t = ts
+            t0 = perf()
+            exercise.update(lms, width, height)
+            samples.append((perf() - t0) * 1e6)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-frame exercise update() cost")
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--exercises", help="Comma-separated types (default: all registered)")
+    args = parser.parse_args()
+
+    from benchmarks.load_test_service import synthetic_squat_landmarks
+    from exercises.registry import exercise_types
+    from utils.pose_utils import landmarks_from_array
+
+    lms, t = synthetic_squat_landmarks(seconds=args.frames / args.fps, fps=args.fps)
+    landmarks = [landmarks_from_array(a) for a in lms]
+    timestamps = [float(x) for x in t]
+    types = args.exercises.split(",") if args.exercises else exercise_types()
+
+    print(f"{'exercise':16s} {'mean us':>9s} {'p50 us':>9s} {'p95 us':>9s}")
+    for ex_type in types:
+        samples = sorted(measure_update_cost(ex_type, landmarks, timestamps, args.repeat))
+        mean = sum(samples) / len(samples)
+        p50 = samples[len(samples) // 2]
+        p95 = samples[int(len(samples) * 0.95)]
+        print(f"{ex_type:16s} {mean:9.1f} {p50:9.1f} {p95:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
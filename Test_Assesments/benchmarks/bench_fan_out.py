@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Fan-out overhead - all analyzers on one landmark stream vs the right one only
+
+Builds a free-form training session from synthetic clips (every movement,
+with rest in between) and pushes it through an AssessmentSession whose flow
+has every registered exercise, three ways:
+
+    single    only the analyzer of the exercise really being done (ground truth)
+    all       every analyzer gets every frame (push_frame(all_exercises=True))
+    fan-out   utils.fan_out.FanOutRouter: gated analyzers, shared features
+
+and prints the per-frame cost, analyzer updates per frame and what each
+analyzer measured next to the truth:
+
+    python benchmarks/bench_fan_out.py --repeat 3 --set noise=0.01
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# (movement, seconds); 'rest' is standing still
+SESSION = [('rest', 5), ('squats', 30), ('rest', 8), ('pushups', 25), ('situps', 30), ('rest', 6),
+           ('plank', 20), ('vertical_jump', 24), ('rest', 5), ('one_leg_stand', 20)]
+
+
+def training_session(parts, fps=30.0, seed=0, **params):
+    """Landmark entry of the clips back to back (1 s crossfades), and [(movement, start, end, clip)]"""
+    from utils.synthetic_motion import generate
+
+    landmarks, timestamps, detected, truth = [], [], [], []
+    start = 0.0
+    for movement, seconds in parts:
+        if movement == 'rest':
+            clip = generate('one_leg_stand', seconds, fps=fps, seed=seed, **dict(params, touchdown_s=0.0))
+        else:
+            clip = generate(movement, seconds, fps=fps, seed=seed, **params)
+        points = clip.landmarks.copy()
+        if landmarks:  # Step into position from the previous pose
+            n = int(fps)
+            weight = np.linspace(0.0, 1.0, n)[:, None, None]
+            points[:n] = landmarks[-1][-1] * (1 - weight) + points[:n] * weight
+        landmarks.append(points)
+        timestamps.append(clip.timestamps + start)
+        detected.append(clip.detected)
+        truth.append((movement, start, start + seconds, clip))
+        start += seconds
+    entry = {'landmarks': np.concatenate(landmarks), 'timestamps': np.concatenate(timestamps),
+             'detected': np.concatenate(detected), 'frame_size': clip.frame_size, 'fps': np.array(fps)}
+    return entry, truth
+
+
+def run(mode, entry, truth, types):
+    """(assessment, seconds, analyzer updates) for one pass in the given mode"""
+    from assessment_flow import FitnessAssessment
+    from assessment_session import AssessmentSession
+    from utils.fan_out import FanOutRouter
+
+    assessment = FitnessAssessment.from_spec({'exercises': types})
+    session = AssessmentSession(assessment=assessment)
+    router = FanOutRouter(session) if mode == 'fan-out' else None
+    w, h = (int(v) for v in entry['frame_size'])
+    frames = [(lm if ok else None, float(t))
+              for lm, ok, t in zip(entry['landmarks'], entry['detected'], entry['timestamps'])]
+    # Ground-truth exercise index per frame (None while resting) for the single mode
+    index = [None] * len(frames)
+    for movement, start, end, _ in truth:
+        if movement in types:
+            for i, (_, t) in enumerate(frames):
+                if start <= t < end:
+                    index[i] = types.index(movement)
+
+    updates = 0
+    started = time.perf_counter()
+    if router is not None:
+        for landmarks, t in frames:
+            router.push(landmarks, t, w, h)
+        updates = router.updates
+    elif mode == 'all':
+        for landmarks, t in frames:
+            session.push_frame(landmarks, t, w, h, all_exercises=True)
+            updates += len(types) if landmarks is not None else 0
+    else:
+        for (landmarks, t), i in zip(frames, index):
+            if i is None:
+                landmarks = None
+            elif i != assessment.current_exercise_idx:
+                session.select_exercise(i)
+            session.push_frame(landmarks, t, w, h)
+            updates += landmarks is not None
+    return assessment, time.perf_counter() - started, updates
+
+
+def main():
+    from benchmarks.generate_motion import expected, measured, parse_params
+    from exercises.registry import exercise_types
+
+    parser = argparse.ArgumentParser(description="Benchmark fan-out mode against a single analyzer")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode (the fastest is reported)")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--set", action="append", metavar="KEY=VALUE",
+                        help="Sensor parameter for every clip, e.g. noise=0.01 (repeatable)")
+    args = parser.parse_args()
+
+    types = exercise_types()
+    entry, truth = training_session(SESSION, fps=args.fps, seed=args.seed, **parse_params(args.set))
+    n = len(entry['timestamps'])
+    print(f"{n} frames ({n / args.fps:.0f}s session), {len(types)} analyzers")
+    print(f"{'mode':8s} {'us/frame':>9s} {'x single':>9s} {'updates/frame':>14s}")
+    results, base = {}, None
+    for mode in ('single', 'all', 'fan-out'):
+        best = None
+        for _ in range(args.repeat):
+            assessment, wall, updates = run(mode, entry, truth, types)
+            best = wall if best is None else min(best, wall)
+        results[mode] = assessment
+        us = 1e6 * best / n
+        base = base or us
+        print(f"{mode:8s} {us:9.1f} {us / base:9.2f} {updates / n:14.2f}")
+
+    print("\nMeasured per analyzer (truth from the clips of that movement)")
+    for i, ex_type in enumerate(types):
+        clips = [clip for movement, _, _, clip in truth if movement == ex_type]
+        print(f"{ex_type:14s} truth    {[expected(clip) for clip in clips]}")
+        for mode in ('single', 'all', 'fan-out'):
+            print(f"{'':14s} {mode:8s} {measured(ex_type, results[mode].exercises[i])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Multi-athlete scaling - one shared detection pass vs one pass per athlete
+
+Places 1, 2, 4 ... synthetic athletes side by side in one frame, each doing
+their own movement, and runs them through a TeamSession with a replayed
+multi-pose detector (utils.fake_io.FakeMultiPose, people reported in a
+different order every frame, some frames missing). The detector stands in
+for the model with a fixed --latency-ms per call, so the table shows how
+frame time grows with the athletes when the detection is shared, next to
+what one single-pose pass per athlete would cost. Each athlete's results
+are checked against the truth of the movement at their spot:
+
+    python benchmarks/bench_multi_athlete.py --athletes 1,2,4,8 --latency-ms 25
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MOVEMENTS = ['squats', 'one_leg_stand', 'pushups', 'situps', 'vertical_jump', 'plank']
+
+
+def team_scene(count, seconds, fps=30.0, seed=0, **params):
+    """(N, count, 33, 4) landmarks, (N, count) detected, the movements and their clips
+
+    Athlete k does MOVEMENTS[k % 6] in the k-th of `count` columns, scaled
+    down so everybody fits.
+    """
+    from utils.synthetic_motion import generate
+
+    scale = min(1.0, 1.6 / count)
+    movements = [MOVEMENTS[k % len(MOVEMENTS)] for k in range(count)]
+    clips = [generate(m, seconds, fps=fps, seed=seed + k, **params) for k, m in enumerate(movements)]
+    n = min(len(clip) for clip in clips)
+    landmarks = np.empty((n, count, 33, 4), dtype=np.float32)
+    for k, clip in enumerate(clips):
+        points = clip.landmarks[:n].copy()
+        points[..., 0] = (k + 0.5) / count + (points[..., 0] - 0.5) * scale
+        points[..., 1] = 0.9 + (points[..., 1] - 0.9) * scale
+        landmarks[:, k] = points
+    detected = np.stack([clip.detected[:n] for clip in clips], axis=1)
+    return landmarks, detected, movements, clips
+
+
+def run_team(landmarks, detected, movements, fps, latency):
+    """(team, seconds spent outside the detector, seconds in it)"""
+    from utils.fake_io import FakeMultiPose
+    from utils.fan_out import FanOutRouter
+    from utils.multi_person import TeamSession
+
+    # Everybody does something different: free-form sessions, every analyzer fanned out
+    team = TeamSession({'exercises': sorted(set(movements))}, router=FanOutRouter, cost_mode=None)
+    detector = FakeMultiPose(landmarks, detected, latency=latency)
+    w, h = 960, 540
+    detect_s = 0.0
+    started = time.perf_counter()
+    for i in range(len(landmarks)):
+        t = i / fps
+        t0 = time.perf_counter()
+        poses = detector.detect(None, t)
+        detect_s += time.perf_counter() - t0
+        team.push(poses, t, w, h)
+    team.finish()
+    return team, time.perf_counter() - started - detect_s, detect_s
+
+
+def check(team, movements, clips, count):
+    """Per athlete: column, movement, truth and what their analyzer measured"""
+    from benchmarks.generate_motion import expected, measured
+
+    rows = []
+    for athlete in team.scored():
+        column = int(np.clip(athlete.track.home_x * 540 / 960 * count, 0, count - 1))
+        movement = movements[column]
+        exercise = next(ex for ex, entry in zip(athlete.assessment.exercises, team.spec['exercises'])
+                        if entry['type'] == movement)
+        rows.append((athlete.athlete_id, column, movement, expected(clips[column]), measured(movement, exercise)))
+    return rows
+
+
+def main():
+    from benchmarks.generate_motion import parse_params
+
+    parser = argparse.ArgumentParser(description="Benchmark multi-athlete tracking with a shared detection pass")
+    parser.add_argument("--athletes", default="1,2,4,8", help="Comma-separated athlete counts")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--latency-ms", type=float, default=25.0, help="Stand-in detection cost per call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--set", action="append", metavar="KEY=VALUE",
+                        help="Sensor parameter for every athlete, e.g. dropout=0.02 (repeatable)")
+    parser.add_argument("--quiet", action="store_true", help="Only the scaling table")
+    args = parser.parse_args()
+
+    params = {'noise': 0.003, 'dropout': 0.01}
+    params.update(parse_params(args.set))
+    latency = args.latency_ms / 1000.0
+    print(f"{'athletes':>8s} {'tracked':>7s} {'team us/frm':>11s} {'shared ms/frm':>13s} "
+          f"{'per-athlete ms/frm':>18s} {'speed-up':>8s}")
+    checks = []
+    for count in (int(c) for c in args.athletes.split(",")):
+        landmarks, detected, movements, clips = team_scene(count, args.seconds, args.fps, args.seed, **params)
+        team, team_s, detect_s = run_team(landmarks, detected, movements, args.fps, latency)
+        n = len(landmarks)
+        shared = (team_s + detect_s) / n
+        separate = team_s / n + count * detect_s / n  # One detection pass per athlete instead
+        print(f"{count:8d} {len(team.scored()):7d} {1e6 * team_s / n:11.1f} {1000 * shared:13.2f} "
+              f"{1000 * separate:18.2f} {separate / shared:7.2f}x")
+        checks.append((count, check(team, movements, clips, count)))
+
+    if not args.quiet:
+        for count, rows in checks:
+            print(f"\n{count} athletes")
+            for athlete_id, column, movement, truth, got in rows:
+                print(f"  #{athlete_id} spot {column + 1} {movement:14s} truth {truth}  measured {got}")
+
+
+if __name__ == "__main__":
+    main()
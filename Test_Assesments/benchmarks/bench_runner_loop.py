@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+End-to-end runner loop throughput, headless
+
+Drives the real run_exercises loop (flip, colour conversion, session update,
+feedback and HUD drawing, key handling) through the utils.fake_io stand-ins:
+a generated camera, a pose model replaying the fps_matrix motions for each
+exercise of the default flow in turn, and scripted 'n'/'s' keypresses at the
+exercise boundaries. Pose inference is the only part not measured; --latency
+adds a fixed per-frame cost in its place.
+
+By default the loop runs as fast as it can on frame time, and reports loop
+frames per second and per-frame cost. With --realtime the camera delivers at
+--fps on the wall clock and frames the loop cannot keep up with are dropped,
+which is what a load test on a slow box wants to see:
+
+    python benchmarks/bench_runner_loop.py
+    python benchmarks/bench_runner_loop.py --realtime --fps 30 --latency 25
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def flow_clip(ex_types, seconds, fps):
+    """Landmarks for every exercise back to back, and the frame index each one ends on"""
+    from benchmarks import fps_matrix as m
+
+    clips = {'squats': m.squats_clip, 'pushups': m.pushups_clip, 'situps': m.situps_clip,
+             'plank': m.plank_clip, 'vertical_jump': m.vertical_jump_clip,
+             'one_leg_stand': m.one_leg_stand_clip}
+    t = np.arange(int(seconds * fps)) / fps
+    parts = [clips[ex_type](t) for ex_type in ex_types]
+    ends = list(np.cumsum([len(p) for p in parts]) - 1)
+    return np.concatenate(parts), ends
+
+
+def run_loop(ex_types, seconds, fps, realtime=False, latency_ms=0.0):
+    """Run the full loop once; returns (assessment, display, capture, wall seconds)"""
+    from assessment_flow import FitnessAssessment
+    from utils.assessment_runner import run_exercises
+    from utils.fake_io import FakeCapture, FakeClock, FakePose, NullDisplay, ScriptedKeys
+    from utils.runner_io import RunnerIO
+
+    landmarks, ends = flow_clip(ex_types, seconds, fps)
+    # 'n' on the last frame of each exercise; save once halfway through the flow
+    script = {end: 'n' for end in ends}
+    script[ends[len(ends) // 2] - 1] = 's'
+
+    clock = None if realtime else FakeClock()
+    capture = FakeCapture(len(landmarks), fps=fps, clock=clock, realtime=realtime)
+    display = NullDisplay(record_times=True)
+    runner_io = RunnerIO(capture=capture,
+                         pose=FakePose(landmarks, frame_index=capture.frame_index, latency=latency_ms / 1000.0),
+                         display=display,
+                         keys=ScriptedKeys(script, clock=clock, frame_index=capture.frame_index),
+                         clock=clock, sleep=clock.sleep if clock is not None else None)
+    # Key presses sleep for a moment in the real loop; in realtime mode that costs frames, as it would live
+    args = SimpleNamespace(show_skeleton=False, camera=0, width=960, height=540)
+
+    assessment = FitnessAssessment.from_spec({'exercises': ex_types})
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_exercises(assessment, args, io=runner_io)
+    return assessment, display, capture, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the interactive runner loop headlessly")
+    parser.add_argument("--exercises", default="squats,pushups,situps,plank,vertical_jump,one_leg_stand")
+    parser.add_argument("--seconds", type=float, default=21.0, help="Clip length per exercise")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--realtime", action="store_true", help="Deliver frames on the wall clock and drop late ones")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated pose inference ms per frame")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    ex_types = [t.strip() for t in args.exercises.split(",") if t.strip()]
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)  # The 's' key saves results to the working directory
+        try:
+            for run in range(args.repeat):
+                assessment, display, capture, wall = run_loop(ex_types, args.seconds, args.fps,
+                                                              args.realtime, args.latency)
+                frame_ms = np.diff(display.times) * 1000.0
+                print(f"run {run + 1}: {display.shown} frames in {wall:.2f}s = {display.shown / wall:.0f} fps  "
+                      f"frame ms mean {frame_ms.mean():.2f} p95 {np.percentile(frame_ms, 95):.2f}  "
+                      f"dropped {capture.dropped}")
+        finally:
+            os.chdir(cwd)
+
+    print("results: " + ", ".join(f"{ex.name} reps={ex.reps} errors={ex.form_errors}"
+                                  for ex in assessment.exercises))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Frame-rate consistency matrix
+
+Renders the same synthetic motion at several inference rates and runs each
+exercise on every version. Smoothing, sustain and calibration windows are in
+seconds, so reps, form errors and timings should match the 30 fps reference
+(times to within two frames of the slowest rate, since the start and the
+end of a hold are each rounded to a frame). Exits non-zero on any
+mismatch, so it can gate a change to the exercise logic:
+
+    python benchmarks/fps_matrix.py
+    python benchmarks/fps_matrix.py --fps 10,15,30 --noise 0.003 --smooth
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WIDTH, HEIGHT = 960, 540
+SECONDS = 21.0  # 8 full reps, then a partial one that never crosses back up
+REP_S = 2.5
+
+
+def _cycle(t, hi, lo, rep_s=REP_S):
+    """Joint angle (degrees) resting at hi for 0.5 s, then dipping to lo, once per rep"""
+    phase = (t - 0.5) % rep_s
+    dip = np.clip(np.sin(np.pi * phase / (rep_s - 0.5)), 0, None) * (phase < rep_s - 0.5)
+    return hi - (hi - lo) * dip
+
+
+def _at(origin, length, angle_deg):
+    """Point `length` frame heights from origin, angle counter-clockwise from +x
+
+    x is scaled by the aspect ratio so the angle holds in pixels, which is
+    what the exercises measure.
+    """
+    a = np.radians(angle_deg)
+    return np.stack([origin[..., 0] + length * np.cos(a) * HEIGHT / WIDTH,
+                     origin[..., 1] - length * np.sin(a)], axis=-1)
+
+
+def _blank(n):
+    lms = np.zeros((n, 33, 4))
+    lms[:, :, 3] = 0.9
+    return lms
+
+
+def _set(lms, indices, xy):
+    for idx in indices:
+        lms[:, idx, :2] = xy
+
+
+def squats_clip(t):
+    n = len(t)
+    lms = _blank(n)
+    knee = np.tile([0.5, 0.7], (n, 1))
+    hip = _at(knee, 0.2, 90 - (180 - _cycle(t, 170, 85)))
+    _set(lms, (23, 24), hip)
+    _set(lms, (11, 12), hip - [0.0, 0.3])
+    _set(lms, (25, 26), knee)
+    _set(lms, (27, 28), knee + [0.0, 0.2])
+    return lms
+
+
+def pushups_clip(t, sag=0.0):
+    n = len(t)
+    lms = _blank(n)
+    wrist = np.tile([0.5, 0.85], (n, 1))
+    elbow = wrist - [0.0, 0.15]
+    shoulder = _at(elbow, 0.15, -90 + _cycle(t, 180, 60))
+    _set(lms, (15, 16), wrist)
+    _set(lms, (13, 14), elbow)
+    _set(lms, (11, 12), shoulder)
+    _set(lms, (23, 24), shoulder + [0.3, sag])
+    _set(lms, (27, 28), shoulder + [0.6, 0.0])
+    return lms
+
+
+def situps_clip(t):
+    n = len(t)
+    lms = _blank(n)
+    hip = np.tile([0.5, 0.8], (n, 1))
+    knee = hip + [0.15, -0.1]
+    leg_dir = np.degrees(np.arctan2(0.1, 0.15))
+    shoulder = _at(hip, 0.25, leg_dir + _cycle(t, 165, 40))
+    _set(lms, (23, 24), hip)
+    _set(lms, (25, 26), knee)
+    _set(lms, (27, 28), knee + [0.1, 0.1])
+    _set(lms, (11, 12), shoulder)
+    _set(lms, (13, 14), shoulder + [0.05, 0.0])
+    _set(lms, (15, 16), shoulder + [0.08, 0.0])
+    return lms
+
+
+def plank_clip(t, hold_s=12.0):
+    """Straight side plank for hold_s seconds, then hips drop until the test ends"""
+    n = len(t)
+    lms = _blank(n)
+    _set(lms, (7, 8), np.tile([0.25, 0.49], (n, 1)))
+    _set(lms, (11, 12), np.tile([0.3, 0.5], (n, 1)))
+    hip_y = np.where(t < hold_s, 0.5, 0.62)
+    _set(lms, (23, 24), np.stack([np.full(n, 0.5), hip_y], axis=1))
+    _set(lms, (27, 28), np.tile([0.8, 0.5], (n, 1)))
+    return lms
+
+
+def one_leg_stand_clip(t):
+    """Standing on the left leg; hips sway sideways for 0.5 s every 2.5 s"""
+    n = len(t)
+    lms = _blank(n)
+    sway = ((t % REP_S) >= 1.0) & ((t % REP_S) < 1.5)
+    hip_x = np.where(sway, 0.65, 0.5)
+    _set(lms, (23, 24), np.stack([hip_x, np.full(n, 0.55)], axis=1))
+    lms[:, 27, :2] = [0.48, 0.9]
+    lms[:, 28, :2] = [0.52, 0.7]
+    return lms
+
+
+def vertical_jump_clip(t):
+    """Standing still (calibration only; jumps come from generated_clip)"""
+    n = len(t)
+    lms = _blank(n)
+    _set(lms, (0,), np.tile([0.5, 0.15], (n, 1)))
+    _set(lms, (23, 24), np.tile([0.5, 0.55], (n, 1)))
+    _set(lms, (25, 26), np.tile([0.5, 0.72], (n, 1)))
+    _set(lms, (27, 28, 29, 30), np.tile([0.5, 0.9], (n, 1)))
+    return lms
+
+
+def generated_clip(movement, **params):
+    """Clip builder rendering utils.synthetic_motion's model of a movement at the times t"""
+    def build(t):
+        from utils.synthetic_motion import generate
+        fps = 1.0 / (t[1] - t[0])
+        clip = generate(movement, len(t) / fps, fps=fps, frame_size=(WIDTH, HEIGHT), **params)
+        return clip.landmarks[:len(t)].astype(np.float64)
+    return build
+
+
+def _calibration_time(ex):
+    start = getattr(ex, 'calibration_start_time', None)
+    return round(ex.calibration_elapsed, 2) if start is not None else None
+
+
+# name -> (exercise type, clip builder, metrics of the finished exercise)
+CASES = {
+    'squats': ('squats', squats_clip, lambda ex: {'reps': ex.reps, 'form_errors': ex.form_errors}),
+    'pushups': ('pushups', pushups_clip, lambda ex: {'reps': ex.reps, 'form_errors': ex.form_errors}),
+    'pushups_sag': ('pushups', lambda t: pushups_clip(t, sag=0.16),
+                    lambda ex: {'reps': ex.reps, 'form_errors': ex.form_errors}),
+    'situps': ('situps', situps_clip, lambda ex: {'reps': ex.reps, 'form_errors': ex.form_errors}),
+    'plank': ('plank', plank_clip, lambda ex: {'state': ex.state, 'calibration_s': _calibration_time(ex),
+                                               'duration': round(ex.valid_duration, 2)}),
+    'one_leg_stand': ('one_leg_stand', one_leg_stand_clip,
+                      lambda ex: {'form_errors': ex.form_errors, 'duration': round(ex.duration, 2)}),
+    'vertical_jump': ('vertical_jump', vertical_jump_clip,
+                      lambda ex: {'calibrated': ex.calibrated, 'calibration_s': _calibration_time(ex)}),
+    # Counts only: jump heights fall back to the frame-sampled hip peak and move by ~1-2 cm with the rate
+    'vertical_jump_jumps': ('vertical_jump', generated_clip('vertical_jump'),
+                            lambda ex: {'jumps': ex.jump_heights_flight.count, 'form_errors': ex.form_errors}),
+    # Rest chosen so the incomplete-up/down frame ratios (0.52-0.6) stay clear of the 0.7
+    # error threshold; the generator's default sit-up sits at 0.68-0.72 and flips with the rate
+    'situps_generated': ('situps', generated_clip('situps', rest_s=0.8),
+                         lambda ex: {'reps': ex.reps, 'form_errors': ex.form_errors}),
+}
+TIME_METRICS = ('calibration_s', 'duration')
+
+
+def run_case(name, fps, noise=0.0, smooth=False, seed=0):
+    """Metrics of one case rendered at one frame rate"""
+    from assessment_flow import create_exercise
+    from base_exercise import FrameClock
+    from utils.pose_utils import landmarks_from_array
+    from utils.smoothing import LandmarkSmoother
+
+    ex_type, clip, metrics = CASES[name]
+    t = np.arange(int(SECONDS * fps)) / fps
+    lms = clip(t)
+    if noise:
+        rng = np.random.default_rng(seed)
+        lms[:, :, :2] += rng.normal(0.0, noise, lms[:, :, :2].shape)
+
+    exercise = create_exercise(ex_type)
+    clock = FrameClock()
+    exercise.clock = clock
+    smoother = LandmarkSmoother() if smooth else None
+    for frame, ts in zip(lms, t.tolist()):
+        clock.t = ts
+        if smoother is not None:
+            frame = smoother(frame, ts)
+        exercise.update(landmarks_from_array(frame), WIDTH, HEIGHT)
+    return metrics(exercise)
+
+
+def compare(reference, result, tolerance):
+    """Metric names that differ from the reference"""
+    bad = []
+    for key, ref in reference.items():
+        value = result[key]
+        if key in TIME_METRICS and ref is not None and value is not None:
+            if abs(value - ref) > tolerance:
+                bad.append(key)
+        elif value != ref:
+            bad.append(key)
+    return bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check exercise results are the same at several frame rates")
+    parser.add_argument("--fps", default="10,15,30", help="Comma-separated rates; the highest is the reference")
+    parser.add_argument("--cases", help=f"Comma-separated subset of: {', '.join(CASES)}")
+    parser.add_argument("--noise", type=float, default=0.002, help="Landmark jitter (std, normalized units)")
+    parser.add_argument("--smooth", action="store_true", help="Run landmarks through LandmarkSmoother first")
+    args = parser.parse_args()
+
+    rates = sorted(float(f) for f in args.fps.split(","))
+    reference_fps = rates[-1]
+    tolerance = 2.0 / rates[0] + 1e-6
+    cases = args.cases.split(",") if args.cases else list(CASES)
+
+    failures = 0
+    for name in cases:
+        results = {fps: run_case(name, fps, args.noise, args.smooth) for fps in rates}
+        reference = results[reference_fps]
+        for fps in rates:
+            bad = compare(reference, results[fps], tolerance)
+            failures += bool(bad)
+            cells = "  ".join(f"{k}={v}" + ("!" if k in bad else "") for k, v in results[fps].items())
+            print(f"{name:20s} {fps:5g} fps  {cells}")
+    print(f"{failures} mismatching runs (times may differ by {tolerance:.3f}s)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
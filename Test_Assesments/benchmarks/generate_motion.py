@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Synthetic motion - write, check or time utils.synthetic_motion clips
+
+    python benchmarks/generate_motion.py squats --seconds 60 --set depth=80 --set noise=0.003 --out squats.npz
+    python benchmarks/generate_motion.py all --check                 # exercises vs ground truth
+    python benchmarks/generate_motion.py pushups --check --set sag=0.16
+    python benchmarks/generate_motion.py all --bench --frames 2000000
+
+--out writes the landmark upload layout (load it with load_npz_entry, or
+post it to /assess/landmarks) plus label_* arrays and the truth as JSON.
+--check replays each clip through its exercise and prints what the exercise
+measured next to what was generated. --bench renders long sessions chunk by
+chunk and reports frames per second.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_params(items):
+    """['depth=80', 'side=R'] -> {'depth': 80, 'side': 'R'}"""
+    params = {}
+    for item in items or []:
+        key, _, value = item.partition("=")
+        try:
+            params[key.strip()] = json.loads(value)
+        except ValueError:
+            params[key.strip()] = value
+    return params
+
+
+def measured(movement, exercise):
+    """What the exercise made of a clip, keyed like the generator's truth"""
+    if movement == 'vertical_jump':
+        heights = exercise.jump_heights_flight
+        return {'jumps': heights.count, 'height_cm': round(heights.mean, 2) if heights else 0.0,
+                'errors': exercise.form_errors}
+    if movement in ('plank', 'one_leg_stand'):
+        return {'hold_s': round(exercise.duration, 2), 'errors': exercise.form_errors}
+    return {'reps': exercise.reps, 'errors': exercise.form_errors}
+
+
+def expected(clip):
+    truth = clip.truth
+    if clip.movement == 'vertical_jump':
+        heights = truth['height_cm']
+        return {'jumps': truth['jumps'], 'height_cm': round(sum(heights) / len(heights), 2) if heights else 0.0}
+    if 'hold_s' in truth:
+        return {'hold_s': truth['hold_s']}
+    return {'reps': truth['reps']}
+
+
+def check(movement, args, params):
+    from assessment_flow import create_exercise
+    from utils.synthetic_motion import generate
+    from utils.video_runner import analyze_landmarks
+
+    clip = generate(movement, args.seconds, fps=args.fps, seed=args.seed, **params)
+    exercise = analyze_landmarks(create_exercise(movement), clip.entry())
+    print(f"{movement:14s} truth {json.dumps(expected(clip))}  measured {json.dumps(measured(movement, exercise))}")
+
+
+def bench(movement, args, params):
+    from utils.synthetic_motion import MotionGenerator
+
+    generator = MotionGenerator(movement, args.frames / args.fps, fps=args.fps, seed=args.seed, **params)
+    started = time.perf_counter()
+    frames = sum(len(chunk) for chunk in generator.chunks(args.chunk))
+    wall = time.perf_counter() - started
+    print(f"{movement:14s} {frames:9d} frames in {wall:6.2f}s = {frames / wall / 1e6:5.2f} M frames/s")
+
+
+def main():
+    from utils.synthetic_motion import MOVEMENTS
+
+    parser = argparse.ArgumentParser(description="Generate synthetic pose clips with ground truth")
+    parser.add_argument("movement", choices=list(MOVEMENTS) + ["all"])
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--set", action="append", metavar="KEY=VALUE",
+                        help="Movement or sensor parameter (see utils/synthetic_motion.py), repeatable")
+    parser.add_argument("--out", help="Write the clip to this .npz (one movement only)")
+    parser.add_argument("--check", action="store_true", help="Run the exercise over the clip and compare with truth")
+    parser.add_argument("--bench", action="store_true", help="Time generation instead")
+    parser.add_argument("--frames", type=int, default=1_000_000, help="Frames per movement for --bench")
+    parser.add_argument("--chunk", type=int, default=65536, help="Frames per chunk for --bench")
+    args = parser.parse_args()
+
+    params = parse_params(args.set)
+    movements = list(MOVEMENTS) if args.movement == "all" else [args.movement]
+    if args.out:
+        if len(movements) > 1:
+            parser.error("--out needs a single movement")
+        from utils.synthetic_motion import generate
+        clip = generate(movements[0], args.seconds, fps=args.fps, seed=args.seed, **params)
+        clip.save(args.out)
+        print(f"wrote {len(clip)} frames to {args.out}: {json.dumps(expected(clip))}")
+    for movement in movements:
+        if args.bench:
+            bench(movement, args, params)
+        if args.check or not (args.bench or args.out):
+            check(movement, args, params)
+
+
+if __name__ == "__main__":
+    main()
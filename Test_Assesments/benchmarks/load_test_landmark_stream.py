@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Load test for landmark_stream_server - many simulated on-device pose clients
+
+Every simulated client streams a synthetic squat clip as landmark packets at
+the given frame rate, reads the rep/alert messages and finally asks for the
+results. Clients run in several processes so the load generator is not the
+bottleneck. The server keeps up when:
+
+  - state latency (packet sent -> matching state message received) stays low
+  - every frame sent is scored (frames in the results == frames sent)
+  - every stream counts the expected reps
+
+    python benchmarks/load_test_landmark_stream.py --spawn --streams 2000 --fps 30 --duration 20
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _run_server(port_queue):
+    from landmark_stream_server import serve
+    try:
+        asyncio.run(serve("127.0.0.1", 0, max_streams=100000, ready=port_queue.put))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _client(host, port, packets, fps, duration, rep_s, out):
+    from utils.websocket import connect, OP_BINARY, OP_TEXT, WebSocketClosed
+
+    await asyncio.sleep(random.random())  # Stagger connects over the first second
+    try:
+        ws = await connect(host, port, "/stream?exercises=squats&target=1000")
+    except (OSError, ConnectionError):
+        out['connect_failed'] += 1
+        return
+
+    sent_at = {}
+    results = {}
+
+    async def reader():
+        while True:
+            try:
+                _, payload = await ws.recv()
+            except (WebSocketClosed, asyncio.IncompleteReadError, ConnectionError):
+                return
+            message = json.loads(payload)
+            if message['type'] == 'results':
+                results.update(message)
+                return
+            sent = sent_at.pop(message.get('timestamp'), None)
+            if sent is not None:
+                out['latencies'].append(time.perf_counter() - sent)
+            results['reps'] = message.get('reps', 0)
+
+    read_task = asyncio.ensure_future(reader())
+    n_frames = int(duration * fps)
+    start = time.perf_counter()
+    try:
+        for i in range(n_frames):
+            delay = start + i / fps - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            ts, payload = packets[i % len(packets)]
+            ts += (i // len(packets)) * len(packets) / fps
+            if len(sent_at) > 256:
+                sent_at.clear()
+            sent_at[ts] = time.perf_counter()
+            ws.send(OP_BINARY, _with_timestamp(payload, ts))
+            await ws.drain()
+        finish_sent = time.perf_counter()
+        ws.send(OP_TEXT, b'{"type": "finish"}')
+        await ws.drain()
+        await asyncio.wait_for(read_task, timeout=30)
+    except (asyncio.TimeoutError, ConnectionError, OSError):
+        out['errors'] += 1
+        return
+    finally:
+        ws.writer.close()
+
+    out['finish_latencies'].append(time.perf_counter() - finish_sent)
+    out['frames_sent'] += n_frames
+    out['frames_scored'] += results.get('frames', 0)
+    expected_reps = int(n_frames / fps // rep_s)
+    reps = results['exercises'][0]['reps'] if results.get('exercises') else 0
+    if abs(reps - expected_reps) > 1:
+        out['wrong_reps'] += 1
+    out['completed'] += 1
+
+
+def _with_timestamp(payload, ts):
+    from utils.landmark_packet import PACKET_HEADER
+    return PACKET_HEADER.pack(ts) + payload[PACKET_HEADER.size:]
+
+
+def _client_process(host, port, streams, fps, duration, rep_s, result_queue):
+    from benchmarks.load_test_service import synthetic_squat_landmarks
+    from utils.landmark_packet import encode_landmark_packet
+
+    lms, t = synthetic_squat_landmarks(seconds=rep_s * 4, fps=fps, rep_s=rep_s)
+    packets = [(float(ts), encode_landmark_packet(frame, ts)) for frame, ts in zip(lms, t)]
+    out = {'latencies': [], 'finish_latencies': [], 'frames_sent': 0, 'frames_scored': 0,
+           'completed': 0, 'connect_failed': 0, 'errors': 0, 'wrong_reps': 0}
+
+    async def run_all():
+        await asyncio.gather(*(_client(host, port, packets, fps, duration, rep_s, out)
+                               for _ in range(streams)))
+
+    asyncio.run(run_all())
+    result_queue.put(out)
+
+
+def _percentile(data, p):
+    data = sorted(data)
+    if not data:
+        return 0.0
+    return data[min(len(data) - 1, int(math.ceil(p / 100 * len(data))) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the WebSocket landmark stream server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--spawn", action="store_true", help="Start a server process for the test")
+    parser.add_argument("--streams", type=int, default=1000, help="Concurrent simulated clients")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds each client streams")
+    parser.add_argument("--procs", type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                        help="Client processes")
+    parser.add_argument("--rep-seconds", type=float, default=2.5)
+    args = parser.parse_args()
+
+    server = None
+    port = args.port
+    if args.spawn:
+        port_queue = multiprocessing.Queue()
+        server = multiprocessing.Process(target=_run_server, args=(port_queue,), daemon=True)
+        server.start()
+        port = port_queue.get(timeout=30)
+
+    result_queue = multiprocessing.Queue()
+    procs = args.procs if args.streams >= args.procs else args.streams
+    shares = [args.streams // procs + (1 if i < args.streams % procs else 0) for i in range(procs)]
+    started = time.perf_counter()
+    workers = [multiprocessing.Process(target=_client_process,
+                                       args=(args.host, port, n, args.fps, args.duration,
+                                             args.rep_seconds, result_queue))
+               for n in shares]
+    for w in workers:
+        w.start()
+    outs = [result_queue.get() for _ in workers]
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - started
+
+    total = {key: sum(o[key] for o in outs) for key in outs[0] if not key.endswith('latencies')}
+    latencies = [x for o in outs for x in o['latencies']]
+    finish = [x for o in outs for x in o['finish_latencies']]
+
+    print(f"streams={args.streams} fps={args.fps:g} duration={args.duration:g}s "
+          f"client_procs={procs} wall={elapsed:.1f}s")
+    print(f"completed={total['completed']} connect_failed={total['connect_failed']} "
+          f"errors={total['errors']} wrong_reps={total['wrong_reps']}")
+    print(f"frames sent={total['frames_sent']} scored={total['frames_scored']} "
+          f"({total['frames_sent'] / args.duration:.0f} frames/s offered)")
+    print(f"state latency p50={_percentile(latencies, 50) * 1000:.1f}ms "
+          f"p95={_percentile(latencies, 95) * 1000:.1f}ms p99={_percentile(latencies, 99) * 1000:.1f}ms "
+          f"({len(latencies)} messages)")
+    print(f"results latency p50={_percentile(finish, 50) * 1000:.1f}ms "
+          f"p95={_percentile(finish, 95) * 1000:.1f}ms max={max(finish or [0]) * 1000:.1f}ms")
+
+    if server is not None:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
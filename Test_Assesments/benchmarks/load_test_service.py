@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Load test for assessment_service - reports sustained jobs per minute
+
+Runs N concurrent clients that upload, poll until the job finishes and repeat.
+429 responses are honoured with the server's Retry-After. By default each
+upload is a synthetic squat clip in the .npz landmark format, so the test
+measures the queue/worker/scoring path without pose models. Pass --video to
+upload a real clip instead.
+
+    python benchmarks/load_test_service.py --spawn --clients 8 --duration 30
+"""
+
+import argparse
+import io
+import json
+import math
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def synthetic_squat_landmarks(seconds=20.0, fps=30.0, rep_s=2.5):
+    """Side-view squat clip as (N, 33, 4) landmarks and timestamps"""
+    import numpy as np
+
+    n = int(seconds * fps)
+    t = np.arange(n) / fps
+    knee_angle = np.radians(170 - 85 * np.clip(np.sin(np.pi * (t % rep_s) / (rep_s - 0.5)), 0, None)
+                            * ((t % rep_s) < rep_s - 0.5))
+    lms = np.zeros((n, 33, 4), dtype=np.float32)
+    lms[:, :, 3] = 0.9
+    knee = np.array([0.5, 0.7])
+    ankle = np.array([0.5, 0.9])
+    hip = np.stack([knee[0] + 0.2 * np.sin(knee_angle), knee[1] + 0.2 * np.cos(knee_angle)], axis=1)
+    for idx in (23, 24):
+        lms[:, idx, :2] = hip
+    for idx in (11, 12):
+        lms[:, idx, :2] = hip - [0.0, 0.3]
+    lms[:, 25:27, :2] = knee
+    lms[:, 27:29, :2] = ankle
+    return lms, t
+
+
+def synthetic_squat_npz(seconds=20.0, fps=30.0, rep_s=2.5):
+    """Side-view squat clip encoded like a PoseCache entry"""
+    import numpy as np
+
+    lms, t = synthetic_squat_landmarks(seconds, fps, rep_s)
+    n = len(t)
+    buf = io.BytesIO()
+    np.savez(buf, landmarks=lms, timestamps=t, detected=np.ones(n, dtype=bool),
+             frame_size=np.array([960, 540], dtype=np.int32), fps=np.array(fps))
+    return buf.getvalue()
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.latencies = []
+
+    def percentile(self, p):
+        with self.lock:
+            data = sorted(self.latencies)
+        if not data:
+            return 0.0
+        return data[min(len(data) - 1, int(math.ceil(p / 100 * len(data))) - 1)]
+
+
+def client_loop(base_url, payload, content_type, query, deadline, stats):
+    while time.monotonic() < deadline:
+        started = time.monotonic()
+        req = urllib.request.Request(f"{base_url}/jobs?{query}", data=payload, method="POST",
+                                     headers={"Content-Type": content_type})
+        try:
+            with urllib.request.urlopen(req) as resp:
+                job_id = json.load(resp)['job_id']
+        except urllib.error.HTTPError as e:
+            if e.code == 429:
+                with stats.lock:
+                    stats.rejected += 1
+                time.sleep(float(e.headers.get("Retry-After", 1)))
+                continue
+            with stats.lock:
+                stats.failed += 1
+            continue
+
+        while True:
+            with urllib.request.urlopen(f"{base_url}/jobs/{job_id}") as resp:
+                status = json.load(resp)['status']
+            if status in ("done", "failed"):
+                break
+            time.sleep(0.02)
+
+        with stats.lock:
+            if status == "done":
+                stats.completed += 1
+                stats.latencies.append(time.monotonic() - started)
+            else:
+                stats.failed += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the assessment HTTP service")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--spawn", action="store_true", help="Start an in-process service for the test")
+    parser.add_argument("--workers", type=int, default=2, help="Service workers when --spawn is used")
+    parser.add_argument("--queue-size", type=int, default=16, help="Service queue size when --spawn is used")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--video", help="Upload this clip instead of synthetic landmarks")
+    parser.add_argument("--exercises", default="squats")
+    args = parser.parse_args()
+
+    server = service = None
+    base_url = args.url.rstrip("/")
+    if args.spawn:
+        from assessment_service import AssessmentService, make_server
+        service = AssessmentService(workers=args.workers, queue_size=args.queue_size)
+        service.start()
+        server = make_server(service, "127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    if args.video:
+        with open(args.video, "rb") as f:
+            payload = f.read()
+        content_type = "application/octet-stream"
+    else:
+        payload = synthetic_squat_npz()
+        content_type = "application/x-npz"
+
+    stats = Stats()
+    deadline = time.monotonic() + args.duration
+    started = time.monotonic()
+    clients = [threading.Thread(target=client_loop,
+                                args=(base_url, payload, content_type, f"exercises={args.exercises}",
+                                      deadline, stats))
+               for _ in range(args.clients)]
+    for t in clients:
+        t.start()
+    for t in clients:
+        t.join()
+    elapsed = time.monotonic() - started
+
+    print(f"clients={args.clients} duration={elapsed:.1f}s payload={len(payload) / 1024:.0f}KB")
+    print(f"completed={stats.completed} failed={stats.failed} rejected_429={stats.rejected}")
+    print(f"sustained throughput: {stats.completed / elapsed * 60:.1f} jobs/min")
+    print(f"latency p50={stats.percentile(50):.3f}s p95={stats.percentile(95):.3f}s")
+
+    if server is not None:
+        server.shutdown()
+        service.stop()
+
+
+if __name__ == "__main__":
+    main()
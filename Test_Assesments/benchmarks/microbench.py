@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks - per-call cost of the per-frame hot path, with a JSON history
+
+Times the pose helpers (angle_3pt, calculate_angle, pick_side_visibility,
+lm_xy), every exercise's update() and draw_feedback(), draw_hud,
+generate_feedback and save_assessment_results on deterministic synthetic
+clips (the fps_matrix motions with fixed-seed jitter). Recorded landmark
+files in the PoseCache/.npz upload layout can be added as extra fixtures.
+
+Each benchmark is calibrated to run for at least --min-time per repeat and
+reports the median and best per-call time over --repeat repeats (timeit
+style, with the garbage collector off). Saved runs are appended to a JSON
+history tagged with the git commit, and compare flags any benchmark whose
+median got slower by more than --threshold percent:
+
+    python benchmarks/microbench.py run --save                  # time everything, record it
+    python benchmarks/microbench.py run --filter update --recorded clip.npz
+    python benchmarks/microbench.py compare                     # latest saved run vs the one before
+    python benchmarks/microbench.py compare 1a2b3c -1 --threshold 5
+    python benchmarks/microbench.py history
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+HISTORY_PATH = os.path.join(BENCH_DIR, "results", "microbench_history.json")
+HISTORY_VERSION = 1
+FPS = 30.0
+CLIP_SECONDS = 10.0
+NOISE = 0.002
+WIDTH, HEIGHT = 960, 540
+
+
+# ---------------------------------------------------------------- fixtures
+
+class Fixture:
+    """One landmark clip, prebuilt as the exercises see it"""
+    __slots__ = ('name', 'landmarks', 'timestamps', 'width', 'height')
+
+    def __init__(self, name, arrays, timestamps, width=WIDTH, height=HEIGHT):
+        from utils.pose_utils import landmarks_from_array
+        self.name = name
+        self.landmarks = [landmarks_from_array(a) for a in arrays]
+        self.timestamps = [float(t) for t in timestamps]
+        self.width = width
+        self.height = height
+
+
+def synthetic_fixtures():
+    """{exercise type: Fixture} of the fps_matrix motions, jittered with a fixed seed"""
+    from benchmarks import fps_matrix as m
+
+    t = np.arange(int(CLIP_SECONDS * FPS)) / FPS
+    rng = np.random.default_rng(0)
+    fixtures = {}
+    for ex_type, clip in (('squats', m.squats_clip), ('pushups', m.pushups_clip),
+                          ('situps', m.situps_clip), ('plank', m.plank_clip),
+                          ('vertical_jump', m.vertical_jump_clip),
+                          ('one_leg_stand', m.one_leg_stand_clip)):
+        lms = clip(t)
+        lms[:, :, :2] += rng.normal(0.0, NOISE, lms[:, :, :2].shape)
+        fixtures[ex_type] = Fixture(ex_type, lms, t)
+    return fixtures
+
+
+def recorded_fixture(path):
+    """Fixture from a recorded landmark file (PoseCache entry / .npz upload layout)"""
+    from assessment_service import load_npz_entry
+
+    entry = load_npz_entry(path)
+    ok = np.asarray(entry['detected'], dtype=bool)
+    w, h = (int(v) for v in entry['frame_size'])
+    name = os.path.splitext(os.path.basename(path))[0]
+    return Fixture(name, entry['landmarks'][ok], entry['timestamps'][ok], w, h)
+
+
+def _replay(exercise, fixture, t0=0.0):
+    """Feed a fixture through an exercise on a frame clock starting at t0"""
+    from base_exercise import FrameClock
+
+    clock = exercise.clock if isinstance(exercise.clock, FrameClock) else FrameClock()
+    exercise.clock = clock
+    for lms, ts in zip(fixture.landmarks, fixture.timestamps):
+        clock.t = t0 + ts
+        exercise.update(lms, fixture.width, fixture.height)
+    return exercise
+
+
+def _exercise(ex_type):
+    from assessment_flow import create_exercise
+    # Targets far away, so nothing completes and stops doing work mid-benchmark
+    return create_exercise(ex_type, 10**9 if ex_type != 'vertical_jump' else None)
+
+
+# ---------------------------------------------------------------- cases
+#
+# A case is a setup function returning (step, ops): step() is the timed call
+# and performs `ops` operations, so results are per operation. Setup is never
+# timed and runs again before every repeat.
+
+def _pose_points(fixture):
+    """Pixel (hip, knee, ankle) triples from each frame"""
+    from utils.pose_utils import lm_xy
+    w, h = fixture.width, fixture.height
+    return [(lm_xy(f[23], w, h), lm_xy(f[25], w, h), lm_xy(f[27], w, h)) for f in fixture.landmarks]
+
+
+def case_angle_3pt(fixture):
+    from utils.pose_utils import angle_3pt
+    triples = _pose_points(fixture)
+
+    def step():
+        for a, b, c in triples:
+            angle_3pt(a, b, c)
+    return step, len(triples)
+
+
+def case_calculate_angle(fixture):
+    from utils.angle_calculator import calculate_angle
+    triples = _pose_points(fixture)
+
+    def step():
+        for a, b, c in triples:
+            calculate_angle(a, b, c)
+    return step, len(triples)
+
+
+def case_pick_side_visibility(fixture):
+    from utils.pose_utils import pick_side_visibility
+    frames = fixture.landmarks
+
+    def step():
+        for lms in frames:
+            pick_side_visibility(lms)
+    return step, len(frames)
+
+
+def case_lm_xy(fixture):
+    from utils.pose_utils import lm_xy
+    points = [lms[25] for lms in fixture.landmarks]
+    w, h = fixture.width, fixture.height
+
+    def step():
+        for lm in points:
+            lm_xy(lm, w, h)
+    return step, len(points)
+
+
+def case_update(ex_type, fixture):
+    """Steady-state update(): the clip replays back to back on one session"""
+    exercise = _exercise(ex_type)
+    offset = [0.0]
+    period = fixture.timestamps[-1] + 1.0 / FPS if fixture.timestamps else 0.0
+
+    def step():
+        _replay(exercise, fixture, offset[0])
+        offset[0] += period
+    return step, len(fixture.landmarks)
+
+
+def case_draw_feedback(ex_type, fixture):
+    exercise = _replay(_exercise(ex_type), fixture)
+    frame = np.zeros((fixture.height, fixture.width, 3), dtype=np.uint8)
+    frames = fixture.landmarks
+    w, h = fixture.width, fixture.height
+
+    def step():
+        for lms in frames:
+            exercise.draw_feedback(frame, lms, w, h)
+    return step, len(frames)
+
+
+def case_generate_feedback(ex_type, fixture):
+    exercise = _replay(_exercise(ex_type), fixture)
+    exercise.finalize_score()
+    return exercise.generate_feedback, 1
+
+
+def case_draw_hud(fixtures):
+    from assessment_flow import FitnessAssessment
+    from utils.pose_utils import draw_hud
+
+    assessment = FitnessAssessment.from_spec({'flow': 'default'})
+    assessment.next_exercise()
+    frame = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+
+    def step():
+        draw_hud(frame, assessment, "Benchmark")
+    return step, 1
+
+
+def case_save_results(fixtures, workdir):
+    """One CSV append of a finished default flow (finalizing scores included)"""
+    from assessment_flow import FitnessAssessment
+    from utils.results_manager import save_assessment_results
+
+    assessment = FitnessAssessment.from_spec({'flow': 'default'})
+    for entry, exercise in zip(assessment.spec['exercises'], assessment.exercises):
+        _replay(exercise, fixtures[entry['type']])
+    path = os.path.join(workdir, "results.csv")
+    if os.path.exists(path):
+        os.remove(path)
+
+    def step():
+        save_assessment_results(assessment.exercises, path)
+    return step, 1
+
+
+def build_cases(fixtures, recorded, workdir):
+    """[(name, setup)] in report order"""
+    squats = fixtures['squats']
+    cases = [
+        ('angle_3pt', lambda: case_angle_3pt(squats)),
+        ('calculate_angle', lambda: case_calculate_angle(squats)),
+        ('pick_side_visibility', lambda: case_pick_side_visibility(squats)),
+        ('lm_xy', lambda: case_lm_xy(squats)),
+        ('draw_hud', lambda: case_draw_hud(fixtures)),
+        ('save_assessment_results', lambda: case_save_results(fixtures, workdir)),
+    ]
+    clips = [(ex_type, ex_type, fixture) for ex_type, fixture in fixtures.items()]
+    clips += [(ex_type, f"{ex_type}@{fixture.name}", fixture)
+              for fixture in recorded for ex_type in fixtures]
+    for kind, make in (('update', case_update), ('draw_feedback', case_draw_feedback),
+                       ('generate_feedback', case_generate_feedback)):
+        for ex_type, label, fixture in clips:
+            cases.append((f"{kind}[{label}]",
+                          lambda make=make, ex_type=ex_type, fixture=fixture: make(ex_type, fixture)))
+    return cases
+
+
+# ---------------------------------------------------------------- timing
+
+def time_case(setup, repeat, min_time):
+    """Per-operation times in microseconds, one per repeat"""
+    step, ops = setup()
+    step()  # Warm-up: first calls pay for lazy imports and backend initialization
+    # Calibrate the loop count on a throwaway instance
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            step()
+        if time.perf_counter() - t0 >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    for _ in range(repeat):
+        step, ops = setup()
+        gc.collect()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            for _ in range(loops):
+                step()
+            elapsed = time.perf_counter() - t0
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        samples.append(elapsed / (loops * ops) * 1e6)
+    return samples, loops * ops
+
+
+def summarize(samples, calls):
+    ordered = sorted(samples)
+    return {'median_us': ordered[len(ordered) // 2], 'min_us': ordered[0],
+            'max_us': ordered[-1], 'repeat': len(samples), 'calls': calls}
+
+
+# ---------------------------------------------------------------- history
+
+def environment():
+    import cv2
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'opencv': cv2.__version__,
+            'machine': platform.machine(), 'system': platform.system(), 'cpus': os.cpu_count()}
+
+
+def git_revision():
+    """(short commit, dirty) of the working tree, or (None, None) outside git"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    cwd=BENCH_DIR, capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return {'version': HISTORY_VERSION, 'runs': []}
+    with open(path, encoding="utf-8") as f:
+        history = json.load(f)
+    if history.get('version') != HISTORY_VERSION:
+        raise ValueError(f"Unsupported benchmark history version {history.get('version')} in {path}")
+    return history
+
+
+def save_history(history, path):
+    """Write atomically, so an interrupted run never truncates the history"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def find_run(history, ref):
+    """A run by index (e.g. -1 is the latest) or by commit/label prefix, newest match first"""
+    runs = history['runs']
+    if not runs:
+        raise ValueError("Benchmark history is empty; run with --save first")
+    try:
+        index = int(ref)
+    except ValueError:
+        index = None
+    if index is not None and -len(runs) <= index < len(runs):
+        return runs[index]
+    for run in reversed(runs):
+        if (run.get('commit') or '').startswith(ref) or run.get('label') == ref:
+            return run
+    raise ValueError(f"No saved run matches {ref!r}")
+
+
+def _run_name(run):
+    tag = run.get('label') or run.get('commit') or '?'
+    return f"{tag}{'+' if run.get('dirty') else ''} ({run['timestamp']})"
+
+
+def compare_runs(base, head, threshold):
+    """[(name, base us, head us, change %, verdict)] over benchmarks in both runs"""
+    rows = []
+    for name, new in head['results'].items():
+        old = base['results'].get(name)
+        if old is None:
+            continue
+        change = (new['median_us'] - old['median_us']) / old['median_us'] * 100.0
+        verdict = 'REGRESSION' if change > threshold else 'faster' if change < -threshold else ''
+        rows.append((name, old['median_us'], new['median_us'], change, verdict))
+    return rows
+
+
+# ---------------------------------------------------------------- commands
+
+def cmd_run(args):
+    fixtures = synthetic_fixtures()
+    recorded = [recorded_fixture(path) for path in args.recorded]
+    with tempfile.TemporaryDirectory() as workdir:
+        cases = build_cases(fixtures, recorded, workdir)
+        if args.filter:
+            cases = [(name, setup) for name, setup in cases if any(f in name for f in args.filter.split(","))]
+
+        results = {}
+        print(f"{'benchmark':40s} {'median us':>10s} {'min us':>10s} {'max us':>10s}")
+        for name, setup in cases:
+            results[name] = summarize(*time_case(setup, args.repeat, args.min_time))
+            r = results[name]
+            print(f"{name:40s} {r['median_us']:10.2f} {r['min_us']:10.2f} {r['max_us']:10.2f}")
+
+    commit, dirty = git_revision()
+    run = {'timestamp': datetime.now().isoformat(timespec='seconds'), 'commit': commit, 'dirty': dirty,
+           'label': args.label, 'environment': environment(), 'results': results}
+    if args.save:
+        history = load_history(args.history)
+        history['runs'].append(run)
+        save_history(history, args.history)
+        print(f"Saved run {len(history['runs']) - 1} to {args.history}")
+    return run
+
+
+def cmd_compare(args):
+    history = load_history(args.history)
+    base, head = find_run(history, args.base), find_run(history, args.head)
+    if base['environment'] != head['environment']:
+        print("Warning: runs come from different environments; differences may not be the code")
+
+    rows = compare_runs(base, head, args.threshold)
+    print(f"base {_run_name(base)}  ->  head {_run_name(head)}  (threshold {args.threshold:g}%)")
+    print(f"{'benchmark':40s} {'base us':>10s} {'head us':>10s} {'change':>8s}")
+    for name, old, new, change, verdict in rows:
+        print(f"{name:40s} {old:10.2f} {new:10.2f} {change:+7.1f}%  {verdict}")
+    regressions = sum(1 for row in rows if row[4] == 'REGRESSION')
+    print(f"{regressions} regression(s) over {args.threshold:g}% in {len(rows)} benchmarks")
+    return 1 if regressions else 0
+
+
+def cmd_history(args):
+    history = load_history(args.history)
+    for i, run in enumerate(history['runs']):
+        print(f"{i:3d}  {_run_name(run)}  {len(run['results'])} benchmarks")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the per-frame hot path")
+    parser.add_argument("--history", default=HISTORY_PATH, help="JSON history file")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Time the benchmarks")
+    run.add_argument("--filter", help="Comma-separated substrings; only matching benchmarks run")
+    run.add_argument("--recorded", action="append", default=[],
+                     help="Recorded landmark .npz to use as an extra fixture (repeatable)")
+    run.add_argument("--repeat", type=int, default=7)
+    run.add_argument("--min-time", type=float, default=0.05, help="Seconds per repeat (loops are calibrated)")
+    run.add_argument("--save", action="store_true", help="Append the run to the history")
+    run.add_argument("--label", help="Name to store with the run (defaults to the git commit)")
+
+    compare = sub.add_parser("compare", help="Flag regressions between two saved runs")
+    compare.add_argument("base", nargs="?", default="-2", help="Run index, commit or label (default: -2)")
+    compare.add_argument("head", nargs="?", default="-1", help="Run index, commit or label (default: -1)")
+    compare.add_argument("--threshold", type=float, default=10.0, help="Percent slowdown that fails")
+
+    sub.add_parser("history", help="List saved runs")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        cmd_run(args)
+    elif args.command == "compare":
+        try:
+            sys.exit(cmd_compare(args))
+        except ValueError as e:
+            sys.exit(f"compare: {e}")
+    else:
+        cmd_history(args)
+
+
+if __name__ == "__main__":
+    main()
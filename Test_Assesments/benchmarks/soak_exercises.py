@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Soak test - hours of synthetic frames through each exercise, memory must stay flat
+
+Replays a repeating synthetic clip (a rep, sway or jump every 2.5 s) through
+one exercise at a time with an ever-advancing frame clock, as a kiosk left on
+one exercise would. After a warm-up long enough to fill every fixed-capacity
+history, it samples process RSS and the exercise snapshot size once per
+simulated hour and fails if either keeps growing:
+
+    python benchmarks/soak_exercises.py                      # 8 h per exercise
+    python benchmarks/soak_exercises.py --hours 1 --exercises squats,situps
+"""
+
+import argparse
+import gc
+import os
+import resource
+import sys
+import time
+import zlib
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CYCLE_S = 2.5
+
+
+def rss_mb():
+    """Current resident set size (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def vertical_jump_clip(t):
+    """Standing, with a jump (hips and ankles lifted for 0.4 s) late in every cycle"""
+    from benchmarks.fps_matrix import vertical_jump_clip as standing
+    lms = standing(t)
+    phase = t % CYCLE_S
+    bump = np.where((phase >= 1.5) & (phase < 1.9), np.sin(np.pi * (phase - 1.5) / 0.4), 0.0)
+    lms[:, 23:25, 1] -= (0.12 * bump)[:, None]
+    lms[:, 27:31, 1] -= (0.5 * bump)[:, None]
+    lms[:, 25:27, 1] = (lms[:, 23:25, 1] + lms[:, 27:29, 1]) / 2
+    return lms
+
+
+def soak_clips():
+    from benchmarks import fps_matrix as m
+    return {
+        'squats': m.squats_clip,
+        'pushups': lambda t: m.pushups_clip(t, sag=0.16),  # Form errors every rep
+        'situps': m.situps_clip,
+        'plank': lambda t: m.plank_clip(t, hold_s=float('inf')),
+        'vertical_jump': vertical_jump_clip,
+        'one_leg_stand': m.one_leg_stand_clip,
+    }
+
+
+def soak(ex_type, hours, fps, warmup_hours):
+    """(simulated hour, RSS MB, snapshot bytes) at the end of warm-up, hourly, and at the end
+
+    Snapshot size is measured uncompressed (the JSON text): the compressed
+    size swings with the values themselves.
+    """
+    from assessment_flow import create_exercise
+    from base_exercise import FrameClock
+    from utils.pose_utils import landmarks_from_array
+
+    # One cycle of landmark lists, reused; update() never mutates them
+    t = np.arange(int(round(CYCLE_S * fps))) / fps
+    frames = [landmarks_from_array(f) for f in soak_clips()[ex_type](t)]
+
+    exercise = create_exercise(ex_type, 10**9 if ex_type != 'vertical_jump' else None)
+    clock = FrameClock()
+    exercise.clock = clock
+    update = exercise.update
+    n_cycle = len(frames)
+    total = int(hours * 3600 * fps)
+    per_hour = int(3600 * fps)
+    warmup = int(warmup_hours * 3600 * fps)
+
+    samples = []
+    for i in range(total):
+        clock.t = i / fps
+        update(frames[i % n_cycle], 960, 540)
+        done = i + 1
+        if done == total or (done >= warmup and (done - warmup) % per_hour == 0):
+            gc.collect()
+            samples.append((done / (3600 * fps), rss_mb(), len(zlib.decompress(exercise.snapshot()))))
+    return exercise, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check exercise memory stays flat over long sessions")
+    parser.add_argument("--hours", type=float, default=8.0, help="Simulated hours per exercise")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--warmup-hours", type=float, default=0.5,
+                        help="Simulated time before the baseline sample (fills the ring buffers)")
+    parser.add_argument("--exercises", help="Comma-separated types (default: all built-ins)")
+    parser.add_argument("--max-growth-mb", type=float, default=2.0, help="Allowed RSS growth after warm-up")
+    parser.add_argument("--max-snapshot-growth", type=float, default=0.1,
+                        help="Allowed relative snapshot size growth after warm-up")
+    args = parser.parse_args()
+
+    types = args.exercises.split(",") if args.exercises else list(soak_clips())
+    failures = 0
+    print(f"{'exercise':14s} {'frames':>9s} {'wall s':>7s} {'reps':>6s} {'errors':>6s} "
+          f"{'rss MB':>15s} {'snapshot B':>15s}")
+    for ex_type in types:
+        started = time.perf_counter()
+        exercise, samples = soak(ex_type, args.hours, args.fps, args.warmup_hours)
+        wall = time.perf_counter() - started
+        (_, rss0, snap0), (_, rss1, snap1) = samples[0], samples[-1]
+        rss_growth = max(rss for _, rss, _ in samples) - rss0
+        snap_growth = (max(s for _, _, s in samples) - snap0) / snap0
+        ok = rss_growth <= args.max_growth_mb and snap_growth <= args.max_snapshot_growth
+        failures += not ok
+        reps = exercise.jump_heights_flight.count if ex_type == 'vertical_jump' else exercise.reps
+        print(f"{ex_type:14s} {int(args.hours * 3600 * args.fps):9d} {wall:7.1f} {reps:6d} {exercise.form_errors:6d} "
+              f"{rss0:6.1f} -> {rss1:6.1f} {snap0:6d} -> {snap1:6d}  {'ok' if ok else 'GROWING'}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
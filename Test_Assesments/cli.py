@@ -0,0 +1,69 @@
+"""
+Interactive CLI prompts - Turns the console menu into a declarative flow spec
+
+All input()/print() for choosing a flow lives here; the assessment itself is
+built from the resulting spec (see assessment_flow.normalize_spec).
+"""
+
+from exercises.registry import exercise_types, get_exercise_info
+
+
+def menu_mapping():
+    """Menu number -> exercise type, in registry order"""
+    return {i: ex_type for i, ex_type in enumerate(exercise_types(), start=1)}
+
+
+def prompt_exercise_targets(selected_exercise_types):
+    """Ask for a target per exercise; returns spec entries"""
+    entries = []
+    for ex_type in selected_exercise_types:
+        info = get_exercise_info(ex_type)
+        if info.target_prompt:
+            prompt, default = info.target_prompt, info.default_target
+            value = input(prompt) or str(default)
+            target = int(value) if value.isdigit() else default
+            entries.append({'type': ex_type, 'target': target})
+        else:
+            entries.append({'type': ex_type})
+    return entries
+
+
+def prompt_flow_spec(user_height_cm=170):
+    """Show the flow menu and return the chosen flow as a spec dict"""
+    print("FITNESS ASSESSMENT SYSTEM")
+    print("="*40)
+    print("Choose your assessment flow:")
+    print("1. Default scientific flow (recommended by fitness coaches)")
+    print("2. Custom flow (choose your own exercises)")
+
+    choice = input("Enter your choice (1 or 2): ").strip()
+
+    if choice == "2":
+        mapping = menu_mapping()
+        print("\nAvailable exercises:")
+        for number, ex_type in mapping.items():
+            print(f"{number}. {get_exercise_info(ex_type).menu_label}")
+
+        selected = input("Enter exercise numbers separated by commas (e.g., 1,3,5): ").strip()
+        selected_types = []
+        for x in selected.split(","):
+            if x.strip().isdigit() and int(x.strip()) in mapping:
+                selected_types.append(mapping[int(x.strip())])
+
+        if selected_types:
+            return {'flow': 'custom', 'user_height_cm': user_height_cm,
+                    'exercises': prompt_exercise_targets(selected_types)}
+        print("No valid exercises selected. Using default flow.")
+
+    return {'flow': 'default', 'user_height_cm': user_height_cm}
+
+
+def print_instructions():
+    print("\nStarting assessment...")
+    print("Instructions:")
+    print("- Make sure you have enough space around you")
+    print("- Position yourself so your whole body is visible in the camera")
+    print("- Follow the on-screen instructions for each exercise")
+    print("- Press 'n' to move to the next exercise")
+    print("- Press 'q' to quit the assessment")
+    print("- Press 's' to save your results")
@@ -1,13 +1,12 @@
 """
 Exercises package - Contains all exercise implementations
+
+Exercise modules pull in cv2 and NumPy, so they are imported on first
+attribute access rather than when the package is imported. The class ->
+module mapping comes from exercises.registry.
 """
 
-from .squats import Squats
-from .pushups import Pushups
-from .situps import Situps
-from .plank import Plank
-from .vertical_jump import VerticalJump
-from .one_leg_stand import OneLegStand
+import importlib
 
 __all__ = [
     'Squats',
@@ -16,4 +15,15 @@ __all__ = [
     'Plank',
     'VerticalJump',
     'OneLegStand'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    from .registry import find_class_module
+    module_path = find_class_module(name) if not name.startswith('_') else None
+    if module_path is not None:
+        module = importlib.import_module(module_path, __name__)
+        value = getattr(module, name)
+        globals()[name] = value  # Cache so later lookups skip __getattr__
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
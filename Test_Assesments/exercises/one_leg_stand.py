@@ -2,16 +2,17 @@
 One-Leg Stand Exercise Implementation (Upgraded with Feedback)
 """
 
-import time
 import cv2
 from base_exercise import BaseExercise, FitnessComponent
+from utils.events import EventType
 
 class OneLegStand(BaseExercise):
     def __init__(self, name, component, ideal_time=30):
         super().__init__(name, component, ideal_time=ideal_time)
         self.start_time = None
         self.balance_lost = False
-        self.sway_frames = 0
+        self.sway_start_t = None
+        self.sway_error_s = 0.33  # sway sustained this long counts as a form error
         self.total_frames = 0
         self.error_threshold = 0.1  # hip deviation threshold
         self.form_errors = 0
@@ -26,11 +27,12 @@ class OneLegStand(BaseExercise):
         return self.score
 
     def update(self, landmarks, frame_width, frame_height):
+        now = self.clock()
         if self.start_time is None:
-            self.start_time = time.time()
+            self.start_time = now
 
         if not self.balance_lost:
-            self.duration = time.time() - self.start_time
+            self.duration = now - self.start_time
 
         self.total_frames += 1
 
@@ -38,8 +40,9 @@ class OneLegStand(BaseExercise):
         lankle = landmarks[27]  # LEFT_ANKLE
         rankle = landmarks[28]  # RIGHT_ANKLE
         balance_lost_now = lankle.y < 0.8 and rankle.y < 0.8
-        if balance_lost_now:
+        if balance_lost_now and not self.balance_lost:
             self.balance_lost = True
+            self.emit(EventType.STAGE_CHANGED, stage='balance_lost', duration=self.duration)
 
         # Hip sway detection
         lhip = landmarks[23]
@@ -48,13 +51,15 @@ class OneLegStand(BaseExercise):
         sway_detected = abs(hip_x - 0.5) > self.error_threshold
 
         if sway_detected:
-            self.sway_frames += 1
-            # Add form error for sustained sway (>10 frames)
-            if self.sway_frames >= 10:
+            if self.sway_start_t is None:
+                self.sway_start_t = now
+            # Add form error for sustained sway
+            elif now - self.sway_start_t >= self.sway_error_s:
                 self.form_errors += 1
-                self.sway_frames = 0
+                self.emit(EventType.FORM_ERROR, error='hip_sway', hip_offset=abs(hip_x - 0.5))
+                self.sway_start_t = now
         else:
-            self.sway_frames = 0  # reset if stable
+            self.sway_start_t = None  # reset if stable
 
     def draw_feedback(self, frame, landmarks, frame_width, frame_height):
         status_text = f"Time: {self.duration:.1f}s"
@@ -66,14 +71,19 @@ class OneLegStand(BaseExercise):
             cv2.putText(frame, status_text, (10, 90),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
 
+        for alert in self.form_alerts(landmarks, frame_width, frame_height):
+            cv2.putText(frame, alert,
+                        (frame_width // 2 - 150, 90),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+
+    def form_alerts(self, landmarks, frame_width, frame_height):
         # Real-time sway feedback
         lhip = landmarks[23]
         rhip = landmarks[24]
         hip_x = (lhip.x + rhip.x) / 2
         if abs(hip_x - 0.5) > self.error_threshold:
-            cv2.putText(frame, "SWAY DETECTED: Try to stabilize!",
-                        (frame_width // 2 - 150, 90),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+            return ["SWAY DETECTED: Try to stabilize!"]
+        return []
 
     def generate_feedback(self):
         feedback = [
@@ -94,6 +104,6 @@ class OneLegStand(BaseExercise):
         super().reset()
         self.start_time = None
         self.balance_lost = False
-        self.sway_frames = 0
+        self.sway_start_t = None
         self.total_frames = 0
         self.form_errors = 0
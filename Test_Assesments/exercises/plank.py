@@ -3,10 +3,11 @@ Plank Exercise Implementation
 """
 
 import numpy as np
-from collections import deque
-import time
 import cv2
 from base_exercise import BaseExercise, FitnessComponent
+from utils.events import EventType
+from utils.analysis_scheduler import AnalysisScheduler, EVERY_MS
+from utils.rolling_stats import RollingStats
 from utils.pose_utils import angle_3pt, lm_xy, pick_side_visibility
 
 
@@ -27,9 +28,6 @@ class Plank(BaseExercise):
         self.break_threshold = 2.0  # 2 seconds continuous break ends the test
         
         # Form tracking
-        self.hip_angles = deque(maxlen=30)
-        self.deviations = deque(maxlen=100)
-        self.hip_y_positions = deque(maxlen=30)
         self.state = "calibrating"  # Changed from "not_started" to "calibrating"
         
         # Quality metrics
@@ -37,13 +35,22 @@ class Plank(BaseExercise):
         self.symmetry_score = 100.0
         self.stability_score = 100.0
         self.form_quality = 1.0
+        self.asymmetry_total = 0.0    # Sum of sampled left/right hip angle differences
+        self.asymmetry_samples = 0
+        
+        # Head deviation is one angle per frame; symmetry changes slowly, so sample it
+        self.head_deviation = 0.0
+        self.analyses = AnalysisScheduler()
+        self.analyses.add('symmetry', 'sample_symmetry', EVERY_MS, every=500)
         
         # Side detection
         self.detected_side = None
         self.baseline_hip_angle = None
         self.calibrated = False
-        self.calibration_frames = deque(maxlen=30)  # Store 30 frames for calibration
+        self.calibration_frames = RollingStats(window=1024)  # Hip angles seen during calibration
+        self.calibration_s = 1.0  # Seconds of steady posture used for the baseline
         self.calibration_start_time = None
+        self.calibration_elapsed = 0.0
         
     def distance_2d(self, point1, point2):
         """Calculate 2D distance between two points"""
@@ -144,6 +151,18 @@ class Plank(BaseExercise):
         except:
             return 0.0  # Return 0 if any landmarks are not visible
     
+    def sample_symmetry(self, landmarks, frame_width, frame_height):
+        """Scheduled: fold one left/right comparison into the symmetry score while holding"""
+        if self.state != "valid":
+            return None
+        asymmetry = self.calculate_symmetry(landmarks, frame_width, frame_height)
+        if np.isnan(asymmetry):
+            return None
+        self.asymmetry_total += asymmetry
+        self.asymmetry_samples += 1
+        self.symmetry_score = max(0.0, 100.0 - 2.0 * self.asymmetry_total / self.asymmetry_samples)
+        return asymmetry
+
     def check_landmark_visibility(self, landmarks, indices):
         """Check if landmarks are visible"""
         for idx in indices:
@@ -151,22 +170,24 @@ class Plank(BaseExercise):
                 return False
         return True
     
-    def calibrate(self, hip_angle):
+    def calibrate(self, hip_angle, current_time):
         """Calibrate based on initial posture"""
         if self.calibration_start_time is None:
-            self.calibration_start_time = time.time()
+            self.calibration_start_time = current_time
             
-        self.calibration_frames.append(hip_angle)
+        self.calibration_frames.push(hip_angle)
+        self.calibration_elapsed = current_time - self.calibration_start_time
         
-        if len(self.calibration_frames) >= 30:  # After 30 frames
-            self.baseline_hip_angle = np.mean(self.calibration_frames)
+        if self.calibration_elapsed >= self.calibration_s:
+            self.baseline_hip_angle = self.calibration_frames.mean
             self.calibrated = True
             self.state = "ready"  # Change state to ready after calibration
+            self.emit(EventType.CALIBRATION_DONE, baseline_hip_angle=float(self.baseline_hip_angle))
             return True
         return False
     
     def update(self, landmarks, frame_width, frame_height):
-        current_time = time.time()
+        current_time = self.clock()
         
         # Calculate metrics
         hip_angle = self.calculate_hip_angle(landmarks, frame_width, frame_height)
@@ -176,17 +197,8 @@ class Plank(BaseExercise):
         if np.isnan(hip_angle) or np.isnan(torso_leg_deviation) or np.isnan(head_deviation):
             return
         
-        # Store metrics for analysis
-        self.hip_angles.append(hip_angle)
-        self.deviations.append(abs(hip_angle - self.hip_angle_threshold))
-        
-        # Store hip y-position for stability analysis
-        if self.detected_side == 'L':
-            hip = landmarks[23]
-        else:
-            hip = landmarks[24]
-        hx, hy = lm_xy(hip, frame_width, frame_height)
-        self.hip_y_positions.append(hy)
+        self.head_deviation = head_deviation
+        self.analyses.on_frame(self, current_time, 0, landmarks, frame_width, frame_height)
         
         # Check landmark visibility
         if self.detected_side == 'L':
@@ -196,8 +208,7 @@ class Plank(BaseExercise):
         
         # Calibration phase
         if not self.calibrated:
-            if self.calibrate(hip_angle):
-                print("Plank calibration complete!")
+            self.calibrate(hip_angle, current_time)
             return
         
         # Check if posture is valid
@@ -214,6 +225,7 @@ class Plank(BaseExercise):
             self.state = "valid"
             self.plank_start_time = current_time
             self.last_valid_time = current_time
+            self.emit(EventType.STAGE_CHANGED, stage='valid')
         
         elif self.state == "valid":
             if is_valid:
@@ -226,6 +238,7 @@ class Plank(BaseExercise):
                     # End the plank
                     self.state = "completed"
                     self.valid_duration = self.duration
+                    self.emit(EventType.STAGE_CHANGED, stage='completed', duration=self.duration)
                 # Still within break allowance, don't change state
         
         elif self.state == "completed":
@@ -261,8 +274,7 @@ class Plank(BaseExercise):
         
         # Display calibration status
         if not self.calibrated:
-            cal_progress = len(self.calibration_frames)
-            cal_text = f"Calibration: {cal_progress}/30 frames"
+            cal_text = f"Calibration: {self.calibration_elapsed:.1f}/{self.calibration_s:.1f}s"
             cv2.putText(frame, cal_text, (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 2)
             cv2.putText(frame, "Hold still in plank position", (10, 120), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 2)
@@ -280,16 +292,23 @@ class Plank(BaseExercise):
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
         
         # Real-time feedback
+        for i, alert in enumerate(self.form_alerts(landmarks, frame_width, frame_height)):
+            cv2.putText(frame, alert, (frame_width//2 - 150, 30 + 30 * i), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+
+    def form_alerts(self, landmarks, frame_width, frame_height):
+        if not self.calibrated:
+            return []
+        alerts = []
         hip_angle = self.calculate_hip_angle(landmarks, frame_width, frame_height)
         if not np.isnan(hip_angle):
             if abs(hip_angle - self.baseline_hip_angle) > self.hip_angle_tolerance:
-                cv2.putText(frame, "ADJUST HIP POSITION", (frame_width//2 - 150, 30), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+                alerts.append("ADJUST HIP POSITION")
             
             torso_dev = self.calculate_torso_leg_deviation(landmarks, frame_width, frame_height)
             if torso_dev > self.torso_leg_deviation_threshold:
-                cv2.putText(frame, "STRAIGHTEN BODY", (frame_width//2 - 120, 60), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+                alerts.append("STRAIGHTEN BODY")
+        return alerts
     
     def calculate_score(self):
         """Calculate final score based on duration and form quality"""
@@ -343,16 +362,18 @@ class Plank(BaseExercise):
         self.plank_start_time = None
         self.valid_duration = 0.0
         self.last_valid_time = None
-        self.hip_angles.clear()
-        self.deviations.clear()
-        self.hip_y_positions.clear()
         self.state = "calibrating"  # Reset to calibrating
         self.avg_deviation = 0.0
         self.symmetry_score = 100.0
         self.stability_score = 100.0
         self.form_quality = 1.0
+        self.asymmetry_total = 0.0
+        self.asymmetry_samples = 0
+        self.head_deviation = 0.0
+        self.analyses.clear()
         self.detected_side = None
         self.baseline_hip_angle = None
         self.calibrated = False
         self.calibration_frames.clear()
-        self.calibration_start_time = None
\ No newline at end of file
+        self.calibration_start_time = None
+        self.calibration_elapsed = 0.0
\ No newline at end of file
@@ -3,10 +3,11 @@ Push-ups Exercise Implementation (Corrected + Feedback)
 """
 
 import numpy as np
-from collections import deque
-import time
 import cv2
 from base_exercise import BaseExercise, FitnessComponent
+from utils.events import EventType
+from utils.rep_history import RepHistory
+from utils.rolling_stats import RollingStats
 from utils.pose_utils import angle_3pt, pick_side_visibility, lm_xy
 
 class Pushups(BaseExercise):
@@ -15,20 +16,21 @@ class Pushups(BaseExercise):
         self.down_thresh = 90.0
         self.up_thresh = 160.0
         self.min_interval = 1.0
-        self.smooth_n = 5
-        self.elbow_angles = deque(maxlen=self.smooth_n)
+        self.smooth_s = 0.15  # Angle smoothing window in seconds (5 frames at 30 fps)
+        self.elbow_angles = RollingStats(window=64, time_window=self.smooth_s)
         self.stage = 'up'
         self.last_rep_t = 0.0
 
         # form tracking
-        self.hip_error_count = 0
+        self.hip_error_count = 0      # frames of the rep spent in sustained bad posture
         self.rep_frame_count = 0
-        self.consecutive_error_frames = 0
+        self.error_start_t = None     # when the current run of bad posture began
+        self.error_sustain_s = 0.33   # bad posture must last this long to count
         self.error_threshold = 0.12   # relaxed threshold (12%)
 
         # feedback tracking
-        self.rep_depths = []   # stores min elbow angle per rep
-        self.rep_extensions = []  # stores max elbow angle per rep
+        self.rep_depths = RepHistory()      # min elbow angle per rep
+        self.rep_extensions = RepHistory()  # max elbow angle per rep
 
     def calculate_score(self):
         if self.ideal_reps:
@@ -75,26 +77,26 @@ class Pushups(BaseExercise):
         if np.isnan(elbow_angle):
             return
 
-        self.elbow_angles.append(elbow_angle)
-        avg = np.nanmean(self.elbow_angles)
+        now = self.clock()
+        self.elbow_angles.push(elbow_angle, now)
+        avg = self.elbow_angles.mean
 
         # update frame counters
         self.rep_frame_count += 1
         if hip_alignment_error:
-            self.consecutive_error_frames += 1
+            if self.error_start_t is None:
+                self.error_start_t = now
+            # only count error if sustained bad posture
+            if now - self.error_start_t >= self.error_sustain_s:
+                self.hip_error_count += 1
         else:
-            self.consecutive_error_frames = 0
-
-        # only count error if sustained bad posture
-        if self.consecutive_error_frames >= 10:  # ~⅓ sec at 30fps
-            self.hip_error_count += 1
-            self.consecutive_error_frames = 0  # avoid overcounting
+            self.error_start_t = None
 
         # rep logic
-        now = time.time()
         if self.stage == 'up' and avg <= self.down_thresh:
             self.stage = 'down'
             self.current_min_angle = avg  # start tracking depth
+            self.emit(EventType.STAGE_CHANGED, stage='down', elbow_angle=avg)
         elif self.stage == 'down' and avg >= self.up_thresh:
             if now - self.last_rep_t >= self.min_interval:
                 self.reps += 1
@@ -103,22 +105,33 @@ class Pushups(BaseExercise):
                 # decide rep-level error
                 if self.hip_error_count > (0.3 * self.rep_frame_count):
                     self.form_errors += 1
+                    self.emit(EventType.FORM_ERROR, error='hip_alignment',
+                              error_frames=self.hip_error_count, rep_frames=self.rep_frame_count)
 
                 # record depth/extension feedback
                 self.rep_depths.append(self.current_min_angle)
                 self.rep_extensions.append(avg)
+                self.emit(EventType.REP_COMPLETED, reps=self.reps, depth_angle=self.current_min_angle,
+                          extension_angle=avg)
 
                 # reset per-rep counters
                 self.hip_error_count = 0
                 self.rep_frame_count = 0
-                self.consecutive_error_frames = 0
+                self.error_start_t = None
 
             self.stage = 'up'
+            self.emit(EventType.STAGE_CHANGED, stage='up', elbow_angle=avg)
 
     def draw_feedback(self, frame, landmarks, frame_width, frame_height):
         cv2.putText(frame, f"Reps: {self.reps}", (10, 90),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
 
+        for alert in self.form_alerts(landmarks, frame_width, frame_height):
+            cv2.putText(frame, alert,
+                        (frame_width // 2 - 150, 90),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+
+    def form_alerts(self, landmarks, frame_width, frame_height):
         # Check hip alignment (real-time feedback)
         lshoulder = landmarks[11]
         rshoulder = landmarks[12]
@@ -137,9 +150,8 @@ class Pushups(BaseExercise):
         )
 
         if hip_alignment_error:
-            cv2.putText(frame, "FORM ERROR: Keep body straight!",
-                        (frame_width // 2 - 150, 90),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+            return ["FORM ERROR: Keep body straight!"]
+        return []
 
     def generate_feedback(self):
         """Generate descriptive feedback after test ends"""
@@ -149,7 +161,7 @@ class Pushups(BaseExercise):
         feedback.append(f"Form Errors: {self.form_errors}")
 
         if self.rep_depths:
-            avg_depth = np.mean(self.rep_depths)
+            avg_depth = self.rep_depths.mean
             if avg_depth <= 95:
                 feedback.append("Depth: Excellent (chest low enough)")
             elif avg_depth <= 110:
@@ -158,7 +170,7 @@ class Pushups(BaseExercise):
                 feedback.append("Depth: Too shallow, bend elbows more")
 
         if self.rep_extensions:
-            avg_extension = np.mean(self.rep_extensions)
+            avg_extension = self.rep_extensions.mean
             if avg_extension >= 160:
                 feedback.append("Lockout: Full extension at top")
             else:
@@ -178,6 +190,6 @@ class Pushups(BaseExercise):
         self.last_rep_t = 0.0
         self.hip_error_count = 0
         self.rep_frame_count = 0
-        self.consecutive_error_frames = 0
-        self.rep_depths = []
-        self.rep_extensions = []
+        self.error_start_t = None
+        self.rep_depths.clear()
+        self.rep_extensions.clear()
@@ -0,0 +1,140 @@
+"""
+Exercise Registry - Declares every exercise the assessment can run
+
+Each exercise is registered with its type name, display name, fitness
+component, default target and the module/class that implements it. The
+implementing module is imported only when that exercise is actually built,
+so a session loads just the analyzers it uses.
+
+Third-party packages add exercises without touching this file by exposing an
+entry point in the "fitness_assessment.exercises" group that points at a
+function calling register_exercise():
+
+    # pyproject.toml
+    [project.entry-points."fitness_assessment.exercises"]
+    lunges = "my_plugin.registration:register"
+
+    # my_plugin/registration.py
+    from base_exercise import FitnessComponent
+    from exercises.registry import register_exercise
+
+    def register():
+        register_exercise('lunges', "Lunges", FitnessComponent.STRENGTH,
+                          module='my_plugin.lunges', class_name='Lunges',
+                          target_kw='ideal_reps', default_target=12,
+                          target_prompt="How many lunges would you like to do? (Default 12): ")
+
+Entry points are only scanned when a name is not a built-in or when the full
+list is needed (menu), so the default flow never pays for the scan.
+"""
+
+import importlib
+
+from base_exercise import FitnessComponent
+
+ENTRY_POINT_GROUP = "fitness_assessment.exercises"
+
+
+class ExerciseInfo:
+    """Registration record for one exercise type"""
+    __slots__ = ('type_name', 'display_name', 'component', 'module', 'class_name',
+                 'target_kw', 'default_target', 'target_prompt', 'factory')
+
+    def __init__(self, type_name, display_name, component, module, class_name, target_kw=None,
+                 default_target=None, target_prompt=None, factory=None):
+        self.type_name = type_name
+        self.display_name = display_name
+        self.component = component
+        self.module = module
+        self.class_name = class_name
+        self.target_kw = target_kw
+        self.default_target = default_target
+        self.target_prompt = target_prompt
+        self.factory = factory
+
+    @property
+    def menu_label(self):
+        return f"{self.display_name} ({self.component.name.title()})"
+
+    def load(self):
+        """Import the implementing module and return the exercise class"""
+        package = 'exercises' if self.module.startswith('.') else None
+        return getattr(importlib.import_module(self.module, package), self.class_name)
+
+    def create(self, target=None, user_height_cm=170):
+        cls = self.load()
+        if self.factory is not None:
+            return self.factory(cls, self, target, user_height_cm)
+        if self.target_kw is None:
+            return cls(self.display_name, self.component)
+        return cls(self.display_name, self.component,
+                   **{self.target_kw: target if target is not None else self.default_target})
+
+
+_REGISTRY = {}
+_plugins_loaded = False
+
+
+def register_exercise(type_name, display_name, component, module, class_name, target_kw=None,
+                      default_target=None, target_prompt=None, factory=None):
+    """Add (or replace) an exercise type; returns its ExerciseInfo"""
+    info = ExerciseInfo(type_name, display_name, component, module, class_name, target_kw,
+                        default_target, target_prompt, factory)
+    _REGISTRY[type_name] = info
+    return info
+
+
+def load_plugins():
+    """Run every registration entry point once"""
+    global _plugins_loaded
+    if _plugins_loaded:
+        return
+    _plugins_loaded = True
+    from importlib.metadata import entry_points
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            ep.load()()
+        except Exception as e:
+            print(f"Warning: could not load exercise plugin {ep.name}: {e}")
+
+
+def get_exercise_info(type_name):
+    if type_name not in _REGISTRY:
+        load_plugins()
+    if type_name not in _REGISTRY:
+        raise ValueError(f"Unknown exercise type: {type_name}")
+    return _REGISTRY[type_name]
+
+
+def exercise_types():
+    """Registered type names in registration order (built-ins first)"""
+    load_plugins()
+    return list(_REGISTRY)
+
+
+def find_class_module(class_name):
+    """Module path registered for an exercise class name, or None"""
+    for info in _REGISTRY.values():
+        if info.class_name == class_name:
+            return info.module
+    return None
+
+
+def _vertical_jump_factory(cls, info, target, user_height_cm):
+    # Jumps have no target; calibration needs the athlete's height instead
+    return cls(info.display_name, info.component, user_height_cm=user_height_cm)
+
+
+register_exercise('squats', "Squats", FitnessComponent.STRENGTH, '.squats', 'Squats',
+                  'ideal_reps', 15, "How many squats would you like to do? (Default 15): ")
+register_exercise('pushups', "Push-ups", FitnessComponent.STRENGTH, '.pushups', 'Pushups',
+                  'ideal_reps', 12, "How many push-ups would you like to do? (Default 12): ")
+register_exercise('situps', "Sit-ups", FitnessComponent.ENDURANCE, '.situps', 'Situps',
+                  'ideal_reps', 20, "How many sit-ups would you like to do? (Default 20): ")
+register_exercise('plank', "Plank", FitnessComponent.ENDURANCE, '.plank', 'Plank',
+                  'ideal_time', 60, "How long would you like to plank (seconds)? (Default 60): ")
+register_exercise('vertical_jump', "Vertical Jump", FitnessComponent.POWER, '.vertical_jump',
+                  'VerticalJump', factory=_vertical_jump_factory)
+register_exercise('one_leg_stand', "One-Leg Stand", FitnessComponent.BALANCE, '.one_leg_stand',
+                  'OneLegStand', 'ideal_time', 30,
+                  "How long would you like to balance (seconds)? (Default 30): ")
@@ -3,10 +3,12 @@ Sit-ups Exercise Implementation
 """
 
 import numpy as np
-from collections import deque
-import time
 import cv2
 from base_exercise import BaseExercise, FitnessComponent
+from utils.events import EventType
+from utils.analysis_scheduler import AnalysisScheduler, PER_REP
+from utils.rep_history import RepHistory
+from utils.rolling_stats import RollingStats
 from utils.pose_utils import angle_3pt, lm_xy, pick_side_visibility
 
 
@@ -18,8 +20,8 @@ class Situps(BaseExercise):
         self.down_thresh = 145.0    # Lying back position (120-145° - larger angle)
         self.up_thresh = 87.0       # Sitting up position (30-45° - smaller angle)
         self.min_interval = 1.0
-        self.smooth_n = 5
-        self.torso_angles = deque(maxlen=self.smooth_n)
+        self.smooth_s = 0.15  # Angle smoothing window in seconds (5 frames at 30 fps)
+        self.torso_angles = RollingStats(window=64, time_window=self.smooth_s)
         self.stage = 'down'
         self.last_rep_t = 0.0
         self.detected_side = None
@@ -28,8 +30,8 @@ class Situps(BaseExercise):
         self.incomplete_up_frames = 0    # Count frames not sitting up enough
         self.incomplete_down_frames = 0  # Count frames not returning fully
         self.rep_frame_count = 0
-        self.rep_depths = []   # minimum torso angle per rep (most upright)
-        self.rep_returns = []  # maximum torso angle per rep (most lying down)
+        self.rep_depths = RepHistory()   # minimum torso angle per rep (most upright)
+        self.rep_returns = RepHistory()  # maximum torso angle per rep (most lying down)
         self.score = 0.0
         
         # form error thresholds
@@ -39,8 +41,8 @@ class Situps(BaseExercise):
         # Measurement parameters
         self.measurement_data = {
             'rep_count': 0,
-            'rom_angles': [],  # Range of motion angles for each rep
-            'speed_data': [],  # Time taken for each rep
+            'rom_angles': RepHistory(),  # Range of motion angles for each rep
+            'speed_data': RepHistory(),  # Time taken for each rep
             'consistency_score': 0,
             'fatigue_factor': 0,
             'technique_analysis': {
@@ -52,15 +54,19 @@ class Situps(BaseExercise):
         
         # Rep timing tracking
         self.rep_start_time = 0
-        self.rep_times = deque(maxlen=10)
+        self.rep_times = RollingStats(window=10)
         
         # ROM consistency tracking
-        self.rom_values = deque(maxlen=10)
+        self.rom_values = RollingStats(window=10)
         
         # Fatigue tracking
         self.first_half_avg_speed = 0
         self.second_half_avg_speed = 0
 
+        # Technique analysis runs once every third rep, not on every frame
+        self.analyses = AnalysisScheduler()
+        self.analyses.add('technique', 'analyze_technique', PER_REP, every=3)
+
     def calculate_torso_angle(self, landmarks, frame_width, frame_height):
         """Calculate angle using the best visible side"""
         if self.detected_side is None:
@@ -135,8 +141,9 @@ class Situps(BaseExercise):
         if np.isnan(torso_angle):
             return
 
-        self.torso_angles.append(torso_angle)
-        avg = np.nanmean(self.torso_angles)
+        now = self.clock()
+        self.torso_angles.push(torso_angle, now)
+        avg = self.torso_angles.mean
 
         # Count frames and track form issues
         self.rep_frame_count += 1
@@ -149,9 +156,9 @@ class Situps(BaseExercise):
         if avg < self.down_thresh - 10:  # Should be ≥145° for full return
             self.incomplete_down_frames += 1
 
-        now = time.time()
         if self.stage == 'down' and avg <= self.up_thresh:  # Sat up enough (≤87°)
             self.stage = 'up'
+            self.emit(EventType.STAGE_CHANGED, stage='up', torso_angle=avg)
             self.current_rep_min = avg    # Most upright position (smallest angle)
             self.current_rep_max = avg    # Start tracking return
             
@@ -172,13 +179,13 @@ class Situps(BaseExercise):
                     # Calculate and store rep time
                     if self.rep_start_time > 0:
                         rep_time = now - self.rep_start_time
-                        self.rep_times.append(rep_time)
+                        self.rep_times.push(rep_time)
                         self.measurement_data['speed_data'].append(rep_time)
                         self.rep_start_time = 0
                     
                     # Calculate ROM for this rep
                     rom = self.current_rep_max - self.current_rep_min
-                    self.rom_values.append(rom)
+                    self.rom_values.push(rom)
                     self.measurement_data['rom_angles'].append(rom)
 
                     # Record depth and return for feedback
@@ -192,8 +199,10 @@ class Situps(BaseExercise):
                         
                         if up_error_ratio > self.incomplete_up_threshold:
                             self.form_errors += 1
+                            self.emit(EventType.FORM_ERROR, error='incomplete_up', ratio=up_error_ratio)
                         if down_error_ratio > self.incomplete_down_threshold:
                             self.form_errors += 1
+                            self.emit(EventType.FORM_ERROR, error='incomplete_down', ratio=down_error_ratio)
 
                     # Reset counters for next rep
                     self.incomplete_up_frames = 0
@@ -202,36 +211,47 @@ class Situps(BaseExercise):
                     
                     # Update measurement data
                     self.measurement_data['rep_count'] = self.reps
+                    self.emit(EventType.REP_COMPLETED, reps=self.reps, rom=rom,
+                              rep_time=self.rep_times.last if len(self.rep_times) else None)
                     
                     # Calculate consistency score
                     if self.reps % 5 == 0 and len(self.rom_values) > 0:
                         self.measurement_data['consistency_score'] = round(
-                            (1 - (np.std(self.rom_values) / np.mean(self.rom_values))) * 100, 1
+                            (1 - (self.rom_values.std / self.rom_values.mean)) * 100, 1
                         )
                     
                     # Calculate fatigue factor
                     if self.reps >= 10:
                         half_point = self.reps // 2
-                        if len(self.measurement_data['speed_data']) >= half_point:
-                            first_half = self.measurement_data['speed_data'][:half_point]
-                            second_half = self.measurement_data['speed_data'][half_point:]
-                            
-                            if len(first_half) > 0 and len(second_half) > 0:
-                                first_avg = np.mean(first_half)
-                                second_avg = np.mean(second_half)
+                        speed_data = self.measurement_data['speed_data']
+                        n_speeds = speed_data.count
+                        if n_speeds >= half_point:
+                            speeds = speed_data.values()
+                            if len(speeds) < n_speeds:
+                                # Oldest reps were dropped: compare the halves of the kept window
+                                n_speeds = len(speeds)
+                                half_point = n_speeds // 2
+                            if half_point > 0 and n_speeds > half_point:
+                                first_avg = sum(speeds[:half_point]) / half_point
+                                second_avg = sum(speeds[half_point:n_speeds]) / (n_speeds - half_point)
                                 self.measurement_data['fatigue_factor'] = round(
                                     ((second_avg - first_avg) / first_avg) * 100, 1
                                 )
 
                 self.stage = 'down'
+                self.emit(EventType.STAGE_CHANGED, stage='down', torso_angle=avg)
         
-        # Update technique analysis
-        if self.reps > 0 and self.reps % 3 == 0:
-            technique_metrics = self.calculate_technique_metrics(landmarks, frame_width, frame_height)
-            # Simple scoring based on ideal values
-            self.measurement_data['technique_analysis']['upper_body_engagement'] = max(0, 100 - technique_metrics['shoulder_alignment'] * 5)
-            self.measurement_data['technique_analysis']['core_activation'] = max(0, 100 - technique_metrics['hip_alignment'] * 10)
-            self.measurement_data['technique_analysis']['hip_flexor_dominance'] = min(100, technique_metrics['arm_position'] / 2)
+        self.analyses.on_frame(self, now, self.reps, landmarks, frame_width, frame_height)
+
+    def analyze_technique(self, landmarks, frame_width, frame_height):
+        """Score technique from the current frame into measurement_data"""
+        technique_metrics = self.calculate_technique_metrics(landmarks, frame_width, frame_height)
+        technique = self.measurement_data['technique_analysis']
+        # Simple scoring based on ideal values
+        technique['upper_body_engagement'] = max(0, 100 - technique_metrics['shoulder_alignment'] * 5)
+        technique['core_activation'] = max(0, 100 - technique_metrics['hip_alignment'] * 10)
+        technique['hip_flexor_dominance'] = min(100, technique_metrics['arm_position'] / 2)
+        return dict(technique)
 
     def draw_feedback(self, frame, landmarks, frame_width, frame_height):
         cv2.putText(frame, f"Reps: {self.reps}", (10, 90),
@@ -255,11 +275,8 @@ class Situps(BaseExercise):
                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2)
             
             # Real-time form feedback
-            if torso_angle > self.up_thresh + 10 and self.stage == 'up':
-                cv2.putText(frame, "SIT UP HIGHER", (frame_width // 2 - 100, 210),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-            elif torso_angle < self.down_thresh - 10 and self.stage == 'down':
-                cv2.putText(frame, "RETURN FULLY DOWN", (frame_width // 2 - 120, 210),
+            for alert in self._alerts_for_angle(torso_angle):
+                cv2.putText(frame, alert, (frame_width // 2 - (100 if alert == "SIT UP HIGHER" else 120), 210),
                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
             
             # Display measurement data if available
@@ -272,8 +289,22 @@ class Situps(BaseExercise):
                     cv2.putText(frame, f"Fatigue: {self.measurement_data['fatigue_factor']}%", 
                                (10, y_offset + 25), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
 
+    def form_alerts(self, landmarks, frame_width, frame_height):
+        torso_angle = self.calculate_torso_angle(landmarks, frame_width, frame_height)
+        if np.isnan(torso_angle):
+            return []
+        return self._alerts_for_angle(torso_angle)
+
+    def _alerts_for_angle(self, torso_angle):
+        if torso_angle > self.up_thresh + 10 and self.stage == 'up':
+            return ["SIT UP HIGHER"]
+        if torso_angle < self.down_thresh - 10 and self.stage == 'down':
+            return ["RETURN FULLY DOWN"]
+        return []
+
     def finalize_score(self):
         """Compute final score with form scoring"""
+        self.run_final_analyses()
         if self.reps > 0:
             accuracy = (self.reps - (self.form_errors * 0.5)) / self.reps
             accuracy = max(0.4, accuracy)
@@ -289,9 +320,10 @@ class Situps(BaseExercise):
         if self.reps == 0:
             return "No sit-ups recorded. Make sure your side is visible to the camera."
 
-        avg_depth = np.mean(self.rep_depths) if self.rep_depths else 0
-        avg_return = np.mean(self.rep_returns) if self.rep_returns else 0
-        avg_speed = np.mean(self.measurement_data['speed_data']) if self.measurement_data['speed_data'] else 0
+        avg_depth = self.rep_depths.mean if self.rep_depths else 0
+        avg_return = self.rep_returns.mean if self.rep_returns else 0
+        speed_data = self.measurement_data['speed_data']
+        avg_speed = speed_data.mean if speed_data else 0
 
         feedback = [
             f"Sit-ups Feedback ({'Left' if self.detected_side == 'L' else 'Right'} Side Detection):",
@@ -347,11 +379,12 @@ class Situps(BaseExercise):
         self.rep_start_time = 0
         self.rep_times.clear()
         self.rom_values.clear()
+        self.analyses.clear()
         self.detected_side = None
         self.measurement_data = {
             'rep_count': 0,
-            'rom_angles': [],
-            'speed_data': [],
+            'rom_angles': RepHistory(),
+            'speed_data': RepHistory(),
             'consistency_score': 0,
             'fatigue_factor': 0,
             'technique_analysis': {
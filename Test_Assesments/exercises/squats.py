@@ -3,10 +3,11 @@ Squats Exercise Implementation (More Forgiving Form Detection)
 """
 
 import numpy as np
-from collections import deque
-import time
 import cv2
 from base_exercise import BaseExercise, FitnessComponent
+from utils.events import EventType
+from utils.rep_history import RepHistory
+from utils.rolling_stats import RollingStats
 from utils.pose_utils import angle_3pt, pick_side_visibility, lm_xy
 
 
@@ -16,15 +17,15 @@ class Squats(BaseExercise):
         self.down_thresh = 100.0
         self.up_thresh = 160.0
         self.min_interval = 1.0
-        self.smooth_n = 5
-        self.knee_angles = deque(maxlen=self.smooth_n)
+        self.smooth_s = 0.15  # Angle smoothing window in seconds (5 frames at 30 fps)
+        self.knee_angles = RollingStats(window=64, time_window=self.smooth_s)
         self.stage = 'up'
         self.last_rep_t = 0.0
 
         # form tracking - MORE FORGIVING parameters
         self.knee_valgus_frames = 0  # Count frames with valgus
         self.rep_frame_count = 0
-        self.rep_depths = []   # store min knee angle per rep
+        self.rep_depths = RepHistory()   # min knee angle per rep
         self.score = 0.0
         
         # MORE FORGIVING form error thresholds
@@ -52,8 +53,9 @@ class Squats(BaseExercise):
         if np.isnan(knee_angle):
             return
 
-        self.knee_angles.append(knee_angle)
-        avg = np.nanmean(self.knee_angles)
+        now = self.clock()
+        self.knee_angles.push(knee_angle, now)
+        avg = self.knee_angles.mean
 
         # Check for knee valgus (knees collapsing inward)
         knee_valgus = False
@@ -71,10 +73,10 @@ class Squats(BaseExercise):
         if knee_valgus:
             self.knee_valgus_frames += 1
 
-        now = time.time()
         if self.stage == 'up' and avg <= self.down_thresh:
             self.stage = 'down'
             self.current_rep_min_angle = avg
+            self.emit(EventType.STAGE_CHANGED, stage='down', knee_angle=avg)
         elif self.stage == 'down' and avg >= self.up_thresh:
             if now - self.last_rep_t >= self.min_interval:
                 self.reps += 1
@@ -82,6 +84,7 @@ class Squats(BaseExercise):
 
                 # record depth for feedback
                 self.rep_depths.append(self.current_rep_min_angle)
+                self.emit(EventType.REP_COMPLETED, reps=self.reps, depth_angle=self.current_rep_min_angle)
 
                 # Check if valgus was persistent (MORE FORGIVING calculation)
                 if self.rep_frame_count > 0:
@@ -90,18 +93,26 @@ class Squats(BaseExercise):
                     # Only count form error if valgus was very persistent
                     if valgus_ratio > self.valgus_threshold:
                         self.form_errors += 1
-                        print(f"Form note: valgus ratio {valgus_ratio:.2f} > {self.valgus_threshold}")
+                        self.emit(EventType.FORM_ERROR, error='knee_valgus', valgus_ratio=valgus_ratio,
+                                  threshold=self.valgus_threshold)
 
                 # Reset counters for next rep
                 self.knee_valgus_frames = 0
                 self.rep_frame_count = 0
 
             self.stage = 'up'
+            self.emit(EventType.STAGE_CHANGED, stage='up', knee_angle=avg)
 
     def draw_feedback(self, frame, landmarks, frame_width, frame_height):
         cv2.putText(frame, f"Reps: {self.reps}", (10, 90),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
 
+        for alert in self.form_alerts(landmarks, frame_width, frame_height):
+            cv2.putText(frame, alert,
+                        (frame_width // 2 - 150, 90),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)  # Yellow note
+
+    def form_alerts(self, landmarks, frame_width, frame_height):
         side = pick_side_visibility(landmarks)
         if side == 'L':
             knee = landmarks[25]  # LEFT_KNEE
@@ -121,9 +132,8 @@ class Squats(BaseExercise):
             knee_valgus = True
 
         if knee_valgus:
-            cv2.putText(frame, "FORM NOTE: Knees slightly inward",
-                        (frame_width // 2 - 150, 90),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)  # Yellow note
+            return ["FORM NOTE: Knees slightly inward"]
+        return []
 
     def finalize_score(self):
         """Compute final score for squats with relaxed form scoring"""
@@ -140,9 +150,9 @@ class Squats(BaseExercise):
         if self.reps == 0:
             return f"No squats recorded. Try again making sure you are fully visible."
 
-        avg_depth = np.mean(self.rep_depths) if self.rep_depths else 0
-        min_depth = np.min(self.rep_depths) if self.rep_depths else 0
-        max_depth = np.max(self.rep_depths) if self.rep_depths else 0
+        avg_depth = self.rep_depths.mean if self.rep_depths else 0
+        min_depth = self.rep_depths.min if self.rep_depths else 0
+        max_depth = self.rep_depths.max if self.rep_depths else 0
 
         feedback = [f"Squats Feedback:",
                     f"- Total reps: {self.reps}",
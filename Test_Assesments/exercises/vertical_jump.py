@@ -2,10 +2,12 @@
 Vertical Jump Exercise Implementation (Scientific Framework)
 """
 
-import time
 import cv2
 import numpy as np
 from base_exercise import BaseExercise, FitnessComponent
+from utils.events import EventType
+from utils.rep_history import RepHistory
+from utils.rolling_stats import RollingStats
 from utils.pose_utils import lm_xy, angle_3pt
 
 class VerticalJump(BaseExercise):
@@ -21,36 +23,45 @@ class VerticalJump(BaseExercise):
         self.landing_time = None
         self.in_air = False
         self.flight_time = 0.0
+        # Ankle lines relative to the standing hip height (px). Landing is a line
+        # below the takeoff one rather than a band, so a frame rate too low to
+        # sample inside a band cannot miss it and one crossing cannot count twice.
+        self.takeoff_offset_px = 20
+        self.landing_offset_px = 10
+        self.prev_ankle_y = None  # (time, ankle y) of the last frame, to interpolate crossings
         
         # CoM method tracking
         self.min_hip_y = None
         self.max_hip_y = None
         
         # Biomechanics tracking
-        self.knee_angles = []
+        self.smooth_s = 0.15  # Knee angle smoothing window in seconds (5 frames at 30 fps)
+        self.knee_angles = RollingStats(window=64, time_window=self.smooth_s)  # Per-frame mean of both knees
         self.hip_angles = []
         self.takeoff_symmetry = 0.0
         
         # Performance metrics
-        self.jump_heights_flight = []  # Flight time method
-        self.jump_heights_com = []     # CoM displacement method
+        self.jump_heights_flight = RepHistory()  # Flight time method
+        self.jump_heights_com = RepHistory()     # CoM displacement method
         self.best_jump = 0.0
         self.form_errors = 0
         self.min_jump_threshold_cm = 15  # minimal jump considered valid
         
         # Calibration
-        self.calibration_frames = 0
+        self.calibration_s = 1.0  # Seconds of standing still used for the baseline
+        self.calibration_start_time = None
+        self.calibration_elapsed = 0.0
         self.baseline_knee_angle = None
 
     def calculate_score(self):
         if self.jump_heights_flight:
             # Use flight time method as primary measurement
-            avg_jump = sum(self.jump_heights_flight) / len(self.jump_heights_flight)
+            avg_jump = self.jump_heights_flight.mean
             ideal_height = 50  # 50cm ideal jump height
             completion = min(1.0, avg_jump / ideal_height)
             
             # Form penalty based on biomechanics and symmetry
-            form_penalty = max(0.7, 1 - (self.form_errors / len(self.jump_heights_flight)) * 0.3)
+            form_penalty = max(0.7, 1 - (self.form_errors / self.jump_heights_flight.count) * 0.3)
             
             # Additional penalty for poor symmetry
             symmetry_penalty = max(0.8, self.takeoff_symmetry / 100)
@@ -92,15 +103,19 @@ class VerticalJump(BaseExercise):
         
         # Establish baseline knee angle
         self.calculate_knee_angles(landmarks, frame_width, frame_height)
-        if self.knee_angles:
-            self.baseline_knee_angle = np.mean(self.knee_angles[-5:])  # Average last 5 frames
+        if self.knee_angles.count:
+            self.baseline_knee_angle = self.knee_angles.mean  # Average over the smoothing window
         
-        self.calibration_frames += 1
-        if self.calibration_frames >= 30:  # 30 frames of calibration
+        now = self.clock()
+        if self.calibration_start_time is None:
+            self.calibration_start_time = now
+        self.calibration_elapsed = now - self.calibration_start_time
+        if self.calibration_elapsed >= self.calibration_s:
             self.calibrated = True
+            self.emit(EventType.CALIBRATION_DONE, baseline_hip_y=self.baseline_hip_y)
             return True, "Calibration complete. Ready to jump!"
         
-        return False, f"Calibrating... {self.calibration_frames}/30 frames"
+        return False, f"Calibrating... {self.calibration_elapsed:.1f}/{self.calibration_s:.1f}s"
 
     def calculate_knee_angles(self, landmarks, frame_width, frame_height):
         """Calculate knee angles for both legs"""
@@ -125,43 +140,49 @@ class VerticalJump(BaseExercise):
         right_angle = angle_3pt((rhx, rhy), (rkx, rky), (rax, ray))
         
         if not np.isnan(left_angle) and not np.isnan(right_angle):
-            self.knee_angles.append((left_angle, right_angle))
+            self.knee_angles.push((left_angle + right_angle) / 2, self.clock())
             return left_angle, right_angle
         return None, None
 
-    def detect_takeoff(self, landmarks, frame_width, frame_height):
-        """Detect when feet leave the ground"""
+    def ankle_y(self, landmarks, frame_width, frame_height, min_visibility):
+        """Mean ankle y in pixels, or None when either ankle is not visible enough"""
         l_ankle = landmarks[27]  # LEFT_ANKLE
         r_ankle = landmarks[28]  # RIGHT_ANKLE
-        
-        # Check if ankles are visible and moving upward rapidly
-        if l_ankle.visibility > 0.6 and r_ankle.visibility > 0.6:
+        if l_ankle.visibility > min_visibility and r_ankle.visibility > min_visibility:
             lax, lay = lm_xy(l_ankle, frame_width, frame_height)
             rax, ray = lm_xy(r_ankle, frame_width, frame_height)
-            
-            # Simple heuristic: rapid upward movement indicates takeoff
-            if self.baseline_hip_y is not None:
-                current_ankle_y = (lay + ray) / 2
-                if current_ankle_y < self.baseline_hip_y - 20:  # Ankles above hips
-                    return True
+            return (lay + ray) / 2
+        return None
+
+    def detect_takeoff(self, landmarks, frame_width, frame_height):
+        """Detect when feet leave the ground"""
+        # Simple heuristic: ankles drawn up above the standing hip height
+        current_ankle_y = self.ankle_y(landmarks, frame_width, frame_height, 0.6)
+        if current_ankle_y is not None and self.baseline_hip_y is not None:
+            return current_ankle_y < self.baseline_hip_y - self.takeoff_offset_px
         return False
 
     def detect_landing(self, landmarks, frame_width, frame_height):
         """Detect when feet touch the ground"""
-        l_ankle = landmarks[27]  # LEFT_ANKLE
-        r_ankle = landmarks[28]  # RIGHT_ANKLE
-        
-        if l_ankle.visibility > 0.7 and r_ankle.visibility > 0.7:
-            lax, lay = lm_xy(l_ankle, frame_width, frame_height)
-            rax, ray = lm_xy(r_ankle, frame_width, frame_height)
-            
-            # Landed when ankles return near baseline position
-            if self.baseline_hip_y is not None:
-                current_ankle_y = (lay + ray) / 2
-                if abs(current_ankle_y - self.baseline_hip_y) < 30:
-                    return True
+        # Landed once the ankles are back down past the landing line
+        current_ankle_y = self.ankle_y(landmarks, frame_width, frame_height, 0.7)
+        if current_ankle_y is not None and self.baseline_hip_y is not None:
+            return current_ankle_y > self.baseline_hip_y - self.landing_offset_px
         return False
 
+    def crossing_time(self, line_y, now, ankle_y):
+        """When the ankles crossed line_y, interpolated between the previous frame and this one
+
+        Keeps flight time from being rounded to whole frames, which at 10 fps
+        would be +-0.1 s (+-40% of a typical jump height).
+        """
+        prev = self.prev_ankle_y
+        if prev is None or ankle_y is None or prev[1] == ankle_y:
+            return now
+        prev_t, prev_y = prev
+        frac = min(1.0, max(0.0, (line_y - prev_y) / (ankle_y - prev_y)))
+        return prev_t + frac * (now - prev_t)
+
     def update(self, landmarks, frame_width, frame_height):
         if not self.calibrated:
             success, msg = self.calibrate(frame_width, frame_height, landmarks)
@@ -177,12 +198,15 @@ class VerticalJump(BaseExercise):
         # Calculate knee angles for biomechanics
         left_knee, right_knee = self.calculate_knee_angles(landmarks, frame_width, frame_height)
         
-        now = time.time()
+        now = self.clock()
+        
+        ankle_y = self.ankle_y(landmarks, frame_width, frame_height, 0.6)
         
         # Detect takeoff
         if not self.in_air and self.detect_takeoff(landmarks, frame_width, frame_height):
             self.in_air = True
-            self.takeoff_time = now
+            self.takeoff_time = self.crossing_time(self.baseline_hip_y - self.takeoff_offset_px, now, ankle_y)
+            self.emit(EventType.STAGE_CHANGED, stage='in_air')
             self.min_hip_y = hip_y  # Start tracking lowest hip position
             
             # Record takeoff symmetry
@@ -198,7 +222,8 @@ class VerticalJump(BaseExercise):
             # Detect landing
             if self.detect_landing(landmarks, frame_width, frame_height):
                 self.in_air = False
-                self.landing_time = now
+                self.landing_time = self.crossing_time(self.baseline_hip_y - self.landing_offset_px, now, ankle_y)
+                self.emit(EventType.STAGE_CHANGED, stage='landed')
                 
                 # Calculate jump height using flight time method (primary)
                 self.flight_time = self.landing_time - self.takeoff_time
@@ -220,20 +245,27 @@ class VerticalJump(BaseExercise):
                     self.jump_heights_flight.append(final_height)
                     self.jump_heights_com.append(jump_height_com_cm)
                     self.best_jump = max(self.best_jump, final_height)
+                    self.emit(EventType.REP_COMPLETED, reps=self.jump_heights_flight.count,
+                              height_cm=final_height, flight_time=self.flight_time)
                     
                     # Check form: proper knee extension at takeoff
                     if left_knee is not None and right_knee is not None:
                         avg_takeoff_angle = (left_knee + right_knee) / 2
                         if avg_takeoff_angle < 160:  # Should be near full extension (~180°)
                             self.form_errors += 1
+                            self.emit(EventType.FORM_ERROR, error='takeoff_knee_flexion',
+                                      takeoff_angle=avg_takeoff_angle)
                 else:
                     self.form_errors += 1  # Jump too shallow
+                    self.emit(EventType.FORM_ERROR, error='shallow_jump', height_cm=final_height)
+
+        self.prev_ankle_y = (now, ankle_y) if ankle_y is not None else None
 
     def draw_feedback(self, frame, landmarks, frame_width, frame_height):
         if not self.calibrated:
             cv2.putText(frame, "Calibrating... Stand straight", (10, 90), 
                         cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-            cv2.putText(frame, f"Progress: {self.calibration_frames}/30", (10, 120), 
+            cv2.putText(frame, f"Progress: {self.calibration_elapsed:.1f}/{self.calibration_s:.1f}s", (10, 120), 
                         cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
         else:
             status = "READY" if not self.in_air else "IN AIR"
@@ -248,7 +280,7 @@ class VerticalJump(BaseExercise):
             
             cv2.putText(frame, f"Best Jump: {self.best_jump:.1f}cm", (10, 150), 
                         cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-            cv2.putText(frame, f"Total Jumps: {len(self.jump_heights_flight)}", (10, 180), 
+            cv2.putText(frame, f"Total Jumps: {self.jump_heights_flight.count}", (10, 180), 
                         cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
             
             # Show flight time if available
@@ -264,12 +296,12 @@ class VerticalJump(BaseExercise):
         if not self.jump_heights_flight:
             return "No valid jumps recorded. Try jumping higher with proper form."
         
-        avg_jump = sum(self.jump_heights_flight) / len(self.jump_heights_flight)
+        avg_jump = self.jump_heights_flight.mean
         max_flight_time = max([(9.81 * (t**2)) / 8 * 100 for t in [self.flight_time]]) if self.flight_time > 0 else 0
         
         feedback = [
             f"Vertical Jump Assessment (Scientific Measurement):",
-            f"- Total jumps: {len(self.jump_heights_flight)}",
+            f"- Total jumps: {self.jump_heights_flight.count}",
             f"- Best jump: {self.best_jump:.1f}cm",
             f"- Average jump: {avg_jump:.1f}cm",
             f"- Flight time: {self.flight_time:.2f}s",
@@ -310,6 +342,7 @@ class VerticalJump(BaseExercise):
         self.landing_time = None
         self.in_air = False
         self.flight_time = 0.0
+        self.prev_ankle_y = None
         self.min_hip_y = None
         self.max_hip_y = None
         self.knee_angles.clear()
@@ -319,5 +352,6 @@ class VerticalJump(BaseExercise):
         self.jump_heights_com.clear()
         self.best_jump = 0.0
         self.form_errors = 0
-        self.calibration_frames = 0
+        self.calibration_start_time = None
+        self.calibration_elapsed = 0.0
         self.baseline_knee_angle = None
\ No newline at end of file
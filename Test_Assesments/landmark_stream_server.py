@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Landmark Stream Server - WebSocket scoring for clients that run pose on-device
+
+The client runs pose estimation itself and streams one compact landmark
+packet per frame (see utils/landmark_packet). The server drives the usual
+exercise classes through an AssessmentSession and pushes back rep counts and
+form alerts (the strings draw_feedback shows) as JSON text messages. No video
+is sent and the server runs no models; scoring costs roughly 60us per frame,
+so one asyncio process serves several hundred 30 fps streams per core and
+--processes spreads thousands of streams over all cores on one port.
+
+    ws://host:8765/stream?exercises=squats&target=15&frame_width=720&frame_height=1280
+
+    client -> server  binary: landmark packet
+                      text:   {"type": "next"} | {"type": "finish"}
+    server -> client  text:   {"type": "state", "reps": ..., "alerts": [...], "timestamp": ...}
+                              sent only when reps, form errors, alerts or the
+                              exercise change
+                              {"type": "results", ...} after "finish", then close
+"""
+
+import argparse
+import asyncio
+import json
+from urllib.parse import urlparse, parse_qs
+
+from assessment_session import AssessmentSession
+from assessment_service import spec_from_query
+from utils.landmark_packet import decode_landmark_packet
+from utils.pose_utils import landmarks_from_array
+from utils.websocket import (WebSocket, WebSocketClosed, HeaderTooLarge, read_http_head, handshake_response,
+                             OP_BINARY, OP_TEXT, CLOSE_NORMAL, CLOSE_POLICY_VIOLATION)
+
+
+class LandmarkStream:
+    """Per-connection scoring state"""
+
+    def __init__(self, spec, frame_width=960, frame_height=540):
+        self.session = AssessmentSession(spec)
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.last_alerts = []
+
+    def on_packet(self, payload):
+        """Score one landmark packet; returns a message dict when something changed"""
+        arr, timestamp = decode_landmark_packet(payload)
+        landmarks = landmarks_from_array(arr) if arr is not None else None
+        state = self.session.push_frame(landmarks, timestamp, self.frame_width, self.frame_height)
+
+        ex = self.session.current_exercise
+        alerts = []
+        if landmarks is not None and ex is not None:
+            alerts = ex.form_alerts(landmarks, self.frame_width, self.frame_height)
+        if state.get('new_reps') or state.get('new_form_errors') or alerts != self.last_alerts:
+            self.last_alerts = alerts
+            return dict(state, type='state', alerts=alerts, timestamp=timestamp)
+        return None
+
+    def on_control(self, message):
+        kind = message.get('type') if isinstance(message, dict) else None
+        if kind == 'next':
+            self.last_alerts = []
+            self.session.next_exercise()
+            return dict(self.session.state(), type='state', alerts=[])
+        if kind == 'finish':
+            return dict(self.session.finish(), type='results')
+        raise ValueError(f"Unknown control message: {kind}")
+
+
+class LandmarkStreamServer:
+    def __init__(self, max_streams=10000):
+        self.max_streams = max_streams
+        self.active = 0
+        self.connections = 0
+        self.frames = 0
+        self.messages_sent = 0
+        self.errors = 0
+
+    async def handle(self, reader, writer):
+        try:
+            await self._handle(reader, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line, headers = await read_http_head(reader)
+        except HeaderTooLarge:
+            writer.write(b"HTTP/1.1 431 Request Header Fields Too Large\r\nContent-Length: 0\r\n\r\n")
+            return
+        except ValueError:
+            writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            return
+        parts = request_line.split(" ")
+        url = urlparse(parts[1] if len(parts) > 1 else "/")
+        response = handshake_response(headers)
+        if url.path.rstrip("/") != "/stream" or response is None:
+            writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            return
+        if self.active >= self.max_streams:
+            writer.write(b"HTTP/1.1 503 Service Unavailable\r\nRetry-After: 2\r\nContent-Length: 0\r\n\r\n")
+            return
+
+        params = parse_qs(url.query)
+        try:
+            stream = LandmarkStream(spec_from_query(params),
+                                    int(params.get('frame_width', [960])[0]),
+                                    int(params.get('frame_height', [540])[0]))
+        except ValueError as e:
+            body = str(e).encode("utf-8")
+            writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+            return
+
+        writer.write(response)
+        ws = WebSocket(reader, writer)
+        self.active += 1
+        self.connections += 1
+        try:
+            await self._serve(ws, stream)
+        finally:
+            self.active -= 1
+
+    async def _serve(self, ws, stream):
+        while True:
+            try:
+                opcode, payload = await ws.recv()
+            except WebSocketClosed:
+                break
+            try:
+                if opcode == OP_BINARY:
+                    self.frames += 1
+                    message = stream.on_packet(payload)
+                else:
+                    message = stream.on_control(json.loads(payload))
+            except (ValueError, RuntimeError) as e:
+                self.errors += 1
+                ws.close(CLOSE_POLICY_VIOLATION, str(e)[:100])
+                break
+
+            if message is not None:
+                ws.send(OP_TEXT, json.dumps(message).encode("utf-8"))
+                self.messages_sent += 1
+                if message['type'] == 'results':
+                    ws.close(CLOSE_NORMAL)
+                    break
+                # Backpressure: a client that stops reading stalls only its own stream
+                await ws.drain()
+        await ws.drain()
+
+    def stats(self):
+        return {
+            'active_streams': self.active,
+            'connections': self.connections,
+            'frames': self.frames,
+            'messages_sent': self.messages_sent,
+            'errors': self.errors,
+        }
+
+
+async def serve(host="127.0.0.1", port=8765, max_streams=10000, stats_interval=0, ready=None,
+                reuse_port=False):
+    server = LandmarkStreamServer(max_streams)
+    listener = await asyncio.start_server(server.handle, host, port, backlog=4096,
+                                          reuse_port=reuse_port or None)
+    if ready is not None:
+        ready(listener.sockets[0].getsockname()[1])
+    if stats_interval:
+        asyncio.ensure_future(_print_stats(server, stats_interval))
+    async with listener:
+        await listener.serve_forever()
+
+
+async def _print_stats(server, interval):
+    last_frames = 0
+    while True:
+        await asyncio.sleep(interval)
+        stats = server.stats()
+        fps = (stats['frames'] - last_frames) / interval
+        last_frames = stats['frames']
+        print(f"streams={stats['active_streams']} frames/s={fps:.0f} "
+              f"messages={stats['messages_sent']} errors={stats['errors']}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket landmark streaming server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-streams", type=int, default=10000)
+    parser.add_argument("--stats-interval", type=float, default=0, help="Print throughput every N seconds")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Server processes sharing the port (SO_REUSEPORT, Linux/BSD)")
+    args = parser.parse_args()
+
+    print(f"Landmark stream server listening on ws://{args.host}:{args.port}/stream")
+    if args.processes > 1:
+        import multiprocessing
+        procs = [multiprocessing.Process(target=_serve_process, args=(args,), daemon=True)
+                 for _ in range(args.processes)]
+        for p in procs:
+            p.start()
+        try:
+            for p in procs:
+                p.join()
+        except KeyboardInterrupt:
+            pass
+        return
+    _serve_process(args)
+
+
+def _serve_process(args):
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_streams, args.stats_interval,
+                          reuse_port=args.processes > 1))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,9 @@
 """
 Main entry point for Fitness Assessment System (Upgraded)
 """
+import time
+_T0 = time.perf_counter()  # Startup reference for --startup-timing
+
 import os
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'  # Suppress TensorFlow info and warnings
 import warnings
@@ -11,22 +14,42 @@ warnings.filterwarnings('ignore')  # Suppress Python warnings
 import argparse
 from assessment_flow import FitnessAssessment
 
-def main():
-    parser = argparse.ArgumentParser(description="Fitness Assessment with MediaPipe")
-    parser.add_argument("--camera", type=int, default=0, help="Camera index")
-    parser.add_argument("--height-cm", type=float, default=170.0, help="User height in cm for calibration")
-    parser.add_argument("--width", type=int, default=960, help="Camera width")
-    parser.add_argument("--height", type=int, default=540, help="Camera height")
-    parser.add_argument("--show-skeleton", action="store_true", help="Show pose skeleton")
-    args = parser.parse_args()
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "fitness_assessment", "poses")
 
-    # Create the assessment system
-    assessment = FitnessAssessment(user_height_cm=args.height_cm)
 
-    # Run the assessment (real-time + descriptive feedback)
-    assessment.run_assessment(args)
+def make_pose_cache(args):
+    """Pose inference cache for the video/batch runners (None when disabled)"""
+    if args.no_cache:
+        return None
+    from utils.pose_cache import PoseCache
+    return PoseCache(args.cache_dir, max_bytes=int(args.cache_max_mb * 1024 * 1024))
+
+
+def run_batch_mode(args):
+    """Score every clip listed in a manifest and save the results"""
+    from utils.video_runner import load_batch_manifest, run_batch
+    from utils.results_manager import save_assessment_results
+    from utils.session_cost import SessionCost
+
+    cache = make_pose_cache(args)
+    jobs = load_batch_manifest(args.batch)
+    cost = SessionCost('batch', ",".join(sorted({job[0] for job in jobs})))
+    exercises = run_batch(jobs, user_height_cm=args.height_cm, model_complexity=args.model_complexity,
+                          cache=cache, workers=args.workers, cost=cost)
 
-    # After completing all exercises, show detailed summary
+    for (ex_type, video_path, _), exercise in zip(jobs, exercises):
+        exercise.finalize_score()
+        print(f"\n{video_path} [{ex_type}]: {exercise.score}/100")
+        print(exercise.generate_feedback())
+
+    success, msg = save_assessment_results(exercises, cost=cost)
+    print(msg)
+    if cache is not None:
+        print(f"Pose cache: {cache.stats()}")
+
+
+def print_detailed_feedback(assessment):
+    """After completing all exercises, show detailed summary"""
     print("\n==================================================")
     print("DETAILED FITNESS ASSESSMENT FEEDBACK")
     print("==================================================")
@@ -44,7 +67,219 @@ def main():
     print(f"OVERALL SCORE: {assessment.assessment_score:.1f}/100")
     print("="*50)
 
-    # Note: Results are already saved in run_assessment(), no need to save again
+
+def run_kiosk(args, timer=None):
+    """Run sessions back to back, reusing warm pose estimators from a shared pool"""
+    from utils.pose_pool import get_pose_pool
+    from utils.metrics import metrics_from_args
+    from utils.sampling_profiler import profiler_from_args
+    pool = get_pose_pool(size=args.pool_size, model_complexity=args.model_complexity)
+    profiler = profiler_from_args(args)  # One profile across sessions
+    metrics = metrics_from_args(args)  # Counters keep running across sessions
+
+    while True:
+        assessment = FitnessAssessment(user_height_cm=args.height_cm)
+        assessment.run_assessment(args, timer=timer, pose_pool=pool, profiler=profiler, metrics=metrics)
+        print_detailed_feedback(assessment)
+        print(f"Pose pool: {pool.metrics()}")
+        if timer is not None:
+            timer.report()
+            timer = None  # Startup timing only applies to the first session
+
+        if input("\nStart another session? (y/n): ").strip().lower() != "y":
+            break
+    pool.close()
+    if metrics is not None:
+        metrics.close()
+
+
+def run_multi_stream(args):
+    """Run several stations in one process with a shared inference pool"""
+    from utils.metrics import metrics_from_args
+    from utils.multi_stream import MultiStreamRunner
+    from utils.session_cost import SessionCost, assessment_type
+
+    ex_types = [t.strip() for t in args.stream_exercises.split(",") if t.strip()]
+    spec = {'user_height_cm': args.height_cm, 'exercises': ex_types}
+    assessments = [FitnessAssessment.from_spec(spec) for _ in args.streams]
+    for assessment in assessments:
+        assessment.cost = SessionCost('stream', assessment_type(assessment.spec))
+
+    runner = MultiStreamRunner(assessments, args.streams, workers=args.inference_workers,
+                               model_complexity=args.model_complexity, width=args.width,
+                               height=args.height, show=not args.headless)
+    metrics = metrics_from_args(args)
+    if metrics is not None:
+        metrics.registry.add_collector(runner.collect_metrics)
+    runner.run()
+
+    for source, assessment in zip(args.streams, assessments):
+        print(f"\n##### STATION {source} #####")
+        assessment.calculate_overall_score()
+        print_detailed_feedback(assessment)
+        assessment.save_results(metrics)
+    if metrics is not None:
+        metrics.close()
+
+
+def run_team_mode(args):
+    """Several athletes in front of one camera (or in one --video), one multi-pose detection pass"""
+    from utils.metrics import metrics_from_args
+    from utils.multi_person import TeamSession, run_team
+
+    ex_types = [t.strip() for t in args.team_exercises.split(",") if t.strip()]
+    router = None
+    if args.fan_out:
+        from utils.fan_out import FanOutRouter
+        router = FanOutRouter
+    elif args.auto_segment:
+        from utils.segmentation import SegmentRouter
+        router = SegmentRouter
+    team = TeamSession({'user_height_cm': args.height_cm, 'exercises': ex_types}, router=router)
+    metrics = metrics_from_args(args)
+    run_team(team, args, metrics=metrics)
+
+    for athlete in team.scored():
+        print(f"\n##### ATHLETE {athlete.athlete_id} #####")
+        athlete.assessment.calculate_overall_score()
+        print_detailed_feedback(athlete.assessment)
+    for msg in team.save_results(metrics=metrics):
+        print(msg)
+    if metrics is not None:
+        metrics.close()
+
+
+def print_cost_report(args):
+    """Aggregate the cost records saved with the results"""
+    from utils.session_cost import cost_path, cost_report, load_cost_records
+    path = args.cost_report if args.cost_report != "-" else cost_path("fitness_assessment_results.csv")
+    if not os.path.exists(path):
+        raise SystemExit(f"No cost records at {path}")
+    print(cost_report(load_cost_records(path), watts=args.cost_watts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fitness Assessment with MediaPipe")
+    parser.add_argument("--camera", type=int, default=0, help="Camera index")
+    parser.add_argument("--height-cm", type=float, default=170.0, help="User height in cm for calibration")
+    parser.add_argument("--width", type=int, default=960, help="Camera width")
+    parser.add_argument("--height", type=int, default=540, help="Camera height")
+    parser.add_argument("--show-skeleton", action="store_true", help="Show pose skeleton")
+    parser.add_argument("--model-complexity", type=int, default=1, choices=[0, 1, 2], help="MediaPipe pose model complexity")
+    parser.add_argument("--video", help="Score a recorded clip instead of the webcam")
+    parser.add_argument("--exercise", default="squats", help="Exercise type shown in --video (e.g. squats, plank)")
+    parser.add_argument("--batch", help="CSV manifest of exercise,video_path[,target] rows to score")
+    parser.add_argument("--workers", type=int, default=1, help="Parallel clips in --batch mode")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Pose inference cache directory")
+    parser.add_argument("--cache-max-mb", type=float, default=2048, help="Pose cache size limit in MB")
+    parser.add_argument("--no-cache", action="store_true", help="Always rerun pose inference")
+    parser.add_argument("--no-prewarm", action="store_true", help="Load the pose model only after the menu")
+    parser.add_argument("--kiosk", action="store_true", help="Run sessions back to back with a warm pose pool")
+    parser.add_argument("--pool-size", type=int, default=1, help="Warm pose estimators kept in --kiosk mode")
+    parser.add_argument("--streams", nargs="+", help="Camera indices and/or video paths to run side by side")
+    parser.add_argument("--stream-exercises", default="squats", help="Comma-separated exercise flow for every stream")
+    parser.add_argument("--inference-workers", type=int, default=2,
+                        help="Pose models shared by --streams; landmarks are tracked (smoothed) "
+                             "only with no more streams than workers")
+    parser.add_argument("--headless", action="store_true", help="Do not open windows in --streams mode")
+    parser.add_argument("--startup-timing", action="store_true", help="Report import and time-to-first-frame timings")
+    parser.add_argument("--checkpoint", help="Periodically save progress to this file during the assessment")
+    parser.add_argument("--resume", help="Continue an assessment from a --checkpoint file")
+    parser.add_argument("--auto-segment", action="store_true",
+                        help="Detect which exercise is being done (continuous recordings, no 'n' key)")
+    parser.add_argument("--fan-out", action="store_true",
+                        help="Feed every frame to all plausible exercise analyzers (free-form training)")
+    parser.add_argument("--athletes", type=int, default=1,
+                        help="Track up to this many athletes in one camera or --video (needs --pose-model)")
+    parser.add_argument("--pose-model", default="pose_landmarker_full.task",
+                        help="MediaPipe pose landmarker .task model for --athletes")
+    parser.add_argument("--team-exercises", default="squats", help="Comma-separated exercise flow for --athletes")
+    parser.add_argument("--smooth-landmarks", action="store_true",
+                        help="One-Euro filter landmarks on frame time (steadier at low frame rates)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Sample the frame loop from the start ('p' toggles it in any session)")
+    parser.add_argument("--profile-out", default="profile",
+                        help="Profile file prefix: <prefix>.collapsed (flamegraph) and <prefix>_top.txt")
+    parser.add_argument("--profile-interval", type=float, default=5.0, help="Profiler sampling interval in ms")
+    parser.add_argument("--profile-top", type=int, default=20, help="Functions listed in the profile summary")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus /metrics (and /metrics.json) on this port")
+    parser.add_argument("--metrics-host", default="127.0.0.1", help="Address for --metrics-port")
+    parser.add_argument("--metrics-jsonl", help="Append a metrics snapshot to this JSON lines file")
+    parser.add_argument("--metrics-interval", type=float, default=10.0, help="Seconds between --metrics-jsonl lines")
+    parser.add_argument("--cost-report", nargs="?", const="-", metavar="COSTS_JSONL",
+                        help="Print cost per assessment type and exercise from the saved cost records, then exit")
+    parser.add_argument("--cost-watts", type=float,
+                        help="Watts per busy CPU core, to estimate energy where it was not measured")
+    args = parser.parse_args()
+    if args.cost_report:
+        print_cost_report(args)
+        return
+    if args.video:
+        from exercises.registry import exercise_types
+        if args.exercise not in exercise_types():
+            parser.error(f"--exercise must be one of: {', '.join(exercise_types())}")
+
+    timer = None
+    if args.startup_timing:
+        from utils.prewarm import StartupTimer
+        timer = StartupTimer(_T0)
+        timer.mark("main() entered (entry-point imports done)")
+
+    if args.batch:
+        run_batch_mode(args)
+        return
+
+    if args.kiosk:
+        run_kiosk(args, timer)
+        return
+
+    if args.streams:
+        run_multi_stream(args)
+        return
+
+    if args.athletes > 1:
+        run_team_mode(args)
+        return
+
+    # Create the assessment system
+    if args.resume:
+        assessment = FitnessAssessment.load_checkpoint(args.resume)
+        args.checkpoint = args.checkpoint or args.resume
+    else:
+        assessment = FitnessAssessment(user_height_cm=args.height_cm)
+
+    if args.video:
+        # Score a recorded clip (pose results are cached between runs)
+        from utils.video_runner import run_video
+        cache = make_pose_cache(args)
+        from utils.session_cost import SessionCost
+        if args.fan_out:
+            from exercises.registry import exercise_types
+            assessment.setup_from_spec({'exercises': exercise_types()})
+            kind = 'fan-out'
+        else:
+            assessment.setup_from_spec({'exercises': [args.exercise]})
+            kind = 'auto' if args.auto_segment else args.exercise
+        assessment.cost = SessionCost('video', kind)
+        run_video(assessment, args.video, model_complexity=args.model_complexity, cache=cache,
+                  segment=args.auto_segment, fan_out=args.fan_out)
+        for segment in assessment.segments:
+            print(f"{segment.start:7.1f}s - {segment.end:7.1f}s  {segment.label}")
+        assessment.calculate_overall_score()
+        assessment.save_results()
+        if cache is not None:
+            print(f"Pose cache: {cache.stats()}")
+    else:
+        # Run the assessment (real-time + descriptive feedback)
+        from utils.metrics import metrics_from_args
+        metrics = metrics_from_args(args)
+        assessment.run_assessment(args, timer=timer, metrics=metrics)
+        if metrics is not None:
+            metrics.close()
+        if timer is not None:
+            timer.report()
+
+    print_detailed_feedback(assessment)
 
 
 if __name__ == "__main__":
@@ -1,11 +1,21 @@
 """
 Utils package - Contains utility functions
+
+Submodules import cv2/NumPy, so names are resolved lazily on first access.
 """
 
-from .angle_calculator import *
-from .pose_utils import angle_3pt, lm_xy, pick_side_visibility, draw_hud
-from .assessment_runner import run_exercises
-from .results_manager import save_assessment_results
+import importlib
+
+_LAZY_ATTRS = {
+    'calculate_angle': '.angle_calculator',
+    'calculate_slope': '.angle_calculator',
+    'angle_3pt': '.pose_utils',
+    'lm_xy': '.pose_utils',
+    'pick_side_visibility': '.pose_utils',
+    'draw_hud': '.pose_utils',
+    'run_exercises': '.assessment_runner',
+    'save_assessment_results': '.results_manager',
+}
 
 __all__ = [
     'angle_3pt',
@@ -14,4 +24,13 @@ __all__ = [
     'draw_hud',
     'run_exercises',
     'save_assessment_results'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        module = importlib.import_module(_LAZY_ATTRS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
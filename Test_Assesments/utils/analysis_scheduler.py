@@ -0,0 +1,129 @@
+"""
+Analysis Scheduler - Runs an exercise's expensive secondary analyses on a budget
+
+Rep counting has to look at every frame; technique, symmetry and similar
+summaries do not. An exercise registers those analyses as methods with a
+trigger and calls on_frame() once per update(), which costs a few comparisons
+when nothing is due, so per-frame CPU stays flat through the whole set.
+
+    self.analyses = AnalysisScheduler()
+    self.analyses.add('technique', 'calculate_technique_metrics', PER_REP, every=3)
+    self.analyses.add('symmetry', 'calculate_symmetry', EVERY_MS, every=500)
+    self.analyses.add('summary', 'summarize_hold', AT_FINALIZE)
+    ...
+    self.analyses.on_frame(self, now, self.reps, landmarks, frame_width, frame_height)
+
+Analyses are looked up by method name on the owning exercise and called as
+method(landmarks, frame_width, frame_height). Every run is recorded (task,
+time, rep count, result) in a bounded log, so results can be audited and the
+scheduler snapshots with the exercise.
+"""
+
+from collections import deque
+
+PER_REP = 'per_rep'          # When the rep count reaches a multiple of `every`
+EVERY_MS = 'every_ms'        # At most once per `every` milliseconds of frame time
+AT_FINALIZE = 'at_finalize'  # Only when finalize() or run() asks for it
+
+
+class _Task:
+    __slots__ = ('name', 'method', 'mode', 'every', 'last_t', 'last_rep', 'runs', 'result')
+
+    def __init__(self, name, method, mode, every):
+        self.name = name
+        self.method = method
+        self.mode = mode
+        self.every = every
+        self.last_t = None
+        self.last_rep = None
+        self.runs = 0
+        self.result = None
+
+
+class AnalysisScheduler:
+    __slots__ = ('max_records', 'records', '_tasks', '_frame')
+
+    def __init__(self, max_records=64):
+        self.max_records = max_records
+        self.records = deque(maxlen=max_records)  # (task, time, reps, result), newest last
+        self._tasks = []
+        self._frame = None  # Last (landmarks, width, height), for finalize/on-demand runs
+
+    def add(self, name, method, mode, every=1):
+        """Schedule owner.<method>; every is reps for PER_REP and milliseconds for EVERY_MS"""
+        if mode not in (PER_REP, EVERY_MS, AT_FINALIZE):
+            raise ValueError(f"Unknown analysis trigger: {mode}")
+        self._tasks = [t for t in self._tasks if t.name != name] + [_Task(name, method, mode, every)]
+
+    def on_frame(self, owner, now, reps, landmarks, frame_width, frame_height):
+        """Run whatever is due on this frame"""
+        self._frame = (landmarks, frame_width, frame_height)
+        for task in self._tasks:
+            if task.mode == EVERY_MS:
+                if task.last_t is not None and (now - task.last_t) * 1000.0 < task.every:
+                    continue
+            elif task.mode == PER_REP:
+                if reps == 0 or reps == task.last_rep or reps % task.every:
+                    continue
+            else:
+                continue
+            self._run(owner, task, now, reps)
+
+    def finalize(self, owner):
+        """Run the AT_FINALIZE analyses on the last frame seen"""
+        for task in self._tasks:
+            if task.mode == AT_FINALIZE:
+                self._run(owner, task, owner.clock(), getattr(owner, 'reps', 0))
+
+    def run(self, owner, name):
+        """Run one analysis now, whatever its trigger; returns its result"""
+        for task in self._tasks:
+            if task.name == name:
+                return self._run(owner, task, owner.clock(), getattr(owner, 'reps', 0))
+        raise KeyError(name)
+
+    def _run(self, owner, task, now, reps):
+        if self._frame is None:
+            return None
+        result = getattr(owner, task.method)(*self._frame)
+        task.result = result
+        task.runs += 1
+        task.last_t = now
+        task.last_rep = reps
+        self.records.append((task.name, now, reps, result))
+        return result
+
+    def result(self, name):
+        """Latest result of an analysis (None until it has run)"""
+        for task in self._tasks:
+            if task.name == name:
+                return task.result
+        raise KeyError(name)
+
+    def runs(self):
+        """{analysis name: number of runs}"""
+        return {task.name: task.runs for task in self._tasks}
+
+    def clear(self):
+        """Forget results and history, keep the schedule"""
+        self.records.clear()
+        self._frame = None
+        for task in self._tasks:
+            task.last_t = task.last_rep = task.result = None
+            task.runs = 0
+
+    def __getstate__(self):
+        return {'max_records': self.max_records, 'records': list(self.records),
+                'tasks': [[t.name, t.method, t.mode, t.every, t.last_t, t.last_rep, t.runs, t.result]
+                          for t in self._tasks]}
+
+    def __setstate__(self, state):
+        self.__init__(state['max_records'])
+        self.records.extend(tuple(r) for r in state['records'])
+        for name, method, mode, every, last_t, last_rep, runs, result in state['tasks']:
+            self.add(name, method, mode, every)
+            task = self._tasks[-1]
+            task.last_t, task.last_rep, task.runs, task.result = last_t, last_rep, runs, result
+
+    def __repr__(self):
+        return f"AnalysisScheduler({', '.join(f'{k}={v}' for k, v in self.runs().items())})"
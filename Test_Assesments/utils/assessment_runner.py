@@ -2,108 +2,246 @@
 Assessment Runner - Handles the exercise execution loop
 """
 
-import cv2
 import time
-from utils.pose_utils import draw_hud
-
-def run_exercises(assessment, args):
-    cap = cv2.VideoCapture(args.camera)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, args.width)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, args.height)
 
-    if not cap.isOpened():
-        raise SystemExit("Could not open webcam.")
+import cv2
+from utils.pose_utils import draw_hud
 
-    
+def _skeleton_drawer():
+    """draw(frame, pose_landmarks) using MediaPipe's pose style (imported only when asked for)"""
     import mediapipe as mp
     mp_pose = mp.solutions.pose
     mp_drawing = mp.solutions.drawing_utils
-    mp_drawing_styles = mp.solutions.drawing_styles
+    style = mp.solutions.drawing_styles.get_default_pose_landmarks_style()
+    return lambda frame, pose_landmarks: mp_drawing.draw_landmarks(
+        frame, pose_landmarks, mp_pose.POSE_CONNECTIONS, landmark_drawing_spec=style)
+
+def run_exercises(assessment, args, prewarmed=None, timer=None, pose_pool=None, io=None, profiler=None,
+                  metrics=None):
+    """Camera/window/keyboard loop around an AssessmentSession
+
+    io (utils.runner_io.RunnerIO) replaces any of the camera, pose model,
+    window, keyboard and clock, e.g. with utils.fake_io stand-ins to run the
+    loop headlessly. profiler (utils.sampling_profiler.SamplingProfiler)
+    samples the loop from the start with args.profile, or whenever 'p' is
+    pressed; it is written out when stopped. metrics (utils.metrics.RunnerMetrics)
+    records frame rate, drops, latencies, saves and reps for the exporters.
+    assessment.cost (utils.session_cost.SessionCost), when set, is charged per
+    exercise for the frames and CPU of this loop. With args.auto_segment the
+    exercise is chosen by utils.segmentation instead of the 'n' key; frames
+    reach the analyzers a few seconds late, once their segment is known.
+    With args.fan_out every frame goes straight to all analyzers that could
+    plausibly be watching (utils.fan_out), for free-form training.
+    """
+    from utils.pose_pool import create_pose
+    from utils.runner_io import RunnerIO, open_camera
+    io = io if io is not None else RunnerIO()
+    draw_skeleton = _skeleton_drawer() if args.show_skeleton else None
+
+    cap, pose = io.capture, io.pose
+    if prewarmed is not None and (cap is None or pose is None):
+        # Camera (and pose graph) were opened in the background during the menu;
+        # use whichever of them io did not supply and release the other
+        try:
+            warm_cap, warm_pose = prewarmed.result()
+        except Exception as e:  # No webcam, or a broken cv2/MediaPipe install
+            raise SystemExit(str(e))
+        if cap is None:
+            cap = warm_cap
+        elif warm_cap is not None:
+            warm_cap.release()
+        if pose is None:
+            pose = warm_pose
+        elif warm_pose is not None:
+            warm_pose.close()
+    elif prewarmed is not None:
+        prewarmed.discard()
+
+    if cap is None:
+        cap = open_camera(args.camera, args.width, args.height)
+
+    if pose is None and pose_pool is not None:
+        # Borrow a warm estimator; it goes back to the pool when the session ends
+        pose_ctx = pose_pool.checkout()
+    else:
+        pose_ctx = pose if pose is not None else create_pose(getattr(args, 'model_complexity', 1))
 
-    with mp_pose.Pose(
-        model_complexity=1,
-        enable_segmentation=False,
-        smooth_landmarks=True,
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5) as pose:
+    with pose_ctx as pose:
         
         info_text = "Position yourself in the frame"
-        assessment.next_exercise()  # Start with the first exercise
+        # The loop below is only camera/window/keyboard glue around the session API
+        from assessment_session import AssessmentSession
+        from utils.events import EventBus, EventType, ConsoleLogger
+        events = EventBus()
+        events.subscribe(ConsoleLogger(), [EventType.FORM_ERROR, EventType.CALIBRATION_DONE])
+        events.start()
+        smoother = None
+        if getattr(args, 'smooth_landmarks', False):
+            from utils.smoothing import LandmarkSmoother
+            smoother = LandmarkSmoother()
+        session = AssessmentSession(assessment=assessment, events=events,  # Starts the first exercise
+                                    checkpoint_path=getattr(args, 'checkpoint', None), smoother=smoother,
+                                    metrics=metrics)
+        if metrics is not None:
+            events.subscribe(metrics.on_event, [EventType.REP_COMPLETED, EventType.FORM_ERROR])
+            metrics.nominal_fps = cap.get(cv2.CAP_PROP_FPS) or metrics.nominal_fps
         
+        from utils.sampling_profiler import profiler_from_args, save_profile
+        profiler = profiler if profiler is not None else profiler_from_args(args)
+        stage = profiler.stage
+        if getattr(args, 'profile', False):
+            profiler.start()
+
+        router = None
+        if getattr(args, 'fan_out', False):
+            from utils.fan_out import FanOutRouter
+            from utils.pose_utils import landmarks_to_array
+            router = FanOutRouter(session)
+        elif getattr(args, 'auto_segment', False):
+            from utils.pose_utils import landmarks_to_array
+            from utils.segmentation import SegmentRouter
+            router = SegmentRouter(session)
+
+        cost = assessment.cost
+        cost_exercise = None
+        if cost is not None:
+            cost.start()
+
         print(f"\nStarting exercise: {assessment.current_exercise.name}")
         print("Make sure you're fully visible in the camera")
-        print("Press 'n' when done with this exercise")
+        if router is None:
+            print("Press 'n' when done with this exercise")
+        else:
+            print("Exercises are detected automatically; press 'q' when done")
+        first_frame_shown = False
         
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
+        # Stopping these restores the switch interval and ends the sampler thread, even on errors
+        try:
+            while True:
+                stage('capture')
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if metrics is not None:
+                    frame_started = time.perf_counter()
+                    metrics.frame(io.clock())
                 
-            frame = cv2.flip(frame, 1)
-            h, w = frame.shape[:2]
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            res = pose.process(rgb)
+                stage('preprocess')
+                frame = cv2.flip(frame, 1)
+                h, w = frame.shape[:2]
+                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                stage('pose')
+                if metrics is not None:
+                    pose_started = time.perf_counter()
+                res = pose.process(rgb)
             
-            current_ex = assessment.current_exercise
+                current_ex = assessment.current_exercise
+                if cost is not None:
+                    if current_ex is not cost_exercise:
+                        cost.switch(current_ex.name if current_ex else None)
+                        cost_exercise = current_ex
+                    cost.frame()
+                if metrics is not None:
+                    metrics.inference.observe(time.perf_counter() - pose_started)
+                    metrics.set_exercise(current_ex.name if current_ex else None)
+                    if not res.pose_landmarks:
+                        metrics.no_pose.inc()
+                    elif not current_ex:
+                        metrics.skipped.inc()
             
-            if res.pose_landmarks:
-                # Always draw skeleton if show_skeleton is enabled
-                if args.show_skeleton:
-                    mp_drawing.draw_landmarks(
-                        frame, res.pose_landmarks, mp_pose.POSE_CONNECTIONS,
-                        landmark_drawing_spec=mp_drawing_styles.get_default_pose_landmarks_style())
+                if res.pose_landmarks:
+                    # Always draw skeleton if show_skeleton is enabled
+                    if draw_skeleton is not None:
+                        stage('draw')
+                        draw_skeleton(frame, res.pose_landmarks)
                 
-                # Update current exercise
-                if current_ex:
-                    current_ex.update(res.pose_landmarks.landmark, w, h)
-                    current_ex.draw_feedback(frame, res.pose_landmarks.landmark, w, h)
+                    # Update current exercise
+                    if current_ex:
+                        if router is None:
+                            stage('exercise')
+                            session.push_frame(res.pose_landmarks.landmark, io.clock(), w, h)
+                        stage('draw')
+                        current_ex.draw_feedback(frame, res.pose_landmarks.landmark, w, h)
+
+                if router is not None:
+                    stage('exercise')
+                    landmarks = landmarks_to_array(res.pose_landmarks.landmark) if res.pose_landmarks else None
+                    segment = router.push(landmarks, io.clock(), w, h)
+                    if segment is not None:
+                        info_text = f"Detected: {segment.label}"
             
-            # Draw HUD with more information
-            draw_hud(frame, assessment, info_text)
+                # Draw HUD with more information
+                stage('draw')
+                draw_hud(frame, assessment, info_text)
             
-            # Add real-time feedback
-            if current_ex:
-                if hasattr(current_ex, 'reps'):
-                    feedback_text = f"Reps: {current_ex.reps}"
-                    if hasattr(current_ex, 'form_errors'):
-                        feedback_text += f" | Form errors: {current_ex.form_errors}"
-                    cv2.putText(frame, feedback_text, (10, h - 90), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+                # Add real-time feedback
+                if current_ex:
+                    if hasattr(current_ex, 'reps'):
+                        feedback_text = f"Reps: {current_ex.reps}"
+                        if hasattr(current_ex, 'form_errors'):
+                            feedback_text += f" | Form errors: {current_ex.form_errors}"
+                        cv2.putText(frame, feedback_text, (10, h - 90), 
+                                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
             
-            # Show frame
-            cv2.imshow("Fitness Assessment", frame)
+                # Show frame
+                stage('display')
+                io.display.show(frame)
+                if timer is not None and not first_frame_shown:
+                    timer.mark("first frame shown")
+                    first_frame_shown = True
             
-            # Process key presses
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'):
-                break
-            elif key == ord('n'):
-                # Generate feedback for completed exercise
-                if current_ex and hasattr(current_ex, 'generate_feedback'):
-                    feedback = current_ex.generate_feedback()
-                    print(f"\n{feedback}")
-                
-                # Move to next exercise or finish
-                if not assessment.next_exercise():
-                    info_text = "Assessment complete! Closing in 3 seconds..."
-                    cv2.imshow("Fitness Assessment", frame)
-                    cv2.waitKey(3000)
+                # Process key presses
+                stage('keys')
+                key = io.keys.read(1)
+                if metrics is not None:
+                    metrics.frame_time.observe(time.perf_counter() - frame_started)
+                if key == ord('q'):
                     break
-                else:
-                    info_text = f"Starting {assessment.current_exercise.name}..."
-                    print(f"\nStarting exercise: {assessment.current_exercise.name}")
-                    time.sleep(1)
+                elif key == ord('n'):
+                    # Generate feedback for completed exercise
+                    if current_ex and hasattr(current_ex, 'generate_feedback'):
+                        feedback = current_ex.generate_feedback()
+                        print(f"\n{feedback}")
+                
+                    # Move to next exercise or finish
+                    if not session.next_exercise():
+                        info_text = "Assessment complete! Closing in 3 seconds..."
+                        io.display.show(frame)
+                        io.keys.read(3000)
+                        break
+                    else:
+                        info_text = f"Starting {assessment.current_exercise.name}..."
+                        print(f"\nStarting exercise: {assessment.current_exercise.name}")
+                        io.sleep(1)
+                        info_text = ""
+                elif key == ord('s'):
+                    # Save results
+                    from utils.results_manager import save_assessment_results
+                    if metrics is not None:
+                        success, msg = metrics.timed_save('results', save_assessment_results, assessment.exercises)
+                    else:
+                        success, msg = save_assessment_results(assessment.exercises)
+                    info_text = msg
+                    io.sleep(2)
                     info_text = ""
-            elif key == ord('s'):
-                # Save results
-                from utils.results_manager import save_assessment_results
-                success, msg = save_assessment_results(assessment.exercises)
-                info_text = msg
-                time.sleep(2)
-                info_text = ""
-            elif key == ord('d'):  # Debug key
-                if current_ex:
-                    print(f"Debug: {current_ex.name} - Reps: {current_ex.reps}, Errors: {current_ex.form_errors}")
+                elif key == ord('d'):  # Debug key
+                    if current_ex:
+                        print(f"Debug: {current_ex.name} - Reps: {current_ex.reps}, Errors: {current_ex.form_errors}")
+                elif key == ord('p'):  # Profile a stretch of a live session
+                    if profiler.toggle():
+                        print("\nProfiling... press 'p' again to stop")
+                    else:
+                        save_profile(profiler, args)
+
+            if router is not None:
+                router.flush()
+                assessment.segments = router.segmenter.finish(io.clock())
+        finally:
+            if cost is not None:
+                cost.stop()
+            profiler.stop()
+            events.stop()
+        save_profile(profiler, args)
     
     cap.release()
-    cv2.destroyAllWindows()
\ No newline at end of file
+    io.display.close()
\ No newline at end of file
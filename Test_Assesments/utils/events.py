@@ -0,0 +1,165 @@
+"""
+Events - Typed exercise events delivered off the hot path
+
+Exercises publish through BaseExercise.emit(). Publishing appends to a deque
+(atomic under the GIL, so no lock is taken) and returns in about a
+microsecond. A dispatcher thread hands events to subscribers (HUD, console
+logger, results writer, network push), so a slow subscriber never stalls
+pose processing.
+
+    bus = EventBus()
+    bus.subscribe(ConsoleLogger(), [EventType.FORM_ERROR, EventType.CALIBRATION_DONE])
+    bus.start()
+    exercise.events = bus
+"""
+
+import threading
+from collections import deque
+from enum import Enum
+
+
+class EventType(Enum):
+    REP_COMPLETED = 'rep_completed'
+    FORM_ERROR = 'form_error'
+    CALIBRATION_DONE = 'calibration_done'
+    STAGE_CHANGED = 'stage_changed'
+    EXERCISE_COMPLETED = 'exercise_completed'
+
+
+class Event:
+    """One exercise event; metrics holds the event-specific values"""
+    __slots__ = ('type', 'exercise', 'timestamp', 'metrics')
+
+    def __init__(self, type, exercise, timestamp, metrics):
+        self.type = type
+        self.exercise = exercise
+        self.timestamp = timestamp
+        self.metrics = metrics
+
+    def to_dict(self):
+        return {'type': self.type.value, 'exercise': self.exercise,
+                'timestamp': self.timestamp, **self.metrics}
+
+    def __repr__(self):
+        return f"Event({self.type.value}, {self.exercise}, t={self.timestamp:.3f}, {self.metrics})"
+
+
+class EventBus:
+    """Lock-free publish, threaded dispatch
+
+    When more than max_pending events are waiting, the oldest are dropped
+    (counted in dropped), so a stuck subscriber cannot grow memory without bound.
+    """
+
+    def __init__(self, max_pending=10000, poll_interval=0.05):
+        self._queue = deque(maxlen=max_pending)
+        self._subscribers = []
+        self._wakeup = threading.Event()
+        self._idle = False
+        self._thread = None
+        self._running = False
+        self.poll_interval = poll_interval
+        self.published = 0
+        self.delivered = 0
+        self.handler_errors = 0
+
+    def subscribe(self, handler, types=None):
+        """Call handler(event) for the given EventTypes (all types when None)"""
+        entry = (handler, frozenset(types) if types else None)
+        self._subscribers = self._subscribers + [entry]  # Copy-on-write; dispatch iterates a snapshot
+        return entry
+
+    def unsubscribe(self, entry):
+        self._subscribers = [s for s in self._subscribers if s is not entry]
+
+    def publish(self, event_type, exercise, timestamp, metrics):
+        self._queue.append(Event(event_type, exercise, timestamp, metrics))
+        self.published += 1
+        if self._idle:
+            self._wakeup.set()
+
+    @property
+    def dropped(self):
+        return self.published - self.delivered - len(self._queue)
+
+    def dispatch_pending(self):
+        """Deliver everything queued so far on the calling thread; returns the count"""
+        count = 0
+        while True:
+            try:
+                event = self._queue.popleft()
+            except IndexError:
+                return count
+            for handler, types in self._subscribers:
+                if types is None or event.type in types:
+                    try:
+                        handler(event)
+                    except Exception as e:
+                        self.handler_errors += 1
+                        if self.handler_errors == 1:
+                            print(f"Event handler error ({event.type.value}): {e}")
+            self.delivered += 1
+            count += 1
+
+    def start(self):
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="event-dispatch", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while self._running:
+            if not self.dispatch_pending():
+                self._idle = True
+                if not self._queue:
+                    self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                self._idle = False
+
+    def stop(self):
+        """Deliver what is left and stop the dispatcher"""
+        if self._thread is not None:
+            self._running = False
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+        self.dispatch_pending()
+
+
+class ConsoleLogger:
+    """Subscriber that prints the notes the exercises used to print themselves
+
+    Only the squat valgus note and the plank calibration line were printed
+    before there were events, once per rep or per exercise, and by default
+    nothing else reaches the console: other form errors (a swaying one-leg
+    stand raises one every few frames) would put prints back in the frame
+    loop. verbose=True prints every event the logger is subscribed to.
+    """
+
+    def __init__(self, form_errors=('knee_valgus',), calibrations=('Plank',), verbose=False):
+        self.form_errors = frozenset(form_errors)
+        self.calibrations = frozenset(calibrations)
+        self.verbose = verbose
+
+    def __call__(self, event):
+        m = event.metrics
+        if event.type is EventType.FORM_ERROR and m.get('error') in self.form_errors:
+            if m.get('error') == 'knee_valgus':
+                print(f"Form note: valgus ratio {m['valgus_ratio']:.2f} > {m['threshold']}")
+            else:
+                print(f"Form note ({event.exercise}): {m.get('error')}")
+        elif event.type is EventType.CALIBRATION_DONE and event.exercise in self.calibrations:
+            print(f"{event.exercise} calibration complete!")
+        elif self.verbose:
+            if event.type is EventType.FORM_ERROR:
+                detail = ", ".join(f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}"
+                                   for k, v in m.items())
+                print(f"Form note ({event.exercise}): {detail}")
+            elif event.type is EventType.CALIBRATION_DONE:
+                print(f"{event.exercise} calibration complete!")
+            elif event.type is EventType.EXERCISE_COMPLETED:
+                print(f"{event.exercise} completed: {m.get('reps', 0)} reps, "
+                      f"{m.get('duration', 0.0):.1f}s, {m.get('form_errors', 0)} form errors")
+            else:
+                print(event)
@@ -0,0 +1,252 @@
+"""
+Fake I/O - Headless, reproducible stand-ins for the runner's camera, pose model, window and keyboard
+
+Plugs into utils.runner_io.RunnerIO so the full interactive loop can be
+benchmarked or load-tested without a webcam, a display or a person:
+
+    clock = FakeClock()
+    capture = FakeCapture(count=900, fps=30, clock=clock)
+    io = RunnerIO(capture=capture,
+                  pose=FakePose(landmarks, frame_index=capture.frame_index),  # (N, 33, 4) replay
+                  display=NullDisplay(),
+                  keys=ScriptedKeys("300:n,600:s,899:q", clock=clock, frame_index=capture.frame_index),
+                  clock=clock, sleep=clock.sleep)
+    run_exercises(assessment, args, io=io)
+
+With a FakeClock the loop runs as fast as it can on frame time, so results
+are identical from run to run. FakeCapture(realtime=True) instead paces reads
+at the requested rate on the wall clock and drops frames the loop was too
+slow to take, as a live camera does.
+"""
+
+import time
+
+import numpy as np
+
+from utils.pose_utils import landmarks_from_array
+from utils.runner_io import NO_KEY
+
+
+class FakeClock:
+    """Virtual seconds; sleep() advances time instead of blocking"""
+
+    def __init__(self, t=0.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+    def sleep(self, seconds):
+        self.t += seconds
+
+
+class FakeCapture:
+    """Generates (or cycles through given) BGR frames at a controlled rate"""
+
+    def __init__(self, count, fps=30.0, width=960, height=540, frames=None, clock=None, realtime=False):
+        self.count = count
+        self.fps = fps
+        self.clock = clock
+        self.realtime = realtime
+        if frames is None:
+            frames = [np.full((height, width, 3), 96, dtype=np.uint8)]
+        self.frames = frames
+        self.position = 0  # Index of the next frame
+        self.dropped = 0
+        self._start = None
+        self._open = True
+
+    def frame_index(self):
+        """Index of the frame most recently read (what FakePose should return)"""
+        return self.position - 1
+
+    def isOpened(self):
+        return self._open
+
+    def get(self, prop):
+        """cv2.VideoCapture.get for the frame rate; other properties read as 0"""
+        return float(self.fps) if prop == 5 else 0.0  # 5 == cv2.CAP_PROP_FPS
+
+    def read(self):
+        if not self._open or self.position >= self.count:
+            return False, None
+        if self.realtime:
+            now = time.monotonic()
+            if self._start is None:
+                self._start = now
+            due = int((now - self._start) * self.fps)  # Newest frame the camera has produced
+            if due > self.position:
+                # The loop fell behind; a camera would have overwritten these frames
+                self.dropped += min(due, self.count) - self.position
+                self.position = min(due, self.count - 1)
+            else:
+                time.sleep(max(0.0, self._start + self.position / self.fps - now))
+        elif self.clock is not None:
+            self.clock.t += 1.0 / self.fps  # Never back: runner sleeps advance the same clock
+        frame = self.frames[self.position % len(self.frames)]
+        self.position += 1
+        return True, frame
+
+    def release(self):
+        self._open = False
+
+
+class _Result:
+    __slots__ = ('pose_landmarks',)
+
+    def __init__(self, pose_landmarks):
+        self.pose_landmarks = pose_landmarks
+
+
+class _Pose:
+    __slots__ = ('landmark',)
+
+    def __init__(self, landmark):
+        self.landmark = landmark
+
+
+class FakePose:
+    """Replays landmark arrays as if a pose model had produced them
+
+    landmarks is an (N, 33, 4) array; frames where detected is False return no
+    pose. frame_index (e.g. FakeCapture.frame_index) keeps the replay in step
+    with a capture that drops frames; otherwise every process() call takes the
+    next frame, cycling at the end. latency adds a fixed inference cost per call.
+    """
+
+    def __init__(self, landmarks, detected=None, frame_index=None, latency=0.0):
+        self.landmarks = np.asarray(landmarks, dtype=np.float64)
+        self.detected = np.ones(len(self.landmarks), dtype=bool) if detected is None else np.asarray(detected, dtype=bool)
+        self.frame_index = frame_index
+        self.latency = latency
+        self.calls = 0
+
+    @classmethod
+    def from_entry(cls, entry, **kwargs):
+        """From a PoseCache entry / .npz landmark upload"""
+        return cls(entry['landmarks'], entry.get('detected'), **kwargs)
+
+    def process(self, rgb):
+        i = self.frame_index() if self.frame_index is not None else self.calls
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        i %= len(self.landmarks)
+        if not self.detected[i]:
+            return _Result(None)
+        return _Result(_Pose(landmarks_from_array(self.landmarks[i])))
+
+    def reset(self):
+        self.calls = 0
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class FakeMultiPose:
+    """Replays several people's landmark arrays as a multi-pose detector would report them
+
+    landmarks is (N, P, 33, 4) for P people; detected (N, P) marks who is
+    found in each frame. Like a real detector, the people come back in no
+    particular order (shuffled with a fixed seed) unless shuffle is False.
+    frame_index and latency work as for FakePose.
+    """
+
+    def __init__(self, landmarks, detected=None, frame_index=None, latency=0.0, shuffle=True, seed=0):
+        self.landmarks = np.asarray(landmarks, dtype=np.float32)
+        shape = self.landmarks.shape[:2]
+        self.detected = np.ones(shape, dtype=bool) if detected is None else np.asarray(detected, dtype=bool)
+        self.frame_index = frame_index
+        self.latency = latency
+        self.rng = np.random.default_rng(seed) if shuffle else None
+        self.calls = 0
+
+    def detect(self, rgb, timestamp=None):
+        i = self.frame_index() if self.frame_index is not None else self.calls
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        i %= len(self.landmarks)
+        people = np.flatnonzero(self.detected[i])
+        if self.rng is not None:
+            people = self.rng.permutation(people)
+        return [self.landmarks[i, p] for p in people]
+
+    def reset(self):
+        self.calls = 0
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class NullDisplay:
+    """Swallows frames; counts them and keeps when each was shown"""
+
+    def __init__(self, record_times=False):
+        self.shown = 0
+        self.last_frame = None
+        self.times = [] if record_times else None
+
+    def show(self, frame):
+        self.shown += 1
+        self.last_frame = frame
+        if self.times is not None:
+            self.times.append(time.perf_counter())
+
+    def close(self):
+        pass
+
+
+def parse_key_script(script):
+    """'300:n,600:s,899:q' -> {300: 'n', 600: 's', 899: 'q'}"""
+    keys = {}
+    for item in script.split(","):
+        if item.strip():
+            at, key = item.split(":")
+            keys[int(at)] = key.strip()
+    return keys
+
+
+class ScriptedKeys:
+    """Presses keys at scripted points of the run
+
+    script is {index: key} or a '300:n,600:s' string. Indexes count read()
+    calls (the runner reads once per frame) unless frame_index is given (e.g.
+    FakeCapture.frame_index), in which case a key fires on the first read at
+    or after that frame, so a capture that drops frames cannot skip it. With a
+    clock, the time a read would block (e.g. the 3 s pause at the end) is
+    advanced virtually.
+    """
+
+    def __init__(self, script, clock=None, frame_index=None):
+        script = parse_key_script(script) if isinstance(script, str) else dict(script)
+        self.pending = sorted(script.items())
+        self.clock = clock
+        self.frame_index = frame_index
+        self.reads = 0
+        self.pressed = []
+
+    def read(self, delay_ms=1):
+        at = self.frame_index() if self.frame_index is not None else self.reads
+        self.reads += 1
+        if self.clock is not None and delay_ms > 1:
+            self.clock.sleep(delay_ms / 1000.0)
+        if not self.pending or self.pending[0][0] > at:
+            return NO_KEY
+        key = self.pending.pop(0)[1]
+        self.pressed.append(key)
+        return ord(key)
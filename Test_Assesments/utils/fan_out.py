@@ -0,0 +1,146 @@
+"""
+Fan Out - Runs every exercise analyzer of a flow on one shared landmark stream
+
+For free-form training, where nobody says which exercise comes next, each
+frame goes to all analyzers that could plausibly be watching the athlete
+instead of only the current one. The work that does not depend on the
+analyzer happens once per frame: the landmark array is converted to the
+landmark list once (and not at all while every gate is closed), and the
+segmenter's window features (utils.segmentation) are computed once per hop
+and shared by every analyzer's gate.
+
+A gate opens when `confirm` windows in a row look like its exercise type,
+with thresholds looser than classify() so it opens early, and stays open
+for hold_s after the last such window so pauses between reps do not close
+it. Timed holds (plank, one-leg stand) need twice as many: their timers
+cannot tell a closed gate from a steady hold, so a brief plank-like pose in
+a transition would otherwise run the clock on until the gate next opened.
+When a gate opens, the analyzer first gets the frames of the
+windows that opened it, so the start of the first rep is not lost. Analyzers with a
+closed gate cost nothing:
+
+    router = FanOutRouter(session)
+    router.push(landmarks, t, w, h)        # per frame; (33, 4) array or None
+
+The current exercise follows the segmenter's label (for the HUD and state());
+reps are counted by every analyzer whose gate was open.
+"""
+
+from collections import deque
+
+import numpy as np
+
+from utils.pose_utils import landmarks_from_array
+from utils.segmentation import ActivitySegmenter
+
+# Exercises timed rather than counted: their gates need steadier evidence
+HOLD_TYPES = ('plank', 'one_leg_stand')
+
+
+def plausible_types(features):
+    """Exercise types one window's features (window_features()) could belong to"""
+    types = set()
+    tilt = features['tilt']
+    if features['tilt_range'] > 25 and features['hip_height_range'] < 0.3:
+        types.add('situps')
+    if tilt > 40:  # Horizontal: supported on hands or forearms
+        if features['elbow_range'] > 35:
+            types.add('pushups')
+        if features['motion'] < 0.25:
+            types.add('plank')
+    if tilt < 50:  # Upright
+        if features['ankle_lift'] > 0.15:
+            types.add('vertical_jump')
+        if features['hip_height_range'] > 0.18:
+            types.add('squats')
+        if features['ankle_gap'] > 0.12:
+            types.add('one_leg_stand')
+    return types
+
+
+class FanOutRouter:
+    """Feeds a frame to every analyzer of an AssessmentSession whose confidence gate is open"""
+
+    def __init__(self, session, segmenter=None, hold_s=3.0, confirm=2):
+        self.session = session
+        self.segmenter = segmenter if segmenter is not None else ActivitySegmenter()
+        self.hold_s = hold_s
+        self.confirm = confirm
+        spec = session.assessment.spec or {'exercises': []}
+        self.exercises_of = {}
+        for entry, exercise in zip(spec['exercises'], session.assessment.exercises):
+            self.exercises_of.setdefault(entry['type'], []).append(exercise)
+        self.index_of = {}
+        for i, entry in enumerate(spec['exercises']):
+            self.index_of.setdefault(entry['type'], i)
+        self.open_types = set()
+        self.gated_frames = 0   # Analyzer updates skipped by closed gates
+        self.updates = 0        # Analyzer updates made (replays included)
+        self._seen = {}         # type -> time its gate was last confirmed
+        self._streak = {}       # type -> plausible windows in a row
+        self._fed = {}          # exercise -> timestamp of the last frame it was given
+        self._history = deque() # (t, landmark list or array, w, h) over the last windows
+
+    def push(self, landmarks, t, frame_width=960, frame_height=540):
+        """Add a frame ((33, 4) array or None); returns the Segment that started, if any"""
+        segmenter, session = self.segmenter, self.session
+        segment = segmenter.push(landmarks, t, frame_width, frame_height)
+        if segmenter.decided_at == t:
+            self._update_gates(t)
+        if segment is not None:
+            index = self.index_of.get(segment.label)
+            if index is not None and index != session.assessment.current_exercise_idx:
+                session.select_exercise(index)
+
+        targets = [ex for ex_type in self.open_types for ex in self.exercises_of.get(ex_type, ())]
+        session.push_frame(landmarks, t, frame_width, frame_height, targets=targets)
+        shared = session.last_landmarks
+        if shared is not None:
+            t = session.clock.t  # Exercise time (differs from t once a checkpoint is resumed)
+            self.updates += len(targets)
+            self.gated_frames += len(session.assessment.exercises) - len(targets)
+            for exercise in targets:
+                self._fed[exercise] = t
+            history = self._history
+            history.append((t, shared, frame_width, frame_height))
+            keep = segmenter.window_s + (2 * self.confirm - 1) * segmenter.hop_s
+            while history[0][0] < t - keep:
+                history.popleft()
+        return segment
+
+    def flush(self):
+        """Nothing is held back (the SegmentRouter interface)"""
+
+    def _update_gates(self, t):
+        features = self.segmenter.features
+        plausible = plausible_types(features) if features is not None else ()
+        streak = self._streak
+        for ex_type in list(streak):
+            if ex_type not in plausible:
+                del streak[ex_type]
+        for ex_type in plausible:
+            streak[ex_type] = streak.get(ex_type, 0) + 1
+            needed = 2 * self.confirm if ex_type in HOLD_TYPES else self.confirm
+            if streak[ex_type] >= needed or ex_type in self.open_types:
+                self._seen[ex_type] = t
+        opened = {ex_type for ex_type, seen in self._seen.items() if t - seen <= self.hold_s}
+        for ex_type in opened - self.open_types:
+            for exercise in self.exercises_of.get(ex_type, ()):
+                self._replay(exercise)
+        self.open_types = opened
+
+    def _replay(self, exercise):
+        """Give a newly gated-in analyzer the recent frames it has not seen"""
+        clock = self.session.clock
+        fed = self._fed.get(exercise, float('-inf'))
+        history = self._history
+        for i, (t, landmarks, w, h) in enumerate(history):
+            if t > fed:
+                if isinstance(landmarks, np.ndarray):  # Converted once, for every analyzer replayed
+                    landmarks = landmarks_from_array(landmarks)
+                    history[i] = (t, landmarks, w, h)
+                clock.t = t
+                exercise.update(landmarks, w, h)
+                self.updates += 1
+        if self._history:
+            self._fed[exercise] = self._history[-1][0]
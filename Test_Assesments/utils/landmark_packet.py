@@ -0,0 +1,45 @@
+"""
+Landmark Packet - Compact wire format for client-side pose landmarks
+
+One packet per frame, little-endian:
+
+    float64 timestamp (seconds)
+    33 x 4 uint16 quantized x, y, z, visibility  (omitted when no pose was found)
+
+That is 272 bytes per frame instead of an encoded video frame. x and y are
+normalized image coordinates and may fall slightly outside [0, 1], so each
+channel is quantized over the range in PACKET_RANGES (about 5e-5 steps for x/y).
+"""
+
+import struct
+
+import numpy as np
+
+NUM_LANDMARKS = 33
+PACKET_HEADER = struct.Struct("<d")
+PACKET_SIZE = PACKET_HEADER.size + NUM_LANDMARKS * 4 * 2
+
+# (low, high) per channel: x, y, z, visibility
+PACKET_RANGES = np.array([(-1.0, 2.0), (-1.0, 2.0), (-2.0, 2.0), (0.0, 1.0)], dtype=np.float32)
+_LOW = PACKET_RANGES[:, 0]
+_STEP = (PACKET_RANGES[:, 1] - PACKET_RANGES[:, 0]) / 65535.0
+
+
+def encode_landmark_packet(landmarks, timestamp):
+    """(33, 4) array of x, y, z, visibility (or None) -> packet bytes"""
+    header = PACKET_HEADER.pack(timestamp)
+    if landmarks is None:
+        return header
+    q = np.rint((np.asarray(landmarks, dtype=np.float32) - _LOW) / _STEP)
+    return header + np.clip(q, 0, 65535).astype("<u2").tobytes()
+
+
+def decode_landmark_packet(payload):
+    """Packet bytes -> ((33, 4) float32 array or None, timestamp)"""
+    if len(payload) not in (PACKET_HEADER.size, PACKET_SIZE):
+        raise ValueError(f"Landmark packet must be {PACKET_HEADER.size} or {PACKET_SIZE} bytes")
+    timestamp = PACKET_HEADER.unpack_from(payload)[0]
+    if len(payload) == PACKET_HEADER.size:
+        return None, timestamp
+    q = np.frombuffer(payload, dtype="<u2", offset=PACKET_HEADER.size).reshape(NUM_LANDMARKS, 4)
+    return q * _STEP + _LOW, timestamp
@@ -0,0 +1,418 @@
+"""
+Metrics - Operational counters, gauges and histograms for stations
+
+A small, dependency-free subset of the Prometheus client model. Updates take
+one uncontended lock (a few hundred nanoseconds), so the runner records every
+frame; exporters read from other threads:
+
+    metrics = RunnerMetrics()
+    serve_metrics(metrics.registry, port=9108)                   # GET /metrics, /metrics.json
+    JsonLinesExporter(metrics.registry, "metrics.jsonl", 10).start()
+
+    metrics.frame(t)                       # per captured frame
+    metrics.inference.observe(seconds)     # pose.process latency
+    bus.subscribe(metrics.on_event, [EventType.REP_COMPLETED, EventType.FORM_ERROR])
+
+Values that already live elsewhere (process CPU and RSS, multi-stream
+statistics) are registered as collectors and read only when scraped.
+"""
+
+import json
+import os
+import resource
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.events import EventType
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.02, 0.033, 0.05, 0.075, 0.1, 0.15, 0.25, 0.5, 1.0)
+SAVE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _label_text(names, values):
+    if not names:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in values)
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, escaped)) + "}"
+
+
+def _sample_text(value):
+    """Exposition value: integers exactly, floats at full precision (:g would round to 6 digits)"""
+    value = float(value)
+    if value != value:
+        return "NaN"
+    if value in (float('inf'), float('-inf')):
+        return "+Inf" if value > 0 else "-Inf"
+    if value.is_integer() and abs(value) < 2 ** 53:
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    """Base: a metric with optional labels; labels(...) returns a cached child"""
+    type = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def labels(self, *values, **kwargs):
+        key = tuple(values) if values else tuple(kwargs[n] for n in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _only(self):
+        return self._children[()]
+
+    def samples(self):
+        """[(suffix, label names, label values, value), ...] for export"""
+        out = []
+        for key, child in list(self._children.items()):
+            out.extend((suffix, self.labelnames + extra_names, key + extra_values, value)
+                       for suffix, extra_names, extra_values, value in child.samples())
+        return out
+
+
+class _CounterChild:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+    def samples(self):
+        return [("_total", (), (), self.value)]
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1.0):
+        self._only().inc(amount)
+
+    @property
+    def value(self):
+        return self._only().value
+
+
+class _GaugeChild:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value):
+        self.value = value  # A single store is atomic; no lock needed
+
+    def samples(self):
+        return [("", (), (), self.value)]
+
+
+class Gauge(_Metric):
+    type = 'gauge'
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        self._only().set(value)
+
+    @property
+    def value(self):
+        return self._only().value
+
+
+class _HistogramChild:
+    __slots__ = ('bounds', 'counts', 'sum', 'count', '_lock')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last bucket is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def samples(self):
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        out, running = [], 0
+        for bound, c in zip(self.bounds + (float('inf'),), counts):
+            running += c
+            out.append(("_bucket", ("le",), ("+Inf" if bound == float('inf') else f"{bound:g}",), running))
+        out.append(("_sum", (), (), total))
+        out.append(("_count", (), (), count))
+        return out
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._only().observe(value)
+
+
+class MetricsRegistry:
+    """Named metrics plus scrape-time collectors, rendered as Prometheus text or JSON"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _add(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()):
+        return self._add(Gauge(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collect):
+        """collect() -> [(name, type, help, [(labels dict, value), ...]), ...], called per scrape"""
+        with self._lock:
+            self._collectors.append(collect)
+
+    def _families(self):
+        for metric in list(self._metrics):
+            yield metric.name, metric.type, metric.help, metric.samples()
+        for collect in list(self._collectors):
+            for name, type_, help_, values in collect():
+                yield name, type_, help_, [("_total" if type_ == 'counter' else "", tuple(labels),
+                                            tuple(labels.values()), value) for labels, value in values]
+
+    def render_prometheus(self):
+        lines = []
+        for name, type_, help_, samples in self._families():
+            # Counter samples end in _total; the 0.0.4 parser only types them under that name
+            family = name + "_total" if type_ == 'counter' else name
+            lines.append(f"# HELP {family} {help_}")
+            lines.append(f"# TYPE {family} {type_}")
+            for suffix, names, values, value in samples:
+                lines.append(f"{name}{suffix}{_label_text(names, values)} {_sample_text(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """{name+suffix: value or {label text: value}} for the JSON outputs"""
+        out = {}
+        for name, _, _, samples in self._families():
+            for suffix, names, values, value in samples:
+                key = name + suffix
+                if names:
+                    out.setdefault(key, {})[",".join(f"{n}={v}" for n, v in zip(names, values))] = value
+                else:
+                    out[key] = value
+        return out
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Peak, where /proc is missing
+
+
+def process_collector():
+    return [('process_cpu_seconds', 'counter', "User and system CPU time of this process",
+             [({}, time.process_time())]),
+            ('process_resident_memory_bytes', 'gauge', "Resident set size", [({}, rss_bytes())])]
+
+
+class RunnerMetrics:
+    """The station metrics set, with the per-frame bookkeeping the runner needs
+
+    Dropped frames are estimated from gaps between captures: a camera keeps
+    producing at its nominal rate, so a gap of k periods means k - 1 frames
+    were never read. Fractions of a period carry over, since a loop that
+    takes 1.5 periods per frame drops every other frame. Skipped frames were
+    read but given to no exercise.
+    """
+
+    def __init__(self, registry=None, nominal_fps=30.0):
+        r = self.registry = registry if registry is not None else MetricsRegistry()
+        self.frames = r.counter("fitness_frames", "Frames captured")
+        self.capture_fps = r.gauge("fitness_capture_fps", "Frames captured per second, over the last second")
+        self.dropped = r.counter("fitness_frames_dropped", "Camera frames never read (estimated from capture gaps)")
+        self.skipped = r.counter("fitness_frames_skipped", "Frames read but not given to an exercise")
+        self.no_pose = r.counter("fitness_frames_no_pose", "Frames where no pose was detected")
+        self.inference = r.histogram("fitness_inference_seconds", "Pose inference latency")
+        self.frame_time = r.histogram("fitness_frame_seconds", "Whole loop iteration time")
+        self.save = r.histogram("fitness_save_seconds", "Result and checkpoint save latency", ("kind",),
+                                buckets=SAVE_BUCKETS)
+        self.active = r.gauge("fitness_active_exercise", "1 for the exercise in progress", ("exercise",))
+        self.reps = r.counter("fitness_reps", "Completed reps (and jumps)", ("exercise",))
+        self.form_errors = r.counter("fitness_form_errors", "Form errors", ("exercise",))
+        r.add_collector(process_collector)
+        self.nominal_fps = nominal_fps
+        self.exporter = None  # JsonLinesExporter flushed by close()
+        self._last_t = None
+        self._owed = 0.0  # Periods elapsed beyond one per frame read
+        self._window_t = None
+        self._window_n = 0
+        self._active_name = None
+
+    def frame(self, t):
+        """A frame was captured at t (seconds)"""
+        self.frames.inc()
+        if self._last_t is not None and self.nominal_fps:
+            # Clamped below so timestamp jitter cannot bank credit against later drops
+            self._owed = max(self._owed + (t - self._last_t) * self.nominal_fps - 1.0, -0.5)
+            if self._owed >= 1.0:
+                missed = int(self._owed)
+                self._owed -= missed
+                self.dropped.inc(missed)
+        self._last_t = t
+        if self._window_t is None:
+            self._window_t = t
+        self._window_n += 1
+        if t - self._window_t >= 1.0:
+            self.capture_fps.set(round(self._window_n / (t - self._window_t), 2))
+            self._window_t, self._window_n = t, 0
+
+    def set_exercise(self, name):
+        if name == self._active_name:
+            return
+        if self._active_name is not None:
+            self.active.labels(self._active_name).set(0)
+        if name is not None:
+            self.active.labels(name).set(1)
+        self._active_name = name
+
+    def on_event(self, event):
+        """EventBus subscriber for REP_COMPLETED and FORM_ERROR"""
+        if event.type is EventType.REP_COMPLETED:
+            self.reps.labels(event.exercise).inc()
+        elif event.type is EventType.FORM_ERROR:
+            self.form_errors.labels(event.exercise).inc()
+
+    def timed_save(self, kind, save, *args, **kwargs):
+        """Run save(*args, **kwargs), recording how long it took"""
+        started = time.perf_counter()
+        try:
+            return save(*args, **kwargs)
+        finally:
+            self.save.labels(kind).observe(time.perf_counter() - started)
+
+    def close(self):
+        """Write the last JSON line (the HTTP endpoint dies with the process)"""
+        if self.exporter is not None:
+            self.exporter.stop()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = None
+
+    def do_GET(self):
+        path = self.path.split("?")[0].rstrip("/")
+        if path == "/metrics":
+            body, content_type = self.registry.render_prometheus(), "text/plain; version=0.0.4"
+        elif path == "/metrics.json":
+            body, content_type = json.dumps(self.registry.snapshot()), "application/json"
+        else:
+            self.send_error(404)
+            return
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would flood the console
+
+
+def serve_metrics(registry, port, host="127.0.0.1"):
+    """Serve /metrics (Prometheus text) and /metrics.json from a daemon thread; returns the server"""
+    handler = type("BoundMetricsHandler", (_MetricsHandler,), {'registry': registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+class JsonLinesExporter:
+    """Appends a timestamped snapshot to a file every interval seconds (and on stop)"""
+
+    def __init__(self, registry, path, interval=10.0):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="metrics-jsonl", daemon=True)
+        self._thread.start()
+        return self
+
+    def write(self):
+        line = json.dumps({'time': round(time.time(), 3), **self.registry.snapshot()})
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.write()
+
+
+def metrics_from_args(args):
+    """RunnerMetrics with the exporters main.py's --metrics-* options ask for, or None"""
+    port = getattr(args, 'metrics_port', None)
+    jsonl = getattr(args, 'metrics_jsonl', None)
+    if not port and not jsonl:
+        return None
+    metrics = RunnerMetrics()
+    if port:
+        serve_metrics(metrics.registry, port, getattr(args, 'metrics_host', "127.0.0.1"))
+        print(f"Metrics on http://{getattr(args, 'metrics_host', '127.0.0.1')}:{port}/metrics")
+    if jsonl:
+        metrics.exporter = JsonLinesExporter(metrics.registry, jsonl, getattr(args, 'metrics_interval', 10.0)).start()
+    return metrics
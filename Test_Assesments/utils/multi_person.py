@@ -0,0 +1,404 @@
+"""
+Multi Person - Several athletes in front of one camera
+
+One multi-pose detection pass (MediaPipe's Tasks PoseLandmarker with
+num_poses > 1) finds everybody in the frame, PoseTracker keeps each person's
+id from frame to frame, and TeamSession gives every tracked athlete an
+AssessmentSession of their own, so exercise state, results and cost are
+per athlete:
+
+    team = TeamSession({'exercises': ['squats']})
+    with MultiPose(model_path, num_poses=4) as detector:
+        poses = detector.detect(rgb, t)          # [(33, 4) array], in no particular order
+        team.push(poses, t, w, h)                # per frame
+    team.finish()
+    team.save_results()                          # <results>_athlete<id>.csv per athlete
+
+The detection pass is shared, so another athlete adds one tracker match and
+one exercise update per frame (tens of microseconds), not another inference
+(tens of milliseconds).
+
+Tracking matches torso centres (shoulders and hips) to where each track is
+predicted to be, greedily by distance in torso lengths, so it does not rely
+on the detector listing people in the same order every frame. A new person
+becomes an athlete after min_hits frames in a row (someone walking through
+does not), and an athlete not seen for max_missing_s is dropped; their
+results are kept. Each athlete's landmarks are shifted sideways so they
+stand where a solo athlete would (the frame centre), which is what
+analyzers judging sway against the centre expect.
+"""
+
+import os
+import time
+
+import numpy as np
+
+# Shoulders and hips
+TORSO = [11, 12, 23, 24]
+DEFAULT_POSE_MODEL = "pose_landmarker_full.task"
+
+
+class MultiPose:
+    """MediaPipe Tasks PoseLandmarker that finds up to num_poses people in one pass"""
+
+    def __init__(self, model_path=DEFAULT_POSE_MODEL, num_poses=4, min_detection_confidence=0.5,
+                 min_tracking_confidence=0.5):
+        if not os.path.isfile(model_path):
+            raise SystemExit(f"Pose landmarker model not found: {model_path} (download a "
+                             "pose_landmarker_*.task model from MediaPipe and pass --pose-model)")
+        import mediapipe as mp
+        from mediapipe.tasks.python import BaseOptions, vision
+
+        self._mp = mp
+        options = vision.PoseLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.VIDEO,
+            num_poses=num_poses,
+            min_pose_detection_confidence=min_detection_confidence,
+            min_pose_presence_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence)
+        self.landmarker = vision.PoseLandmarker.create_from_options(options)
+        self._last_ms = -1
+
+    def detect(self, rgb, timestamp):
+        """(33, 4) x, y, z, visibility arrays, one per person found in an RGB frame"""
+        # Video mode needs strictly increasing millisecond timestamps
+        ms = max(int(timestamp * 1000), self._last_ms + 1)
+        self._last_ms = ms
+        image = self._mp.Image(image_format=self._mp.ImageFormat.SRGB, data=np.ascontiguousarray(rgb))
+        result = self.landmarker.detect_for_video(image, ms)
+        return [np.array([(lm.x, lm.y, lm.z, lm.visibility if lm.visibility is not None else 1.0)
+                          for lm in pose], dtype=np.float32)
+                for pose in result.pose_landmarks]
+
+    def close(self):
+        self.landmarker.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def torso_centres(poses, aspect):
+    """(k, 2) torso centres and (k,) torso lengths of k poses, in frame heights"""
+    points = np.stack(poses)[:, TORSO, :2].astype(np.float64)
+    points[..., 0] *= aspect
+    centres = points.mean(axis=1)
+    torso = (points[:, 0] + points[:, 1] - points[:, 2] - points[:, 3]) / 2
+    return centres, np.hypot(torso[:, 0], torso[:, 1])
+
+
+class Track:
+    """One person followed across frames; athlete_id is None until confirmed"""
+    __slots__ = ('athlete_id', 'centre', 'velocity', 'length', 'last_t', 'hits', 'home_x')
+
+    HOME_TAU_S = 10.0  # Time constant of the standing position used to re-centre the athlete
+
+    def __init__(self, centre, length, t):
+        self.athlete_id = None
+        self.centre = centre
+        self.velocity = np.zeros(2)
+        self.length = length
+        self.last_t = t
+        self.hits = 1
+        self.home_x = centre[0]
+
+    def predict(self, t):
+        return self.centre + self.velocity * (t - self.last_t)
+
+    def update(self, centre, length, t):
+        dt = t - self.last_t
+        if dt > 0:
+            self.velocity = 0.5 * self.velocity + 0.5 * (centre - self.centre) / dt
+            self.home_x += (centre[0] - self.home_x) * min(1.0, dt / self.HOME_TAU_S)
+        self.centre = centre
+        self.length = 0.9 * self.length + 0.1 * length
+        self.last_t = t
+        self.hits += 1
+
+
+class PoseTracker:
+    """Gives the poses of each frame stable athlete ids"""
+
+    def __init__(self, max_distance=0.8, max_missing_s=1.0, min_hits=3):
+        self.max_distance = max_distance  # Torso lengths between prediction and detection
+        self.max_missing_s = max_missing_s
+        self.min_hits = min_hits
+        self.tracks = []
+        self.next_id = 1
+
+    def update(self, poses, t, frame_width=960, frame_height=540):
+        """[(track, pose)] for this frame; unconfirmed tracks have athlete_id None"""
+        matches = []
+        if poses:
+            centres, lengths = torso_centres(poses, frame_width / frame_height)
+            pairs = []
+            for ti, track in enumerate(self.tracks):
+                offset = centres - track.predict(t)
+                distance = np.hypot(offset[:, 0], offset[:, 1]) / np.maximum(lengths, track.length)
+                pairs += [(distance[pi], ti, pi) for pi in np.flatnonzero(distance < self.max_distance)]
+            pairs.sort()
+            taken_tracks, taken_poses = set(), set()
+            for _, ti, pi in pairs:
+                if ti in taken_tracks or pi in taken_poses:
+                    continue
+                taken_tracks.add(ti)
+                taken_poses.add(pi)
+                track = self.tracks[ti]
+                track.update(centres[pi], lengths[pi], t)
+                if track.athlete_id is None and track.hits >= self.min_hits:
+                    track.athlete_id = self.next_id
+                    self.next_id += 1
+                matches.append((track, poses[pi]))
+            for pi in range(len(poses)):
+                if pi not in taken_poses:
+                    track = Track(centres[pi], lengths[pi], t)
+                    self.tracks.append(track)
+                    matches.append((track, poses[pi]))
+        # Tentative tracks must be seen every frame; athletes may go missing for a while
+        self.tracks = [track for track in self.tracks
+                       if track.last_t == t or
+                       (track.athlete_id is not None and t - track.last_t <= self.max_missing_s)]
+        return matches
+
+
+def athlete_results_path(results_filename, athlete_id):
+    """fitness_assessment_results.csv -> fitness_assessment_results_athlete2.csv"""
+    stem, ext = os.path.splitext(results_filename)
+    return f"{stem}_athlete{athlete_id}{ext or '.csv'}"
+
+
+class Athlete:
+    """One tracked person's session (and router, when exercises are chosen automatically)"""
+    __slots__ = ('athlete_id', 'session', 'router', 'track', 'seen_at')
+
+    def __init__(self, athlete_id, session, router=None):
+        self.athlete_id = athlete_id
+        self.session = session
+        self.router = router
+        self.track = None
+        self.seen_at = None
+
+    @property
+    def assessment(self):
+        return self.session.assessment
+
+    def feed(self, landmarks, t, frame_width, frame_height):
+        if self.router is not None:
+            self.router.push(landmarks, t, frame_width, frame_height)
+        else:
+            self.session.push_frame(landmarks, t, frame_width, frame_height)
+
+
+class TeamSession:
+    """Independent AssessmentSessions for everybody tracked in one camera's frames
+
+    router, e.g. utils.fan_out.FanOutRouter, is called with each athlete's
+    session to pick their exercises automatically; otherwise next_exercise()
+    moves the whole team on together. cost_mode names the SessionCost mode of
+    each athlete's cost record (None for no accounting).
+    """
+
+    def __init__(self, spec, tracker=None, events=None, router=None, cost_mode='team', recenter=True,
+                 min_pose_frames=30):
+        from assessment_flow import normalize_spec
+        from utils.session_cost import assessment_type
+
+        self.spec = spec = normalize_spec(spec)
+        self.tracker = tracker if tracker is not None else PoseTracker()
+        self.events = events
+        self.router = router
+        self.cost_mode = cost_mode
+        self.kind = assessment_type(spec)
+        self.recenter = recenter
+        self.min_pose_frames = min_pose_frames  # Fewer frames with a pose: no results saved
+        self.athletes = {}
+        self.exercise_index = 0
+        self.frames = 0
+        self.finished = False
+        self.cost = None  # Whole-process SessionCost, split between the athletes by finish()
+
+    def _athlete(self, track):
+        athlete = self.athletes.get(track.athlete_id)
+        if athlete is None:
+            from assessment_flow import FitnessAssessment
+            from assessment_session import AssessmentSession
+            from utils.session_cost import SessionCost
+
+            assessment = FitnessAssessment.from_spec(self.spec)
+            if self.cost_mode is not None:
+                assessment.cost = SessionCost(self.cost_mode, self.kind)
+            session = AssessmentSession(assessment=assessment, events=self.events)
+            if self.exercise_index and self.router is None:
+                session.select_exercise(min(self.exercise_index, len(assessment.exercises) - 1))
+            router = self.router(session) if self.router is not None else None
+            athlete = self.athletes[track.athlete_id] = Athlete(track.athlete_id, session, router)
+        athlete.track = track
+        return athlete
+
+    def push(self, poses, t, frame_width=960, frame_height=540):
+        """Track this frame's poses and feed each athlete; returns [(athlete, landmarks)] seen"""
+        if self.cost is None and self.cost_mode is not None:
+            from utils.session_cost import SessionCost
+            self.cost = SessionCost(self.cost_mode, self.kind).start()
+        self.frames += 1
+        seen = []
+        for track, landmarks in self.tracker.update(poses, t, frame_width, frame_height):
+            if track.athlete_id is None:
+                continue
+            athlete = self._athlete(track)
+            if self.recenter:
+                landmarks = landmarks.copy()
+                landmarks[:, 0] += 0.5 - track.home_x * frame_height / frame_width
+            athlete.seen_at = t
+            seen.append((athlete, landmarks))
+        found = {athlete.athlete_id: landmarks for athlete, landmarks in seen}
+        for athlete in self.athletes.values():
+            if athlete.session.finished:
+                continue
+            landmarks = found.get(athlete.athlete_id)
+            cost = athlete.assessment.cost
+            if cost is None:
+                athlete.feed(landmarks, t, frame_width, frame_height)
+                continue
+            exercise = athlete.session.current_exercise
+            with cost.measure(exercise.name if exercise else None) as bucket:
+                bucket.frames += 1
+                bucket.inferences += landmarks is not None  # Frames the shared detection found them in
+                athlete.feed(landmarks, t, frame_width, frame_height)
+        return seen
+
+    def next_exercise(self):
+        """Move every athlete to the next exercise; False once the flow is complete"""
+        self.exercise_index += 1
+        more = False
+        for athlete in self.athletes.values():
+            if not athlete.session.finished:
+                more = athlete.session.next_exercise() or more
+        return more or (not self.athletes and self.exercise_index < len(self.spec['exercises']))
+
+    def finish(self):
+        """Close every athlete's session and split the process cost between them"""
+        for athlete in self.athletes.values():
+            if athlete.router is not None:
+                athlete.router.flush()  # SegmentRouter still holds its last few seconds
+            if not athlete.session.finished:
+                athlete.session.finish()
+        if self.cost is not None:
+            from utils.session_cost import apportion
+            self.cost.stop()
+            costs = [a.assessment.cost for a in self.athletes.values() if a.assessment.cost is not None]
+            if costs:
+                apportion(costs, *self.cost.process_cpu, energy_j=self.cost.energy_j)
+                for cost in costs:
+                    cost.wall_s = self.cost.wall_s
+        self.finished = True
+
+    def scored(self):
+        """Athletes seen long enough to have results, by id"""
+        return [athlete for _, athlete in sorted(self.athletes.items())
+                if athlete.session.frames - athlete.session.frames_without_pose >= self.min_pose_frames]
+
+    def results(self):
+        return {athlete.athlete_id: athlete.session.results() for athlete in self.scored()}
+
+    def save_results(self, filename="fitness_assessment_results.csv", metrics=None):
+        """Append each athlete's rows (and cost record) to their own results file; returns the messages"""
+        from utils.results_manager import save_assessment_results
+
+        messages = []
+        for athlete in self.scored():
+            assessment = athlete.assessment
+            assessment.calculate_overall_score()
+            path = athlete_results_path(filename, athlete.athlete_id)
+            if metrics is not None:
+                _, msg = metrics.timed_save('results', save_assessment_results, assessment.exercises, path,
+                                            cost=assessment.cost)
+            else:
+                _, msg = save_assessment_results(assessment.exercises, path, cost=assessment.cost)
+            messages.append(msg)
+        return messages
+
+
+def _draw_athletes(frame, seen):
+    import cv2
+
+    h, w = frame.shape[:2]
+    for athlete, landmarks in seen:
+        x = int(athlete.track.centre[0] * h)  # Centre x is in frame heights
+        y = max(20, int(float(np.min(landmarks[:, 1])) * h) - 10)
+        ex = athlete.session.current_exercise
+        label = f"#{athlete.athlete_id} {ex.name}: {ex.reps}" if ex else f"#{athlete.athlete_id} done"
+        cv2.putText(frame, label, (max(0, x - 80), y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+
+
+def run_team(team, args, io=None, metrics=None):
+    """Camera (or args.video) loop feeding a TeamSession from one multi-pose detector
+
+    io (utils.runner_io.RunnerIO) works as for run_exercises, except that
+    io.pose is a multi-pose detector (detect(rgb, t) -> list of arrays, e.g.
+    utils.fake_io.FakeMultiPose). Keys: 'n' next exercise for everyone, 's'
+    save, 'q' quit.
+    """
+    import cv2
+    from utils.runner_io import RunnerIO, open_camera
+
+    io = io if io is not None else RunnerIO()
+    video = getattr(args, 'video', None)
+    cap = io.capture
+    if cap is None:
+        cap = cv2.VideoCapture(video) if video else open_camera(args.camera, args.width, args.height)
+        if video and not cap.isOpened():
+            raise SystemExit(f"Could not open video: {video}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    detector = io.pose
+    if detector is None:
+        detector = MultiPose(args.pose_model, num_poses=args.athletes)
+
+    info_text = ""
+    index = 0
+    with detector:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            # Recorded clips keep their own clock and orientation; the webcam is mirrored
+            t = index / fps if video and io.capture is None else io.clock()
+            index += 1
+            if metrics is not None:
+                metrics.frame(t)
+            if not video:
+                frame = cv2.flip(frame, 1)
+            h, w = frame.shape[:2]
+            started = time.perf_counter()
+            poses = detector.detect(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), t)
+            if metrics is not None:
+                metrics.inference.observe(time.perf_counter() - started)
+                if not poses:
+                    metrics.no_pose.inc()
+            seen = team.push(poses, t, w, h)
+
+            _draw_athletes(frame, seen)
+            cv2.putText(frame, f"Athletes: {len(seen)} | 'n' next exercise, 's' save, 'q' quit",
+                        (10, h - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+            if info_text:
+                cv2.putText(frame, info_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+            io.display.show(frame)
+
+            key = io.keys.read(1)
+            if key == ord('q'):
+                break
+            elif key == ord('n') and team.router is None:
+                if not team.next_exercise():
+                    break
+                info_text = f"Exercise {team.exercise_index + 1} of {len(team.spec['exercises'])}"
+            elif key == ord('s'):
+                info_text = "; ".join(team.save_results(metrics=metrics)) or "Nobody to save yet"
+                print(info_text)
+    team.finish()
+    cap.release()
+    io.display.close()
+    return team
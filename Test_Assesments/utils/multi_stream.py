@@ -0,0 +1,359 @@
+"""
+Multi-Stream Runner - Several cameras/videos in one process with a shared inference pool
+
+Each stream has its own capture thread, FitnessAssessment and exercise state.
+A fixed number of inference workers serve all streams round-robin. A stream
+has at most one frame in flight, so a slow stream can only hold one worker
+and never starves the others. Live cameras keep only their newest frames
+(older ones are dropped). Video files are read at the pace the workers can
+sustain.
+
+Pose models are capped at one per worker, the memory a shared pool is for.
+Tracking state cannot be moved between MediaPipe estimators, so which mode
+the models run in depends on the stream count:
+
+- streams <= workers: each stream gets its own estimator in tracking mode
+  (created on its first frame), used by whichever worker holds the stream.
+  Its frames reach it in order, so landmarks are tracked and smoothed and
+  score like the single-stream runner.
+- streams > workers: each worker owns one estimator in static image mode and
+  runs frames from any stream. Every frame pays full detection and landmarks
+  are not smoothed, which is noisier (more jitter near thresholds) and
+  slower per frame, but memory stays at `workers` models.
+
+Exercise state is only touched by the worker holding the stream, so a switch
+to the next exercise ('n') is posted to the stream and applied by a worker
+between two frames.
+"""
+
+import threading
+import time
+from collections import deque
+
+import cv2
+
+from base_exercise import FrameClock
+from utils.pose_utils import draw_hud
+
+
+def parse_source(source):
+    """Camera indices are given as integers, anything else is a video path"""
+    return int(source) if str(source).isdigit() else source
+
+
+class StreamState:
+    """Per-stream capture queue, exercise state and statistics"""
+
+    def __init__(self, stream_id, source, assessment, queue_size=2):
+        self.stream_id = stream_id
+        self.source = source
+        self.is_camera = isinstance(source, int)
+        self.assessment = assessment
+        self.queue = deque()
+        self.queue_size = queue_size
+        self.busy = False
+        self.capture_done = False
+        self.pending_next = 0  # Exercise switches requested but not yet applied
+        self.pose = None       # Tracking pose estimator when streams <= workers, created on first use
+        self.clock = FrameClock()
+        for exercise in assessment.exercises:
+            exercise.clock = self.clock
+
+        self.latest_frame = None
+        self.info_text = ""
+
+        # Statistics
+        self.captured = 0
+        self.processed = 0
+        self.dropped = 0
+        self.no_pose = 0
+        self.latency_ms = 0.0  # Exponential moving average, capture -> result
+        self._done_times = deque(maxlen=30)
+
+    @property
+    def finished(self):
+        return self.capture_done and not self.queue and not self.busy and not self.pending_next
+
+    def fps(self):
+        if len(self._done_times) < 2:
+            return 0.0
+        span = self._done_times[-1] - self._done_times[0]
+        return (len(self._done_times) - 1) / span if span > 0 else 0.0
+
+    def stats(self):
+        return {
+            'source': self.source,
+            'exercise': self.assessment.current_exercise.name if self.assessment.current_exercise else None,
+            'fps': round(self.fps(), 1),
+            'latency_ms': round(self.latency_ms, 1),
+            'queue_depth': len(self.queue),
+            'captured': self.captured,
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'no_pose': self.no_pose,
+        }
+
+
+class MultiStreamRunner:
+    """Runs N streams against a shared pool of pose inference workers"""
+
+    def __init__(self, assessments, sources, workers=2, model_complexity=1,
+                 width=960, height=540, show=True, pose_factory=None, queue_size=2):
+        if len(assessments) != len(sources):
+            raise ValueError("Need one assessment per source")
+        self.streams = [StreamState(i, parse_source(src), a, queue_size)
+                        for i, (src, a) in enumerate(zip(sources, assessments))]
+        self.workers = workers
+        self.width = width
+        self.height = height
+        self.show = show
+        # At most `workers` models: one tracking estimator per stream only if that fits
+        self.pose_per_stream = len(self.streams) <= workers
+        if pose_factory is None:
+            from utils.pose_pool import create_pose
+            static = not self.pose_per_stream  # Shared estimators see unrelated streams
+            pose_factory = lambda: create_pose(model_complexity, static_image_mode=static)
+        self.pose_factory = pose_factory
+
+        self._cond = threading.Condition()
+        self._cursor = 0
+        self._stop = False
+        self._threads = []
+
+    # -- capture --------------------------------------------------------
+
+    def _capture_loop(self, stream):
+        cap = cv2.VideoCapture(stream.source)
+        if stream.is_camera:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        frame_idx = 0
+
+        try:
+            while not self._stop:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if stream.is_camera:
+                    frame = cv2.flip(frame, 1)
+                    ts = time.time()
+                else:
+                    ts = frame_idx / fps
+                frame_idx += 1
+
+                with self._cond:
+                    if stream.is_camera:
+                        if len(stream.queue) >= stream.queue_size:
+                            stream.queue.popleft()  # Keep live streams current
+                            stream.dropped += 1
+                    else:
+                        while len(stream.queue) >= stream.queue_size and not self._stop:
+                            self._cond.wait(0.1)
+                    stream.queue.append((frame, ts, time.monotonic()))
+                    stream.captured += 1
+                    self._cond.notify_all()
+        finally:
+            cap.release()
+            with self._cond:
+                stream.capture_done = True
+                self._cond.notify_all()
+
+    # -- scheduling -----------------------------------------------------
+
+    def _next_job(self):
+        """Round-robin over streams that have a frame (or a switch) and none in flight
+
+        A switch alone comes back as (stream, None, None, None).
+        """
+        with self._cond:
+            while True:
+                n = len(self.streams)
+                for k in range(n):
+                    idx = (self._cursor + k) % n
+                    stream = self.streams[idx]
+                    if (stream.queue or stream.pending_next) and not stream.busy:
+                        stream.busy = True
+                        self._cursor = idx + 1
+                        if stream.queue:
+                            return (stream,) + stream.queue.popleft()
+                        return stream, None, None, None
+                if self._stop or all(s.finished for s in self.streams):
+                    return None
+                self._cond.wait(0.1)
+
+    def _worker_loop(self):
+        pose = None if self.pose_per_stream else self.pose_factory()
+        try:
+            while True:
+                job = self._next_job()
+                if job is None:
+                    break
+                stream, frame, ts, captured_at = job
+                try:
+                    self._apply_switches(stream)
+                    if frame is None:
+                        continue
+                    cost = stream.assessment.cost
+                    current_ex = stream.assessment.current_exercise
+                    if cost is not None and current_ex is not None:
+                        with cost.measure(current_ex.name) as bucket:
+                            self._process(pose, stream, frame, ts)
+                            bucket.frames += 1
+                            bucket.inferences += 1
+                    else:
+                        self._process(pose, stream, frame, ts)
+                finally:
+                    now = time.monotonic()
+                    with self._cond:
+                        stream.busy = False
+                        if frame is not None:
+                            stream.processed += 1
+                            stream._done_times.append(now)
+                            latency = (now - captured_at) * 1000
+                            stream.latency_ms = latency if stream.processed == 1 else 0.9 * stream.latency_ms + 0.1 * latency
+                        self._cond.notify_all()
+        finally:
+            if pose is not None:
+                pose.close()
+
+    def _apply_switches(self, stream):
+        """Move the stream to its next exercise as often as 'n' asked (worker holds the stream)"""
+        with self._cond:
+            pending, stream.pending_next = stream.pending_next, 0
+        for _ in range(pending):
+            if not stream.assessment.next_exercise():
+                stream.info_text = "Assessment complete!"
+                break
+
+    def _process(self, pose, stream, frame, ts):
+        if pose is None:  # Per-stream tracking estimator
+            if stream.pose is None:
+                stream.pose = self.pose_factory()
+            pose = stream.pose
+        res = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        self._apply_result(stream, frame, ts, res)
+
+    def _apply_result(self, stream, frame, ts, res):
+        # Only the worker holding the stream's one in-flight frame gets here, so no lock
+        h, w = frame.shape[:2]
+        stream.clock.t = ts
+        current_ex = stream.assessment.current_exercise
+        if res.pose_landmarks:
+            if current_ex:
+                current_ex.update(res.pose_landmarks.landmark, w, h)
+                if self.show:
+                    current_ex.draw_feedback(frame, res.pose_landmarks.landmark, w, h)
+        else:
+            stream.no_pose += 1
+        if self.show:
+            draw_hud(frame, stream.assessment, stream.info_text)
+            stream.latest_frame = frame
+
+    # -- control --------------------------------------------------------
+
+    def start(self):
+        for stream in self.streams:
+            stream.assessment.next_exercise()
+            if stream.assessment.cost is not None:
+                stream.assessment.cost.start()
+            t = threading.Thread(target=self._capture_loop, args=(stream,),
+                                 name=f"capture-{stream.stream_id}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker_loop, name=f"inference-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self):
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join()
+        self._threads = []
+        for stream in self.streams:
+            if stream.pose is not None:
+                stream.pose.close()
+                stream.pose = None
+        costs = [s.assessment.cost for s in self.streams if s.assessment.cost is not None]
+        if costs:
+            # Stations share the process (and the inference threads), so its CPU is split between them
+            from utils.session_cost import apportion
+            for cost in costs:
+                cost.stop()
+            apportion(costs, *costs[0].process_cpu, energy_j=costs[0].energy_j)
+
+    def done(self):
+        with self._cond:
+            return all(s.finished for s in self.streams)
+
+    def stats(self):
+        with self._cond:
+            return [s.stats() for s in self.streams]
+
+    def collect_metrics(self):
+        """utils.metrics collector: per-stream statistics and exercise counters, read at scrape time"""
+        with self._cond:
+            streams = [(str(s.source), s.stats(), s.assessment.exercises) for s in self.streams]
+        families = [
+            ('fitness_stream_frames', 'counter', "Frames captured per stream", 'captured'),
+            ('fitness_stream_frames_processed', 'counter', "Frames given a pose result", 'processed'),
+            ('fitness_stream_frames_skipped', 'counter', "Live frames discarded for newer ones", 'dropped'),
+            ('fitness_stream_frames_no_pose', 'counter', "Frames where no pose was detected", 'no_pose'),
+            ('fitness_stream_fps', 'gauge', "Processed frames per second", 'fps'),
+            ('fitness_stream_latency_ms', 'gauge', "Capture to result latency (moving average)", 'latency_ms'),
+            ('fitness_stream_queue_depth', 'gauge', "Frames waiting for inference", 'queue_depth'),
+        ]
+        out = [(name, type_, help_, [({'stream': source}, stats[key]) for source, stats, _ in streams])
+               for name, type_, help_, key in families]
+        for name, help_, attr in (('fitness_stream_reps', "Completed reps (and jumps)", 'reps'),
+                                  ('fitness_stream_form_errors', "Form errors", 'form_errors')):
+            out.append((name, 'counter', help_,
+                        [({'stream': source, 'exercise': ex.name}, getattr(ex, attr))
+                         for source, _, exercises in streams for ex in exercises]))
+        return out
+
+    def print_stats(self):
+        for s in self.stats():
+            print(f"[stream {s['source']}] {s['exercise']}: {s['fps']} fps, "
+                  f"{s['latency_ms']} ms latency, queue {s['queue_depth']}, "
+                  f"dropped {s['dropped']}, no pose {s['no_pose']}")
+
+    def run(self, stats_interval=5.0):
+        """Start all streams and drive display/keys until every stream ends or 'q'
+
+        Keys: 1-9 focus a stream, 'n' moves the focused stream to its next exercise.
+        """
+        self.start()
+        focused = 0
+        last_stats = time.monotonic()
+        try:
+            while not self.done():
+                if self.show:
+                    for stream in self.streams:
+                        if stream.latest_frame is not None:
+                            cv2.imshow(f"Fitness Assessment - Station {stream.stream_id + 1}", stream.latest_frame)
+                    key = cv2.waitKey(1) & 0xFF
+                    if key == ord('q'):
+                        break
+                    elif ord('1') <= key <= ord('9') and key - ord('1') < len(self.streams):
+                        focused = key - ord('1')
+                    elif key == ord('n'):
+                        # Applied by a worker between frames, never during an update
+                        stream = self.streams[focused]
+                        with self._cond:
+                            stream.pending_next += 1
+                            self._cond.notify_all()
+                else:
+                    time.sleep(0.05)
+
+                if stats_interval and time.monotonic() - last_stats >= stats_interval:
+                    self.print_stats()
+                    last_stats = time.monotonic()
+        finally:
+            self.stop()
+            if self.show:
+                cv2.destroyAllWindows()
+        self.print_stats()
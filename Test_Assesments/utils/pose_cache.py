@@ -0,0 +1,167 @@
+"""
+Pose Cache - Content-addressed disk cache of pose inference results
+
+Reprocessing the same clip (after a threshold change, a scoring fix or a retry)
+should not pay for MediaPipe again. Entries are keyed by the video content hash
+plus everything that changes the landmarks: pose backend, model complexity and
+preprocessing settings.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import zipfile
+
+import numpy as np
+
+CACHE_FORMAT_VERSION = 1
+
+# Arrays every entry has; one missing means the file is corrupt
+ENTRY_ARRAYS = ('landmarks', 'detected', 'timestamps', 'frame_size', 'fps')
+
+
+def hash_video_file(path, chunk_size=1 << 20):
+    """SHA-256 of the raw video bytes"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_cache_key(video_hash, backend, model_complexity, preprocessing):
+    """Combine the content hash and inference settings into one cache key"""
+    settings = json.dumps({
+        "version": CACHE_FORMAT_VERSION,
+        "video": video_hash,
+        "backend": backend,
+        "model_complexity": model_complexity,
+        "preprocessing": preprocessing,
+    }, sort_keys=True)
+    return hashlib.sha256(settings.encode("utf-8")).hexdigest()
+
+
+class PoseCache:
+    """Size-bounded LRU cache of landmark arrays stored as .npz files
+
+    Writes go to a temp file in the cache directory and are moved into place
+    with os.replace, so concurrent workers never see a partial entry. Recency
+    is tracked through file mtimes, which keeps the LRU order shared between
+    processes using the same directory.
+    """
+
+    def __init__(self, cache_dir, max_bytes=2 * 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".npz")
+
+    def get(self, key):
+        """Return the cached entry dict for key, or None on a miss"""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                entry = {name: data[name] for name in ENTRY_ARRAYS}
+            os.utime(path)  # Mark as recently used
+        except FileNotFoundError:
+            # Missing, or evicted by another worker mid-read
+            with self._lock:
+                self.misses += 1
+            return None
+        except (OSError, ValueError, zipfile.BadZipFile, KeyError):
+            # Corrupt (truncated, garbage or missing an array): drop it so it is re-inferred
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return entry
+
+    def put(self, key, landmarks, detected, timestamps, frame_width, frame_height, fps):
+        """Store one video's landmark arrays atomically"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f,
+                         landmarks=np.asarray(landmarks, dtype=np.float32),
+                         detected=np.asarray(detected, dtype=bool),
+                         timestamps=np.asarray(timestamps, dtype=np.float64),
+                         frame_size=np.array([frame_width, frame_height], dtype=np.int32),
+                         fps=np.array(fps, dtype=np.float64))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            self.writes += 1
+        self.evict()
+
+    def _entries(self):
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".npz"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits max_bytes"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return 0
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass  # Another worker got there first
+            total -= size
+
+        with self._lock:
+            self.evictions += removed
+        return removed
+
+    def stats(self):
+        """Hit/miss counters and current disk usage"""
+        entries = self._entries()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'writes': self.writes,
+                'evictions': self.evictions,
+                'entries': len(entries),
+                'bytes': sum(size for _, size, _ in entries),
+            }
@@ -0,0 +1,248 @@
+"""
+Pose Pool - Reusable, pre-initialized pose estimators for back-to-back sessions
+
+Building mp_pose.Pose loads the model and graph every time. On a kiosk or server
+that runs sessions one after another, a session checks an already warm instance
+out of the pool, the instance's tracking state is reset, and it goes back to the
+pool when the session ends.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+
+def create_pose(model_complexity=1, static_image_mode=False):
+    """Build one MediaPipe pose estimator with the runner's settings
+
+    static_image_mode=True disables cross-frame tracking, which is required when
+    one estimator serves frames from several unrelated streams.
+    """
+    import mediapipe as mp
+    return mp.solutions.pose.Pose(
+        static_image_mode=static_image_mode,
+        model_complexity=model_complexity,
+        enable_segmentation=False,
+        smooth_landmarks=True,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5)
+
+
+class _PooledPose:
+    __slots__ = ('pose', 'last_check', 'uses', 'failed')
+
+    def __init__(self, pose):
+        self.pose = pose
+        self.last_check = time.monotonic()
+        self.uses = 0
+        self.failed = False
+
+
+class _CheckedPose:
+    """What checkout() yields: the estimator, noting whether its inference raised"""
+    __slots__ = ('_item',)
+
+    def __init__(self, item):
+        self._item = item
+
+    def process(self, image):
+        try:
+            return self._item.pose.process(image)
+        except Exception:
+            self._item.failed = True
+            raise
+
+    def __getattr__(self, name):
+        return getattr(self._item.pose, name)
+
+
+class PosePool:
+    """Fixed-size pool of warm pose estimators shared by sessions in this process"""
+
+    def __init__(self, size=2, model_complexity=1, factory=None, health_check_interval=60.0,
+                 prewarm=True):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.size = size
+        self.model_complexity = model_complexity
+        self.factory = factory or (lambda: create_pose(model_complexity))
+        self.health_check_interval = health_check_interval
+
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._closed = False
+        self._created_at = time.monotonic()
+        self._created = 0
+
+        # Metrics
+        self.checkouts = 0
+        self.replacements = 0
+        self.failed_checks = 0
+        self.in_use = 0
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+        self.busy_s = 0.0
+
+        if prewarm:
+            for _ in range(size):
+                self._idle.append(self._new_instance())
+            self._created = size
+
+    def _new_instance(self):
+        item = _PooledPose(self.factory())
+        self._warm(item.pose)
+        return item
+
+    @staticmethod
+    def _warm(pose):
+        # One dummy inference allocates the graph's buffers up front
+        pose.process(np.zeros((64, 64, 3), dtype=np.uint8))
+        PosePool._reset(pose)
+
+    @staticmethod
+    def _reset(pose):
+        """Clear tracking state so the next session starts from detection"""
+        if hasattr(pose, 'reset'):
+            pose.reset()
+
+    def health_check(self, pose):
+        """True if the estimator still runs inference without raising"""
+        try:
+            self._warm(pose)
+            return True
+        except Exception:
+            return False
+
+    def _replace(self, item):
+        try:
+            item.pose.close()
+        except Exception:
+            pass
+        with self._cond:
+            self.replacements += 1
+        return self._new_instance()
+
+    def acquire(self, timeout=None):
+        """Check out a warm estimator, blocking until one is free"""
+        start = time.monotonic()
+        with self._cond:
+            if not self._idle and self._created < self.size and not self._closed:
+                # Lazily grow up to size; build outside the lock below
+                self._created += 1
+                item = None
+            else:
+                item = self._checkout_idle(start, timeout)
+            self.in_use += 1
+            waited = time.monotonic() - start
+            self.checkouts += 1
+            self.total_wait_s += waited
+            self.max_wait_s = max(self.max_wait_s, waited)
+
+        if item is None:
+            try:
+                item = self._new_instance()
+            except BaseException:
+                with self._cond:
+                    self._created -= 1
+                    self.in_use -= 1
+                    self._cond.notify()
+                raise
+
+        # Health check outside the lock; instances idle for a while get re-verified
+        if time.monotonic() - item.last_check >= self.health_check_interval:
+            if not self.health_check(item.pose):
+                with self._cond:
+                    self.failed_checks += 1
+                item = self._replace(item)
+            item.last_check = time.monotonic()
+
+        self._reset(item.pose)
+        item.uses += 1
+        item.failed = False
+        return item
+
+    def _checkout_idle(self, start, timeout):
+        # Caller holds self._cond
+        while not self._idle:
+            if self._closed:
+                raise RuntimeError("Pose pool is closed")
+            remaining = None if timeout is None else timeout - (time.monotonic() - start)
+            if remaining is not None and remaining <= 0:
+                raise TimeoutError("No pose estimator available")
+            self._cond.wait(remaining)
+        return self._idle.popleft()
+
+    def release(self, item, healthy=True):
+        """Return an estimator; unhealthy ones are closed and replaced"""
+        if not healthy:
+            item = self._replace(item)
+        with self._cond:
+            self.in_use -= 1
+            if self._closed:
+                item.pose.close()
+            else:
+                self._idle.append(item)
+            self._cond.notify()
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        """Context manager yielding a reset, ready-to-use pose estimator
+
+        The estimator is replaced only if its own process() raised; other
+        errors in the with body (exercise code, I/O) leave it in the pool.
+        """
+        item = self.acquire(timeout)
+        started = time.monotonic()
+        try:
+            yield _CheckedPose(item)
+        finally:
+            with self._cond:
+                self.busy_s += time.monotonic() - started
+            self.release(item, healthy=not item.failed)
+
+    def metrics(self):
+        """Wait-time and utilization metrics for monitoring"""
+        with self._cond:
+            elapsed = max(1e-9, time.monotonic() - self._created_at)
+            return {
+                'size': self.size,
+                'in_use': self.in_use,
+                'idle': len(self._idle),
+                'checkouts': self.checkouts,
+                'avg_wait_ms': round(self.total_wait_s / self.checkouts * 1000, 2) if self.checkouts else 0.0,
+                'max_wait_ms': round(self.max_wait_s * 1000, 2),
+                'utilization': round(self.busy_s / (self.size * elapsed), 3),
+                'replacements': self.replacements,
+                'failed_health_checks': self.failed_checks,
+            }
+
+    def close(self):
+        """Close idle estimators; checked-out ones are closed when released"""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                self._idle.popleft().pose.close()
+            self._cond.notify_all()
+
+
+_shared_pools = {}
+_shared_lock = threading.Lock()
+
+
+def get_pose_pool(size=2, model_complexity=1, prewarm=True):
+    """Process-wide pool for this size and model complexity, created on first use
+
+    Asking for another size or complexity hands out a separate pool, so a
+    pool is never resized or closed under sessions that still hold it.
+    A closed pool is replaced on the next call.
+    """
+    key = (size, model_complexity)
+    with _shared_lock:
+        pool = _shared_pools.get(key)
+        if pool is None or pool._closed:
+            pool = _shared_pools[key] = PosePool(size=size, model_complexity=model_complexity,
+                                                 prewarm=prewarm)
+        return pool
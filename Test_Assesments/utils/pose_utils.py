@@ -36,6 +36,25 @@ def angle_3pt(a, b, c):
 def lm_xy(landmark, w, h):
     return int(landmark.x * w), int(landmark.y * h)
 
+class Landmark:
+    """Lightweight stand-in for a MediaPipe landmark rebuilt from an array row"""
+    __slots__ = ('x', 'y', 'z', 'visibility')
+
+    def __init__(self, x, y, z=0.0, visibility=1.0):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.visibility = visibility
+
+def landmarks_to_array(landmarks):
+    """Pack a landmark list into a (33, 4) float32 array of x, y, z, visibility"""
+    return np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks], dtype=np.float32)
+
+def landmarks_from_array(arr):
+    """Rebuild a landmark list (as the exercises expect) from a (33, 4) array"""
+    # tolist() converts to Python floats in one pass, far cheaper than per-element float()
+    return [Landmark(x, y, z, v) for x, y, z, v in np.asarray(arr, dtype=np.float64).tolist()]
+
 def pick_side_visibility(landmarks):
     left_visibility = landmarks[11].visibility + landmarks[23].visibility + landmarks[25].visibility
     right_visibility = landmarks[12].visibility + landmarks[24].visibility + landmarks[26].visibility
@@ -0,0 +1,134 @@
+"""
+Prewarm - Opens the camera and warms up the pose graph while the menu is shown
+
+Importing MediaPipe/TensorFlow and building mp_pose.Pose takes seconds. Doing it
+on a background thread while the user answers the menu prompts hides that cost
+instead of freezing the first frame.
+"""
+
+import sys
+import threading
+import time
+
+
+class StartupTimer:
+    """Records startup stages and prints them in `python -X importtime` style"""
+
+    def __init__(self, t0=None):
+        self.t0 = t0 if t0 is not None else time.perf_counter()
+        self.stages = []  # (name, self_us, cumulative_us)
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        """Context manager timing one stage"""
+        timer = self
+
+        class _Stage:
+            def __enter__(self):
+                self.start = time.perf_counter()
+                return self
+
+            def __exit__(self, *exc):
+                end = time.perf_counter()
+                timer._record(name, end - self.start, end - timer.t0)
+                return False
+
+        return _Stage()
+
+    def mark(self, name):
+        """Record a point in time (self time is 0, cumulative is time since start)"""
+        self._record(name, 0.0, time.perf_counter() - self.t0)
+
+    def _record(self, name, self_s, cumulative_s):
+        with self._lock:
+            self.stages.append((name, int(self_s * 1e6), int(cumulative_s * 1e6)))
+
+    def report(self, stream=None):
+        stream = stream or sys.stderr
+        with self._lock:
+            stages = sorted(self.stages, key=lambda s: s[2])
+        print("startup time: self [us] | cumulative | stage", file=stream)
+        for name, self_us, cumulative_us in stages:
+            print(f"startup time: {self_us:>9} | {cumulative_us:>10} | {name}", file=stream)
+
+
+class Prewarmer:
+    """Background thread that imports cv2/MediaPipe, opens the camera and builds the pose graph"""
+
+    def __init__(self, args, timer=None, build_pose=True):
+        self.args = args
+        self.timer = timer
+        self.build_pose = build_pose  # False when a PosePool already holds warm estimators
+        self.cap = None
+        self.pose = None
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name="prewarm", daemon=True)
+
+    def _stage(self, name):
+        if self.timer is not None:
+            return self.timer.stage(name)
+        return _NullStage()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            with self._stage("prewarm: import cv2"):
+                import cv2
+            with self._stage("prewarm: import mediapipe"):
+                import mediapipe  # noqa: F401  (loads TensorFlow Lite; used later by create_pose)
+                import numpy as np
+
+            with self._stage("prewarm: open camera"):
+                cap = cv2.VideoCapture(self.args.camera)
+                cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.args.width)
+                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.args.height)
+                if not cap.isOpened():
+                    raise RuntimeError("Could not open webcam.")
+            self.cap = cap
+            if not self.build_pose:
+                return
+
+            with self._stage("prewarm: build pose graph"):
+                from utils.pose_pool import create_pose
+                pose = create_pose(getattr(self.args, 'model_complexity', 1))
+
+            with self._stage("prewarm: first inference"):
+                # The first process() call allocates the graph's buffers
+                pose.process(np.zeros((self.args.height, self.args.width, 3), dtype=np.uint8))
+                if hasattr(pose, 'reset'):
+                    pose.reset()  # Drop any tracking state from the dummy frame
+            self.pose = pose
+        except Exception as e:
+            self.error = e
+
+    def result(self, timeout=None):
+        """Wait for the warm-up to finish; returns (cap, pose) or raises its error"""
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            raise TimeoutError("Prewarm did not finish in time")
+        if self.error is not None:
+            if self.cap is not None:
+                self.cap.release()
+            raise self.error
+        return self.cap, self.pose
+
+    def discard(self):
+        """Wait for the warm-up and release what it opened, when nothing will use it"""
+        self._thread.join()
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        if self.pose is not None:
+            self.pose.close()
+            self.pose = None
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
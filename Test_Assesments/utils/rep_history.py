@@ -0,0 +1,128 @@
+"""
+Rep History - Fixed-capacity per-rep values with all-time streaming summaries
+
+Per-rep lists (depths, rep times, jump heights) used to grow for the life of
+a session. RepHistory keeps the most recent `capacity` values in a
+preallocated array and folds every value ever added into running summaries,
+so memory is fixed while the session-wide mean/min/max stay exact:
+
+    depths = RepHistory()           # last 256 reps kept
+    depths.append(angle)
+    depths.count, depths.mean, depths.min, depths.max   # over every rep
+    depths[-1], depths.values()                         # retained reps only
+
+len() and iteration cover the retained values; count covers all of them.
+"""
+
+import math
+from array import array
+
+NAN = float('nan')
+DEFAULT_CAPACITY = 256
+
+
+class RepHistory:
+    __slots__ = ('capacity', '_buf', '_head', '_size', 'count', 'total', '_mean', '_m2', '_min', '_max')
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._buf = array('d', bytes(8 * capacity))
+        self.clear()
+
+    def clear(self):
+        self._head = 0  # Next write position
+        self._size = 0
+        self.count = 0
+        self.total = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._min = NAN
+        self._max = NAN
+
+    def append(self, value):
+        value = float(value)
+        self._buf[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+        # Welford update for the all-time mean/variance
+        self.count += 1
+        self.total += value
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)
+        if self.count == 1 or value < self._min:
+            self._min = value
+        if self.count == 1 or value > self._max:
+            self._max = value
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self.count > 0
+
+    def __iter__(self):
+        start = (self._head - self._size) % self.capacity
+        buf, cap = self._buf, self.capacity
+        for i in range(self._size):
+            yield buf[(start + i) % cap]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.values()[index]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("RepHistory index out of range")
+        return self._buf[(self._head - self._size + index) % self.capacity]
+
+    def values(self):
+        """Retained values, oldest first"""
+        return list(self)
+
+    @property
+    def mean(self):
+        return self._mean if self.count else NAN
+
+    @property
+    def var(self):
+        """Population variance over every value added"""
+        return self._m2 / self.count if self.count else NAN
+
+    @property
+    def std(self):
+        return math.sqrt(self.var) if self.count else NAN
+
+    @property
+    def min(self):
+        return self._min
+
+    @property
+    def max(self):
+        return self._max
+
+    @property
+    def last(self):
+        return self[-1] if self._size else NAN
+
+    def __getstate__(self):
+        return {'capacity': self.capacity, 'values': self.values(), 'count': self.count,
+                'total': self.total, 'mean': self._mean, 'm2': self._m2, 'min': self._min, 'max': self._max}
+
+    def __setstate__(self, state):
+        self.__init__(state['capacity'])
+        for value in state['values']:
+            self._buf[self._head] = value
+            self._head = (self._head + 1) % self.capacity
+            self._size += 1
+        self.count = state['count']
+        self.total = state['total']
+        self._mean = state['mean']
+        self._m2 = state['m2']
+        self._min = state['min']
+        self._max = state['max']
+
+    def __repr__(self):
+        return (f"RepHistory(count={self.count}, kept={self._size}/{self.capacity}, "
+                f"mean={self.mean:.3f}, min={self.min:.3f}, max={self.max:.3f})")
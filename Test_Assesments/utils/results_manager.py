@@ -7,13 +7,11 @@ from datetime import datetime
 import os
 
 
-def save_assessment_results(exercises, filename="fitness_assessment_results.csv"):
-    """Save assessment results to a CSV file with feedback"""
-    # Only create directory if filename contains a path
-    if os.path.dirname(filename) and not os.path.exists(os.path.dirname(filename)):
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
-    
-    header = ["timestamp", "exercise", "component", "reps", "duration", "score", "form_errors", "feedback"]
+RESULT_FIELDS = ["timestamp", "exercise", "component", "reps", "duration", "score", "form_errors", "feedback"]
+
+
+def build_result_rows(exercises):
+    """Finalize scores and build one result dict per exercise (the CSV row contents)"""
     rows = []
 
     for exercise in exercises:
@@ -30,7 +28,7 @@ def save_assessment_results(exercises, filename="fitness_assessment_results.csv"
         else:
             feedback_text = f"{exercise.name}: Score {exercise.score}/100"
 
-        rows.append([
+        rows.append(dict(zip(RESULT_FIELDS, [
             datetime.now().isoformat(timespec='seconds'),
             exercise.name,
             exercise.component.name,
@@ -39,7 +37,23 @@ def save_assessment_results(exercises, filename="fitness_assessment_results.csv"
             exercise.score,
             exercise.form_errors,
             feedback_text.replace('\n', ' | ')  # Replace newlines for CSV
-        ])
+        ])))
+    return rows
+
+
+def save_assessment_results(exercises, filename="fitness_assessment_results.csv", cost=None):
+    """Save assessment results to a CSV file with feedback
+
+    cost (utils.session_cost.SessionCost) is appended to <filename>_costs.jsonl
+    with the same timestamp as the result rows.
+    """
+    # Only create directory if filename contains a path
+    if os.path.dirname(filename) and not os.path.exists(os.path.dirname(filename)):
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+    
+    header = RESULT_FIELDS
+    result_rows = build_result_rows(exercises)
+    rows = [[row[field] for field in RESULT_FIELDS] for row in result_rows]
 
     try:
         # Check if file exists to determine if we need to write header
@@ -50,6 +64,10 @@ def save_assessment_results(exercises, filename="fitness_assessment_results.csv"
             if not file_exists:
                 writer.writerow(header)
             writer.writerows(rows)
+        if cost is not None:
+            from utils.session_cost import append_cost_record, cost_path
+            append_cost_record(cost_path(filename),
+                               cost.record(result_rows[0]['timestamp'] if result_rows else None))
         return True, f"Results saved to {filename}"
     except Exception as e:
         return False, f"Save failed: {e}"
\ No newline at end of file
@@ -0,0 +1,175 @@
+"""
+Rolling Stats - Windowed mean/variance/min/max updated in O(1) per sample
+
+Replaces "append to a deque, then np.nanmean/np.std over it" in the exercise
+hot paths. Sums are kept incrementally (shifted by the first sample to avoid
+cancellation in the variance) and min/max use monotonic deques, so a push is
+O(1) amortized and no array is ever built.
+
+    angles = RollingStats(window=5)           # last 5 samples
+    speeds = RollingStats(time_window=2.0)    # samples from the last 2 seconds
+    angles.push(angle)
+    speeds.push(speed, t=timestamp)
+    angles.mean, angles.std, angles.min, angles.max
+
+NaN samples take a window slot but are left out of every statistic, matching
+np.nanmean. Empty statistics are NaN.
+"""
+
+import math
+from collections import deque
+
+NAN = float('nan')
+
+
+class RollingStats:
+    __slots__ = ('window', 'time_window', '_samples', '_min', '_max', '_count', '_shift',
+                 '_sum', '_sumsq', '_seq', '_drops')
+
+    # Re-sum from the samples after this many removals so rounding error cannot build up
+    RESUM_INTERVAL = 4096
+
+    def __init__(self, window=None, time_window=None):
+        self.window = window
+        self.time_window = time_window
+        self._samples = deque()  # (seq, t, value)
+        self._min = deque()  # (seq, value), values increasing
+        self._max = deque()  # (seq, value), values decreasing
+        self._seq = 0
+        self._drops = 0
+        self._reset_sums()
+
+    def _reset_sums(self):
+        self._count = 0
+        self._shift = None
+        self._sum = 0.0
+        self._sumsq = 0.0
+
+    def push(self, value, t=None):
+        """Add a sample; t (seconds) is required when time_window is set"""
+        if self.time_window is not None and t is None:
+            raise ValueError("RollingStats with a time_window needs a timestamp t")
+        value = float(value)
+        seq = self._seq
+        self._seq += 1
+        self._samples.append((seq, t, value))
+        if value == value:  # Not NaN
+            if self._shift is None:
+                self._shift = value
+            d = value - self._shift
+            self._sum += d
+            self._sumsq += d * d
+            self._count += 1
+            while self._min and self._min[-1][1] >= value:
+                self._min.pop()
+            self._min.append((seq, value))
+            while self._max and self._max[-1][1] <= value:
+                self._max.pop()
+            self._max.append((seq, value))
+
+        samples = self._samples
+        if self.window is not None:
+            while len(samples) > self.window:
+                self._drop_oldest()
+        if self.time_window is not None:
+            cutoff = t - self.time_window
+            while samples[0][1] < cutoff:
+                self._drop_oldest()
+
+    def _drop_oldest(self):
+        seq, _, value = self._samples.popleft()
+        if value != value:
+            return
+        self._count -= 1
+        if self._min[0][0] == seq:
+            self._min.popleft()
+        if self._max[0][0] == seq:
+            self._max.popleft()
+        if self._count == 0:
+            self._reset_sums()
+            return
+        d = value - self._shift
+        self._sum -= d
+        self._sumsq -= d * d
+        self._drops += 1
+        if self._drops >= self.RESUM_INTERVAL:
+            self._resum()
+
+    def _resum(self):
+        self._drops = 0
+        self._reset_sums()
+        for _, _, value in self._samples:
+            if value == value:
+                if self._shift is None:
+                    self._shift = value
+                d = value - self._shift
+                self._sum += d
+                self._sumsq += d * d
+                self._count += 1
+
+    def clear(self):
+        self._samples.clear()
+        self._min.clear()
+        self._max.clear()
+        self._drops = 0
+        self._reset_sums()
+
+    def __len__(self):
+        """Samples in the window, NaN included"""
+        return len(self._samples)
+
+    @property
+    def count(self):
+        """Non-NaN samples in the window"""
+        return self._count
+
+    @property
+    def mean(self):
+        if not self._count:
+            return NAN
+        return self._shift + self._sum / self._count
+
+    @property
+    def var(self):
+        """Population variance (ddof=0, like np.var)"""
+        if not self._count:
+            return NAN
+        m = self._sum / self._count
+        return max(0.0, self._sumsq / self._count - m * m)
+
+    @property
+    def std(self):
+        return math.sqrt(self.var) if self._count else NAN
+
+    @property
+    def min(self):
+        return self._min[0][1] if self._min else NAN
+
+    @property
+    def max(self):
+        return self._max[0][1] if self._max else NAN
+
+    @property
+    def total(self):
+        return self._shift * self._count + self._sum if self._count else 0.0
+
+    @property
+    def last(self):
+        return self._samples[-1][2] if self._samples else NAN
+
+    def values(self):
+        """Non-NaN samples, oldest first"""
+        return [value for _, _, value in self._samples if value == value]
+
+    def __getstate__(self):
+        return {'window': self.window, 'time_window': self.time_window,
+                'samples': [(t, value) for _, t, value in self._samples]}
+
+    def __setstate__(self, state):
+        self.__init__(state['window'], state['time_window'])
+        for t, value in state['samples']:
+            self.push(value, t)
+
+    def __repr__(self):
+        return (f"RollingStats(n={self._count}, mean={self.mean:.3f}, std={self.std:.3f}, "
+                f"min={self.min:.3f}, max={self.max:.3f})")
@@ -0,0 +1,67 @@
+"""
+Runner I/O - The camera, pose model, window, keyboard and clock behind run_exercises
+
+The interactive loop only touches the outside world through these small
+interfaces, which mirror the OpenCV/MediaPipe objects it was written against:
+
+    capture.read() -> (ok, bgr_frame), capture.release()
+    pose.process(rgb) -> result with .pose_landmarks (None, or .landmark list);
+                         also a context manager held for the whole session
+    display.show(frame), display.close()
+    keys.read(delay_ms) -> key code, 0xFF when nothing was pressed
+    clock() -> seconds, sleep(seconds)
+
+Anything left as None in a RunnerIO is the real thing (webcam, MediaPipe,
+OpenCV window and keyboard, wall clock). utils.fake_io has headless stand-ins
+for benchmarks and load tests.
+"""
+
+import time
+
+import cv2
+
+WINDOW_NAME = "Fitness Assessment"
+NO_KEY = 0xFF
+
+
+def open_camera(index, width, height):
+    """Open and size a webcam the way the runner always has"""
+    cap = cv2.VideoCapture(index)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    if not cap.isOpened():
+        raise SystemExit("Could not open webcam.")
+    return cap
+
+
+class OpenCVDisplay:
+    """cv2.imshow window"""
+
+    def __init__(self, window=WINDOW_NAME):
+        self.window = window
+
+    def show(self, frame):
+        cv2.imshow(self.window, frame)
+
+    def close(self):
+        cv2.destroyAllWindows()
+
+
+class OpenCVKeys:
+    """Keyboard via cv2.waitKey (which also pumps the OpenCV window events)"""
+
+    def read(self, delay_ms=1):
+        return cv2.waitKey(delay_ms) & 0xFF
+
+
+class RunnerIO:
+    """Injectable I/O for run_exercises; None means the real device"""
+    __slots__ = ('capture', 'pose', 'display', 'keys', 'clock', 'sleep')
+
+    def __init__(self, capture=None, pose=None, display=None, keys=None, clock=None, sleep=None):
+        self.capture = capture
+        self.pose = pose
+        self.display = display if display is not None else OpenCVDisplay()
+        self.keys = keys if keys is not None else OpenCVKeys()
+        self.clock = clock if clock is not None else time.time
+        self.sleep = sleep if sleep is not None else time.sleep
@@ -0,0 +1,180 @@
+"""
+Sampling Profiler - Low-overhead stack sampling of the frame loop
+
+A background thread looks at the loop thread's Python stack every few
+milliseconds and counts each distinct stack. Nothing is hooked into the
+code being measured except stage(), a single attribute write the loop makes
+as it moves between pipeline stages, so every sample is rooted at the stage
+it was taken in:
+
+    profiler = SamplingProfiler(interval=0.005)
+    profiler.start()
+    ...                       # profiler.stage('pose'), profiler.stage('exercise'), ...
+    profiler.stop()
+    collapsed_path, summary_path = profiler.write("profile")
+
+The .collapsed file is the folded-stack format read by flamegraph.pl,
+speedscope and inferno ("stage;caller;callee count" per line); the summary
+has time per stage and the top functions by self and total time. Time spent
+in C code (OpenCV, MediaPipe) shows up on the Python line that called it,
+which is what the stage split is for.
+
+A sampler thread can only look once the profiled thread lets go of the GIL,
+which pure Python code does at the interpreter's switch interval (5 ms by
+default). Short Python stages would be charged to the next C call, so while
+sampling the switch interval is lowered to a tenth of the sampling interval.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+def _label(code):
+    """'Squats.update (squats.py)' for a code object"""
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({os.path.basename(code.co_filename)})"
+
+
+class SamplingProfiler:
+    """Samples one thread's stack on a timer; start()/stop() can be called repeatedly"""
+
+    def __init__(self, interval=0.005, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.counts = Counter()
+        self.current_stage = 'other'
+        self.wall_s = 0.0
+        self.sampler_cpu_s = 0.0
+        self.unsaved = False
+        self._labels = {}
+        self._thread = None
+        self._stop = threading.Event()
+        self._started_at = None
+        self._switch_interval = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    @property
+    def samples(self):
+        return sum(self.counts.values())
+
+    def stage(self, name):
+        """Pipeline stage the profiled thread is entering (cheap enough to call every frame)"""
+        self.current_stage = name
+
+    def start(self):
+        if self._thread is not None:
+            return
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()  # The caller's thread is the one to profile
+        self._stop.clear()
+        self._started_at = time.perf_counter()
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval / 10))
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        sys.setswitchinterval(self._switch_interval)
+        self.wall_s += time.perf_counter() - self._started_at
+
+    def toggle(self):
+        """Start or stop; returns True when now running"""
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+        return self.running
+
+    def reset(self):
+        self.counts.clear()
+        self.wall_s = 0.0
+        self.sampler_cpu_s = 0.0
+        self.unsaved = False
+
+    def _run(self):
+        cpu0 = time.thread_time()
+        labels = self._labels
+        tid = self.thread_id
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(tid)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = _label(code)
+                stack.append(label)
+                frame = frame.f_back
+            stack.append(f"[{self.current_stage}]")
+            stack.reverse()
+            self.counts[tuple(stack)] += 1
+            self.unsaved = True
+        self.sampler_cpu_s += time.thread_time() - cpu0
+
+    def collapsed(self):
+        """Folded stacks, one 'root;...;leaf count' line each, most frequent first"""
+        return [f"{';'.join(stack)} {count}" for stack, count in self.counts.most_common()]
+
+    def summary(self, top=20):
+        """Time per stage and the top-N functions by self and total time, as text"""
+        total = self.samples
+        if not total:
+            return "Profile: no samples"
+        ms = 1000.0 * self.wall_s / total  # Wall time each sample stands for
+        stages, self_counts, total_counts = Counter(), Counter(), Counter()
+        for stack, count in self.counts.items():
+            stages[stack[0]] += count
+            if len(stack) > 1:
+                self_counts[stack[-1]] += count
+            for label in set(stack[1:]):
+                total_counts[label] += count
+
+        lines = [f"Profile: {total} samples over {self.wall_s:.1f}s (every {self.interval * 1000:g} ms), "
+                 f"sampler overhead {100.0 * self.sampler_cpu_s / max(self.wall_s, 1e-9):.1f}% of one core",
+                 "", "Stage          share      time"]
+        for name, count in stages.most_common():
+            lines.append(f"{name:14s} {100.0 * count / total:5.1f}%  {count * ms / 1000.0:7.2f}s")
+        lines += ["", f"Top {top} by self time", "  self%  total%  function"]
+        for label, count in self_counts.most_common(top):
+            lines.append(f"  {100.0 * count / total:5.1f}  {100.0 * total_counts[label] / total:6.1f}  {label}")
+        lines += ["", f"Top {top} by total time", " total%   self%  function"]
+        for label, count in total_counts.most_common(top):
+            lines.append(f"  {100.0 * count / total:5.1f}  {100.0 * self_counts[label] / total:6.1f}  {label}")
+        return "\n".join(lines)
+
+    def write(self, prefix="profile", top=20):
+        """Write <prefix>.collapsed and <prefix>_top.txt; returns both paths"""
+        collapsed_path, summary_path = f"{prefix}.collapsed", f"{prefix}_top.txt"
+        with open(collapsed_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(self.collapsed()) + "\n")
+        with open(summary_path, "w", encoding="utf-8") as f:
+            f.write(self.summary(top) + "\n")
+        self.unsaved = False
+        return collapsed_path, summary_path
+
+
+def profiler_from_args(args):
+    """SamplingProfiler configured from main.py's --profile-* options (defaults otherwise)"""
+    return SamplingProfiler(interval=getattr(args, 'profile_interval', 5.0) / 1000.0)
+
+
+def save_profile(profiler, args):
+    """Write the profile files if there is anything new, and print where they went"""
+    if profiler is None or not profiler.unsaved:
+        return None
+    prefix = getattr(args, 'profile_out', None) or "profile"
+    paths = profiler.write(prefix, top=getattr(args, 'profile_top', 20))
+    print(f"\nProfile written to {paths[0]} (flamegraph) and {paths[1]}")
+    return paths
@@ -0,0 +1,264 @@
+"""
+Segmentation - Splits a continuous landmark stream into exercises and rest
+
+Every hop (0.5 s) the last window (2 s) of frames is summarized into a few
+view-independent features and classified as one of the six exercise types
+or 'rest':
+
+    torso tilt      0 standing, 90 lying or in a plank; its range swings in sit-ups
+    hip height      hip above the ankles, in torso lengths (squats move it)
+    ankle lift      the lower foot leaving the ground (jumps, not a raised leg)
+    ankle gap       one ankle held above the other (one-leg stand)
+    elbow angle     bends in push-ups
+    motion          how far the torso wanders, in torso lengths (a plank holds still)
+
+Ranges are 10th to 90th percentile, so landmark jitter does not count as
+movement. A label has to win `confirm` windows in a row before the segment
+changes (rest twice as many, since every exercise pauses between reps), so
+a single odd window does not split the recording. The new segment is dated
+back to the middle of the first winning window.
+
+Only 12 joints per frame are kept, and features are computed for the whole
+window in one percentile pass every hop, so segmentation costs about 20
+microseconds per frame. SegmentRouter feeds an AssessmentSession with a
+fixed lag (5 s by default), which is how long a boundary can take to be
+confirmed, so every frame reaches the analyzer for the segment it really
+belongs to:
+
+    router = SegmentRouter(session)
+    router.push(landmarks, t, w, h)        # per frame; (33, 4) array or None
+    router.flush()                         # at the end of the recording
+
+segment_entry() does the same offline for a landmark entry (run_video).
+"""
+
+from collections import deque
+
+import numpy as np
+
+REST = 'rest'
+# Shoulders, elbows, wrists, hips, knees, ankles; left/right interleaved
+KEYPOINTS = [11, 12, 13, 14, 15, 16, 23, 24, 25, 26, 27, 28]
+_SH, _EL, _WR, _HP, _KN, _AN = 0, 2, 4, 6, 8, 10
+# x, y and visibility of each keypoint in a flattened (33, 4) array: one gather per frame
+_FLAT = np.array([4 * k + c for k in KEYPOINTS for c in (0, 1, 3)])
+
+
+class Segment:
+    """One stretch of the recording with a single label; end is None while it is open"""
+    __slots__ = ('label', 'start', 'end')
+
+    def __init__(self, label, start, end=None):
+        self.label = label
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        end = f"{self.end:.1f}" if self.end is not None else "..."
+        return f"Segment({self.label}, {self.start:.1f}-{end})"
+
+
+def _angle(a, b, c):
+    """Angle at b in degrees, per row"""
+    ba, bc = a - b, c - b
+    cos = (ba * bc).sum(-1) / (np.linalg.norm(ba, axis=-1) * np.linalg.norm(bc, axis=-1) + 1e-9)
+    return np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
+
+
+def window_features(points):
+    """Feature dict for one window of (n, 12, 3) keypoints (x in frame heights, y, visibility)"""
+    xy = points[..., :2]
+    side = 0 if points[:, 0::2, 2].sum() >= points[:, 1::2, 2].sum() else 1
+    mid = (xy[:, 0::2] + xy[:, 1::2]) / 2  # (n, 6, 2): shoulder, elbow, wrist, hip, knee, ankle
+    torso = mid[:, 0] - mid[:, 3]
+    centre = (mid[:, 0] + mid[:, 3]) / 2
+    # One percentile pass over every per-frame series; lengths are scaled afterwards
+    series = np.stack([
+        np.degrees(np.arctan2(np.abs(torso[:, 0]), -torso[:, 1])),       # Tilt from upright
+        mid[:, 5, 1] - mid[:, 3, 1],                                      # Hip above the ankles
+        -np.maximum(xy[:, _AN, 1], xy[:, _AN + 1, 1]),                    # Lower foot (y grows down)
+        np.abs(xy[:, _AN, 1] - xy[:, _AN + 1, 1]),                        # Ankle gap
+        _angle(xy[:, _SH + side], xy[:, _EL + side], xy[:, _WR + side]),  # Elbow
+        centre[:, 0], centre[:, 1],
+        np.hypot(torso[:, 0], torso[:, 1]),                               # Torso length
+    ], axis=1)
+    lo, median, hi = np.percentile(series, (10, 50, 90), axis=0)
+    spread = hi - lo
+    length = median[7] + 1e-6
+    return {
+        'tilt': float(median[0]),
+        'tilt_range': float(spread[0]),
+        'hip_height_range': float(spread[1] / length),
+        'ankle_lift': float(spread[2] / length),
+        'ankle_gap': float(median[3] / length),
+        'elbow_range': float(spread[4]),
+        'motion': float(max(spread[5], spread[6]) / length),
+    }
+
+
+def classify(features):
+    """Exercise type (or REST) for one window's features"""
+    if features['tilt_range'] > 35 and features['hip_height_range'] < 0.3:
+        return 'situps'  # The torso swings up and down while the hips stay on the floor
+    if features['tilt'] > 50:  # Supported horizontally
+        if features['elbow_range'] > 45:
+            return 'pushups'
+        return 'plank' if features['motion'] < 0.15 else REST
+    if features['ankle_lift'] > 0.2:
+        return 'vertical_jump'
+    if features['hip_height_range'] > 0.25:
+        return 'squats'
+    if features['ankle_gap'] > 0.2:
+        return 'one_leg_stand'
+    return REST
+
+
+class ActivitySegmenter:
+    """Streaming window classifier with confirmation; push() returns a new Segment when one starts"""
+
+    def __init__(self, window_s=2.0, hop_s=0.5, confirm=4, min_detected=0.6, aspect=16 / 9):
+        self.window_s = window_s
+        self.hop_s = hop_s
+        self.confirm = confirm
+        self.min_detected = min_detected
+        self.aspect = aspect
+        self.segments = []
+        self.last_label = None
+        self.features = None    # Features of the latest window (None when too few poses)
+        self.decided_at = None  # Time of the latest window decision
+        self._frames = deque()  # (t, (12, 3) keypoints or None)
+        self._next_hop = None
+        self._candidate = None
+        self._streak = 0
+        self._streak_start = None
+
+    @property
+    def lag_s(self):
+        """Longest time between a frame and the decision that covers it"""
+        return self.window_s / 2 + 2 * self.confirm * self.hop_s
+
+    @property
+    def current(self):
+        return self.segments[-1] if self.segments else None
+
+    def label_at(self, t):
+        """Label of the segment containing time t, as far as is known"""
+        for segment in reversed(self.segments):
+            if segment.start <= t:
+                return segment.label
+        return None
+
+    def push(self, landmarks, t, frame_width=None, frame_height=None):
+        """Add one frame ((33, 4) array, or None without a pose)"""
+        if frame_width and frame_height:
+            self.aspect = frame_width / frame_height
+        if landmarks is None:
+            self._frames.append((t, None))
+        else:
+            points = np.asarray(landmarks, dtype=np.float64).reshape(132).take(_FLAT).reshape(12, 3)
+            points[:, 0] *= self.aspect  # Frame heights on both axes
+            self._frames.append((t, points))
+        while self._frames and self._frames[0][0] < t - self.window_s:
+            self._frames.popleft()
+        if self._next_hop is None:
+            self._next_hop = t + self.window_s
+        if t < self._next_hop:
+            return None
+        self._next_hop += self.hop_s * max(1, int((t - self._next_hop) / self.hop_s) + 1)
+        self.decided_at = t
+        return self._decide(self._classify_window(), t)
+
+    def _classify_window(self):
+        detected = [p for _, p in self._frames if p is not None]
+        if len(detected) < 3 or len(detected) < self.min_detected * len(self._frames):
+            self.features = None
+            return REST
+        self.features = window_features(np.stack(detected))
+        return classify(self.features)
+
+    def _decide(self, label, t):
+        if label == self.last_label:
+            self._candidate, self._streak = None, 0
+            return None
+        if label != self._candidate:
+            self._candidate, self._streak = label, 0
+            self._streak_start = t - self.window_s / 2
+        self._streak += 1
+        first = not self.segments  # The very first label needs no confirmation
+        needed = 2 * self.confirm if label == REST else self.confirm
+        if not first and self._streak < needed:
+            return None
+        start = self._streak_start if not first else t - self.window_s
+        if self.segments:
+            self.segments[-1].end = start
+        segment = Segment(label, start)
+        self.segments.append(segment)
+        self.last_label = label
+        self._candidate, self._streak = None, 0
+        return segment
+
+    def finish(self, t):
+        if self.segments:
+            self.segments[-1].end = t
+        return self.segments
+
+
+def segment_entry(entry, **kwargs):
+    """Segments of a landmark entry (the extract_landmarks/PoseCache layout)"""
+    w, h = (int(v) for v in entry['frame_size'])
+    segmenter = ActivitySegmenter(aspect=w / h if h else 16 / 9, **kwargs)
+    timestamps = entry['timestamps']
+    for landmarks, ok, t in zip(entry['landmarks'], entry['detected'], timestamps):
+        segmenter.push(landmarks if ok else None, float(t))
+    return segmenter.finish(float(timestamps[-1]) if len(timestamps) else 0.0)
+
+
+def segment_frames(segments, timestamps):
+    """[(segment, first frame, end frame)] index ranges into timestamps"""
+    timestamps = np.asarray(timestamps)
+    out = []
+    for segment in segments:
+        first = int(np.searchsorted(timestamps, segment.start, side='left'))
+        end = int(np.searchsorted(timestamps, segment.end, side='right')) if segment is segments[-1] \
+            else int(np.searchsorted(timestamps, segment.end, side='left'))
+        out.append((segment, first, end))
+    return out
+
+
+class SegmentRouter:
+    """Feeds an AssessmentSession from a continuous stream, switching exercises by segment
+
+    Frames are held for the segmenter's lag and then given to the exercise of
+    the flow whose type matches their segment. Rest, and exercise types not
+    in the flow, reach no analyzer.
+    """
+
+    def __init__(self, session, segmenter=None):
+        self.session = session
+        self.segmenter = segmenter if segmenter is not None else ActivitySegmenter()
+        spec = session.assessment.spec or {'exercises': []}
+        self.index_of = {}
+        for i, entry in enumerate(spec['exercises']):
+            self.index_of.setdefault(entry['type'], i)
+        self._pending = deque()  # (t, landmarks, w, h)
+
+    def push(self, landmarks, t, frame_width=960, frame_height=540):
+        """Add a frame ((33, 4) array or None); returns the Segment that started, if any"""
+        segment = self.segmenter.push(landmarks, t, frame_width, frame_height)
+        self._pending.append((t, landmarks, frame_width, frame_height))
+        self._release(t - self.segmenter.lag_s)
+        return segment
+
+    def flush(self):
+        self._release(float('inf'))
+
+    def _release(self, until):
+        pending, session = self._pending, self.session
+        while pending and pending[0][0] <= until:
+            t, landmarks, w, h = pending.popleft()
+            index = self.index_of.get(self.segmenter.label_at(t))
+            if index is None:
+                continue
+            if index != session.assessment.current_exercise_idx:
+                session.select_exercise(index)
+            session.push_frame(landmarks, t, w, h)
@@ -0,0 +1,292 @@
+"""
+Session Cost - Per-assessment CPU, memory, frame and energy accounting
+
+A SessionCost follows one assessment run and charges what it uses to the
+exercise in progress: CPU user and system seconds, wall seconds, frames,
+pose inference calls and peak resident memory. A session that has the
+process to itself (a webcam session, a --video clip, a serial batch)
+charges process CPU between exercise switches:
+
+    cost = SessionCost('live', 'default')
+    cost.start()
+    cost.switch('Squats')          # whenever the exercise changes
+    cost.frame()                   # per frame (inferred=False for frames that skipped the model)
+    cost.stop()
+    save_assessment_results(exercises, cost=cost)   # appends to <results>_costs.jsonl
+
+Sessions that share the process (parallel batch jobs, --streams stations)
+wrap their work in measure(name), which charges the calling thread's CPU.
+MediaPipe runs part of the graph on its own threads, so apportion() then
+scales those figures to the process CPU actually used over the run.
+
+Energy is read from the Linux RAPL counter when it is readable (it covers
+the whole CPU package, so it is apportioned the same way); otherwise the
+report can estimate it from CPU seconds and a --cost-watts figure.
+"""
+
+import json
+import os
+import resource
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from utils.metrics import rss_bytes
+
+RAPL_ENERGY = "/sys/class/powercap/intel-rapl:0/energy_uj"
+RAPL_RANGE = "/sys/class/powercap/intel-rapl:0/max_energy_range_uj"
+_THREAD = getattr(resource, 'RUSAGE_THREAD', resource.RUSAGE_SELF)
+
+
+def _cpu(scope=resource.RUSAGE_SELF):
+    ru = resource.getrusage(scope)
+    return ru.ru_utime, ru.ru_stime
+
+
+def read_energy_uj():
+    """RAPL package energy counter in microjoules, or None when not readable"""
+    try:
+        with open(RAPL_ENERGY) as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _energy_delta_j(start_uj, end_uj):
+    if start_uj is None or end_uj is None:
+        return None
+    delta = end_uj - start_uj
+    if delta < 0:  # Counter wrapped
+        try:
+            with open(RAPL_RANGE) as f:
+                delta += int(f.read())
+        except (OSError, ValueError):
+            return None
+    return delta / 1e6
+
+
+def assessment_type(spec):
+    """'default', or the exercise types of a custom flow ('squats,plank')"""
+    if not spec:
+        return 'custom'
+    if spec.get('flow') == 'default':
+        return 'default'
+    return ",".join(entry['type'] for entry in spec['exercises'])
+
+
+class ExerciseCost:
+    """What one exercise of a session used"""
+    __slots__ = ('cpu_user', 'cpu_system', 'wall_s', 'frames', 'inferences', 'peak_rss')
+
+    def __init__(self):
+        self.cpu_user = 0.0
+        self.cpu_system = 0.0
+        self.wall_s = 0.0
+        self.frames = 0
+        self.inferences = 0
+        self.peak_rss = 0
+
+    def sample_rss(self):
+        self.peak_rss = max(self.peak_rss, rss_bytes())
+
+    def as_dict(self):
+        return {'cpu_user_s': round(self.cpu_user, 4), 'cpu_system_s': round(self.cpu_system, 4),
+                'wall_s': round(self.wall_s, 3), 'frames': self.frames, 'inferences': self.inferences,
+                'peak_rss_bytes': self.peak_rss}
+
+
+class SessionCost:
+    """Accounting for one assessment run, split by exercise"""
+
+    RSS_EVERY = 64  # Frames between resident memory samples (a /proc read each)
+
+    def __init__(self, mode='live', kind='default'):
+        self.mode = mode
+        self.kind = kind
+        self.exercises = {}
+        self.wall_s = 0.0
+        self.process_cpu = (0.0, 0.0)  # Whole-process (user, system) over the run
+        self.energy_j = None
+        self.apportioned = False
+        self._lock = threading.Lock()
+        self._current = None
+        self._mark = None
+        self._started = None
+
+    def bucket(self, name):
+        bucket = self.exercises.get(name)
+        if bucket is None:
+            with self._lock:
+                bucket = self.exercises.setdefault(name, ExerciseCost())
+        return bucket
+
+    def start(self):
+        now = time.perf_counter()
+        self._started = (now,) + _cpu() + (read_energy_uj(),)
+        self._mark = (now,) + _cpu()
+        return self
+
+    def _charge(self):
+        now = time.perf_counter()
+        user, system = _cpu()
+        bucket = self._current
+        if bucket is not None and self._mark is not None:
+            bucket.wall_s += now - self._mark[0]
+            bucket.cpu_user += user - self._mark[1]
+            bucket.cpu_system += system - self._mark[2]
+            bucket.sample_rss()
+        self._mark = (now, user, system)
+
+    def switch(self, name):
+        """Charge the exercise so far and move on to name (None for none); returns its bucket"""
+        self._charge()
+        self._current = self.bucket(name) if name is not None else None
+        return self._current
+
+    def frame(self, inferred=True):
+        bucket = self._current
+        if bucket is None:
+            return
+        bucket.frames += 1
+        if inferred:
+            bucket.inferences += 1
+        if bucket.frames % self.RSS_EVERY == 0:
+            bucket.sample_rss()
+
+    @contextmanager
+    def measure(self, name):
+        """Charge this thread's CPU and the elapsed time of the block to name; yields its bucket
+
+        Frames and inferences are counted by the caller on the bucket.
+        """
+        bucket = self.bucket(name)
+        started = time.perf_counter()
+        user, system = _cpu(_THREAD)
+        try:
+            yield bucket
+        finally:
+            end_user, end_system = _cpu(_THREAD)
+            with self._lock:
+                bucket.wall_s += time.perf_counter() - started
+                bucket.cpu_user += end_user - user
+                bucket.cpu_system += end_system - system
+                if bucket.peak_rss == 0 or bucket.frames % self.RSS_EVERY == 0:
+                    bucket.sample_rss()
+
+    def stop(self):
+        if self._started is None:
+            return self
+        self.switch(None)
+        t0, user0, system0, energy0 = self._started
+        user, system = _cpu()
+        self.wall_s = time.perf_counter() - t0
+        self.process_cpu = (user - user0, system - system0)
+        self.energy_j = _energy_delta_j(energy0, read_energy_uj())
+        self._started = None
+        return self
+
+    def totals(self):
+        total = ExerciseCost()
+        for bucket in self.exercises.values():
+            total.cpu_user += bucket.cpu_user
+            total.cpu_system += bucket.cpu_system
+            total.frames += bucket.frames
+            total.inferences += bucket.inferences
+            total.peak_rss = max(total.peak_rss, bucket.peak_rss)
+        total.wall_s = self.wall_s
+        return total
+
+    def record(self, timestamp=None):
+        """The JSON-ready cost record persisted next to the results"""
+        out = {'timestamp': timestamp or datetime.now().isoformat(timespec='seconds'),
+               'mode': self.mode, 'assessment': self.kind}
+        out.update(self.totals().as_dict())
+        out['energy_j'] = round(self.energy_j, 2) if self.energy_j is not None else None
+        out['apportioned'] = self.apportioned
+        out['exercises'] = {name: bucket.as_dict() for name, bucket in self.exercises.items()}
+        return out
+
+
+def apportion(costs, cpu_user, cpu_system, energy_j=None):
+    """Scale concurrent sessions' thread CPU to the process CPU they used between them
+
+    Each exercise keeps its share of the measured CPU (inference calls decide
+    when nothing was measured); energy is split by the same shares.
+    """
+    buckets = [b for cost in costs for b in cost.exercises.values()]
+    measured = sum(b.cpu_user + b.cpu_system for b in buckets)
+    weights = ([b.cpu_user + b.cpu_system for b in buckets] if measured > 0
+               else [float(b.inferences) for b in buckets])
+    total_weight = sum(weights) or 1.0
+    for bucket, weight in zip(buckets, weights):
+        share = weight / total_weight
+        bucket.cpu_user, bucket.cpu_system = cpu_user * share, cpu_system * share
+    for cost in costs:
+        cost.apportioned = True
+        if energy_j is not None:
+            cpu = sum(b.cpu_user + b.cpu_system for b in cost.exercises.values())
+            cost.energy_j = energy_j * cpu / max(cpu_user + cpu_system, 1e-9)
+        else:
+            cost.energy_j = None
+
+
+def cost_path(results_filename):
+    """fitness_assessment_results.csv -> fitness_assessment_results_costs.jsonl"""
+    return os.path.splitext(results_filename)[0] + "_costs.jsonl"
+
+
+def append_cost_record(path, record):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def load_cost_records(path):
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line))
+    return records
+
+
+def _summary_rows(groups, watts):
+    rows = []
+    for key, items in sorted(groups.items()):
+        cpu = sum(r['cpu_user_s'] + r['cpu_system_s'] for r in items)
+        frames = sum(r['frames'] for r in items)
+        measured = [r['energy_j'] for r in items if r.get('energy_j') is not None]
+        if measured and len(measured) == len(items):
+            energy = f"{sum(measured) / len(items):9.1f}"
+        elif watts:
+            energy = f"{cpu * watts / len(items):8.1f}~"  # Estimated
+        else:
+            energy = f"{'-':>9s}"
+        rows.append(f"{key[:28]:28s} {len(items):5d} {sum(r['wall_s'] for r in items) / len(items):8.1f} "
+                    f"{cpu / len(items):8.2f} {1000.0 * cpu / max(frames, 1):7.2f} "
+                    f"{frames / len(items):8.0f} {sum(r['inferences'] for r in items) / len(items):8.0f} "
+                    f"{max(r['peak_rss_bytes'] for r in items) / 2 ** 20:7.0f} {energy}")
+    return rows
+
+
+def cost_report(records, watts=None):
+    """Cost per assessment type and per exercise, as text (means per session)"""
+    if not records:
+        return "No cost records."
+    by_type, by_exercise = {}, {}
+    for record in records:
+        by_type.setdefault(f"{record['mode']}: {record['assessment']}", []).append(record)
+        for name, exercise in record['exercises'].items():
+            by_exercise.setdefault(name, []).append(exercise)
+    header = (f"{'':28s} {'runs':>5s} {'wall s':>8s} {'cpu s':>8s} {'ms/frm':>7s} "
+              f"{'frames':>8s} {'infer':>8s} {'peak MB':>7s} {'energy J':>9s}")
+    lines = [f"Cost per assessment type ({len(records)} sessions, means per session)", header]
+    lines += _summary_rows(by_type, watts)
+    lines += ["", "Cost per exercise (means per session it ran in)", header]
+    lines += _summary_rows(by_exercise, watts)
+    notes = []
+    if watts:
+        notes.append(f"~ energy estimated at {watts:g} W per busy core")
+    if any(r.get('apportioned') for r in records):
+        notes.append("sessions that shared the process split its CPU by measured thread time")
+    return "\n".join(lines + [""] + notes if notes else lines)
@@ -0,0 +1,79 @@
+"""
+Smoothing - Timestamp-driven One-Euro filter for landmark arrays
+
+The filter cutoff is in Hz and every update uses the real time step between
+frames, so the same settings give the same amount of smoothing at 10, 15 or
+30 fps. Slow movement is smoothed heavily (low jitter while holding a pose);
+fast movement raises the cutoff so reps are not delayed.
+
+    smoother = LandmarkSmoother()
+    arr = smoother(landmarks_array, timestamp)   # (33, 4) in, (33, 4) out
+
+Casiez et al., "1 Euro Filter: A Simple Speed-based Low-pass Filter for
+Noisy Input in Interactive Systems", CHI 2012.
+"""
+
+import math
+
+import numpy as np
+
+
+def _alpha(cutoff, dt):
+    tau = 1.0 / (2.0 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    """Element-wise One-Euro filter over a scalar or numpy array
+
+    min_cutoff (Hz) sets the smoothing at rest, beta how fast the cutoff rises
+    with speed (units per second) and d_cutoff (Hz) smooths the speed estimate.
+    A gap longer than max_gap seconds restarts the filter from the new sample.
+    """
+
+    def __init__(self, min_cutoff=1.5, beta=5.0, d_cutoff=1.0, max_gap=0.5):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.max_gap = max_gap
+        self.reset()
+
+    def reset(self):
+        self._x = None
+        self._dx = None
+        self._t = None
+
+    def __call__(self, x, t):
+        x = np.asarray(x, dtype=np.float64)
+        dt = None if self._t is None else t - self._t
+        if dt is None or dt > self.max_gap or self._x is None or self._x.shape != x.shape:
+            self._x = x.copy()
+            self._dx = np.zeros_like(x)
+            self._t = t
+            return self._x
+        if dt <= 0:
+            return self._x  # Repeated timestamp: nothing new to filter
+        self._t = t
+
+        a_d = _alpha(self.d_cutoff, dt)
+        self._dx = self._dx + a_d * ((x - self._x) / dt - self._dx)
+        cutoff = self.min_cutoff + self.beta * np.abs(self._dx)
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        a = 1.0 / (1.0 + tau / dt)
+        self._x = self._x + a * (x - self._x)
+        return self._x
+
+
+class LandmarkSmoother:
+    """One-Euro filter for (33, 4) landmark arrays; visibility passes through"""
+
+    def __init__(self, min_cutoff=1.5, beta=5.0, d_cutoff=1.0, max_gap=0.5):
+        self.filter = OneEuroFilter(min_cutoff, beta, d_cutoff, max_gap)
+
+    def reset(self):
+        self.filter.reset()
+
+    def __call__(self, landmarks, t):
+        arr = np.array(landmarks, dtype=np.float64)
+        arr[:, :3] = self.filter(arr[:, :3], t)
+        return arr
@@ -0,0 +1,187 @@
+"""
+Streaming Upload - Resumable chunked uploads analyzed while the video arrives
+
+Chunks are appended at an explicit byte offset (tus-style). If an upload is
+interrupted, the client asks for the current offset and continues from
+there. After each chunk, the frames decodable so far are pushed through the
+upload's AssessmentSession, so Plank/Situps state machines advance while the
+rest of the file is still in transit. frames_analyzed is remembered between
+passes, so frames that were already scored are never sent to pose inference
+again, and each pass seeks straight to the first new frame: a capture cannot
+read on past the end of a file that has since grown, and decoding every
+earlier frame again would make a long upload cost O(frames x passes).
+
+Decoding a growing file only works for streamable containers (fragmented
+MP4, WebM, MPEG-TS, MJPEG AVI). A classic MP4 with its index at the end
+becomes decodable only once that index has arrived. Until then, analysis
+simply waits for more data. An AVI's index also comes last, and without it
+FFmpeg can only seek by reading forward from the start, so MJPEG AVI
+uploads still decode earlier frames again (without pose inference); prefer
+WebM or fragmented MP4 for long recordings.
+"""
+
+import os
+import threading
+
+import cv2
+
+from assessment_session import AssessmentSession
+
+# Frames at the end of a partial file may be truncated; keep them for the next pass
+HOLDBACK_FRAMES = 2
+
+
+class OffsetMismatch(Exception):
+    def __init__(self, expected):
+        super().__init__(f"Upload offset mismatch, expected {expected}")
+        self.expected = expected
+
+
+class StreamingUpload:
+    """One resumable upload plus the session scoring it incrementally"""
+
+    def __init__(self, upload_id, spec, path, total_length=None):
+        self.upload_id = upload_id
+        self.path = path
+        self.total_length = total_length
+        self.session = AssessmentSession(spec)
+        self.offset = 0
+        self.frames_analyzed = 0
+        self.complete = False
+        self.status = "uploading"
+        self.result = None
+        self.error = None
+
+        self.lock = threading.Lock()
+        self._analyze_lock = threading.Lock()
+        self._scheduled = False
+        self._dirty = False
+        open(path, "wb").close()
+
+    def append(self, offset, stream, length):
+        """Write one chunk at offset; returns the new offset"""
+        with self.lock:
+            if self.complete:
+                raise OffsetMismatch(self.offset)
+            if offset != self.offset:
+                raise OffsetMismatch(self.offset)
+            if self.total_length is not None and offset + length > self.total_length:
+                raise ValueError("Chunk runs past Upload-Length")
+            written = 0
+            with open(self.path, "ab") as f:
+                try:
+                    while written < length:
+                        chunk = stream.read(min(1 << 20, length - written))
+                        if not chunk:
+                            break
+                        f.write(chunk)
+                        written += len(chunk)
+                finally:
+                    # A dropped or timed-out connection leaves a short chunk; the
+                    # offset says where to resume, so it must match the file exactly
+                    # (a failed write may have left part of a block behind)
+                    self.offset += written
+                    f.truncate(self.offset)
+            return self.offset
+
+    def mark_complete(self):
+        with self.lock:
+            if self.total_length is not None and self.offset != self.total_length:
+                raise OffsetMismatch(self.offset)
+            self.complete = True
+            self.status = "finalizing"
+
+    def analyze_available(self, pose_checkout):
+        """Score every newly decodable frame; finishes the session once complete"""
+        with self._analyze_lock:
+            with self.lock:
+                final = self.complete
+
+            cap = self._open_at(self.frames_analyzed)
+            try:
+                if cap.isOpened():
+                    self._analyze_frames(cap, pose_checkout, 0 if final else HOLDBACK_FRAMES)
+            finally:
+                cap.release()
+
+            if final and self.result is None:
+                self.result = self.session.finish()
+                self.status = "done"
+                os.remove(self.path)
+
+    def _open_at(self, index):
+        """Capture positioned at frame index of the file received so far"""
+        cap = cv2.VideoCapture(self.path)
+        if not index or not cap.isOpened():
+            return cap
+        # FFmpeg seeks to the keyframe before index and decodes up to it, frame-accurately
+        if cap.set(cv2.CAP_PROP_POS_FRAMES, index) and cap.get(cv2.CAP_PROP_POS_FRAMES) == index:
+            return cap
+        # Not seekable (yet): skip what earlier passes scored (grab avoids the colour conversion)
+        cap.release()
+        cap = cv2.VideoCapture(self.path)
+        for _ in range(index):
+            if not cap.grab():
+                break
+        return cap
+
+    def _analyze_frames(self, cap, pose_checkout, holdback):
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        pending = []
+        with pose_checkout() as pose:
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                pending.append(frame)
+                if len(pending) > holdback:
+                    self._analyze_frame(pose, pending.pop(0), fps)
+
+    def _analyze_frame(self, pose, frame, fps):
+        h, w = frame.shape[:2]
+        res = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        landmarks = res.pose_landmarks.landmark if res.pose_landmarks else None
+        self.session.push_frame(landmarks, self.frames_analyzed / fps, w, h, all_exercises=True)
+        self.frames_analyzed += 1
+
+    def schedule(self, executor, pose_checkout):
+        """Queue an analysis pass; chunks arriving mid-pass trigger one more pass"""
+        with self.lock:
+            if self._scheduled:
+                self._dirty = True
+                return
+            self._scheduled = True
+        executor.submit(self._run_passes, pose_checkout)
+
+    def _run_passes(self, pose_checkout):
+        while True:
+            with self.lock:
+                self._dirty = False
+            try:
+                self.analyze_available(pose_checkout)
+            except Exception as e:
+                self.status = "failed"
+                self.error = str(e)
+            with self.lock:
+                if not self._dirty:
+                    self._scheduled = False
+                    return
+
+    def to_dict(self):
+        ex = self.session.current_exercise
+        data = {
+            'upload_id': self.upload_id,
+            'status': self.status,
+            'offset': self.offset,
+            'frames_analyzed': self.frames_analyzed,
+            'exercise': ex.name if ex else None,
+            'reps': ex.reps if ex else 0,
+            'duration': round(ex.duration, 2) if ex else 0.0,
+        }
+        if self.total_length is not None:
+            data['length'] = self.total_length
+        if self.error:
+            data['error'] = self.error
+        if self.result is not None:
+            data['result'] = self.result
+        return data
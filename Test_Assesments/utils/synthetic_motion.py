@@ -0,0 +1,538 @@
+"""
+Synthetic Motion - Parametric 33-landmark pose sequences with ground truth
+
+Builds MediaPipe-layout landmark streams for every supported movement from a
+small kinematic body model, so load tests and threshold tuning do not need
+volunteers or footage:
+
+    clip = generate('squats', seconds=60, fps=30, depth=80, valgus=0.06, noise=0.002, seed=1)
+    clip.landmarks        # (N, 33, 4) float32 x, y, z, visibility (normalized, as MediaPipe)
+    clip.labels['knee_angle'], clip.truth['reps']
+    analyze_landmarks(create_exercise('squats'), clip.entry())   # plugs into the exercises
+
+Everything is computed on arrays of frame times, in cache-sized blocks, and
+landmark noise is sliced from a pre-drawn bank, so one core renders around a
+million frames a second. Per-rep timing and depth variation are drawn once
+per generator from the seed; MotionGenerator.chunks() renders long sessions
+piecewise with the same schedule and bounded memory.
+
+Movements and their parameters (angles in degrees, distances in frame heights):
+
+    squats          depth, top, valgus (knee shift back over the ankle at the bottom)
+    pushups         depth, top, sag (hip drop below the shoulder-ankle line)
+    situps          top (hip angle sitting up), bottom (lying back)
+    plank           hold_s, drift (hip sag per minute), fail_sag, wobble
+    vertical_jump   flight_s, tuck, countermovement, height_cm
+    one_leg_stand   sway (hip offset, frame widths), sway_period_s, touchdown_s
+
+Rep-based movements also take rep_s, rest_s, lead_s, tempo_jitter and
+depth_jitter. Sensor effects shared by all of them: noise (landmark jitter,
+frame heights), occlusion (per-landmark low-visibility probability), dropout
+and dropout_burst (frames with no pose, in bursts), frame_jitter (timestamp
+jitter as a fraction of the frame interval) and fps.
+"""
+
+import json
+import math
+
+import numpy as np
+
+G = 9.81
+
+# Segment lengths as fractions of body height
+TRUNK, THIGH, SHANK = 0.30, 0.245, 0.246
+UPPER_ARM, FOREARM = 0.186, 0.146
+ANKLE_H, NECK = 0.039, 0.10
+SHOULDER_W, HIP_W = 0.22, 0.16
+
+# Near-side landmark indices for side views (the far side is each + 1)
+_SIDE_JOINTS = {'shoulder': 11, 'elbow': 13, 'wrist': 15, 'hip': 23, 'knee': 25, 'ankle': 27}
+LEFT = [1, 2, 3, 7, 9] + list(range(11, 33, 2))
+RIGHT = [4, 5, 6, 8, 10] + list(range(12, 33, 2))
+
+
+class SyntheticClip:
+    """Rendered frames plus ground truth; entry() is the PoseCache/analyze_landmarks layout"""
+    __slots__ = ('movement', 'landmarks', 'timestamps', 'detected', 'labels', 'truth', 'frame_size', 'fps')
+
+    def __init__(self, movement, landmarks, timestamps, detected, labels, truth, frame_size, fps):
+        self.movement = movement
+        self.landmarks = landmarks
+        self.timestamps = timestamps
+        self.detected = detected
+        self.labels = labels
+        self.truth = truth
+        self.frame_size = frame_size
+        self.fps = fps
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def entry(self):
+        return {'landmarks': self.landmarks, 'detected': self.detected, 'timestamps': self.timestamps,
+                'frame_size': np.array(self.frame_size, dtype=np.int32), 'fps': np.array(self.fps)}
+
+    def save(self, path):
+        """.npz in the landmark upload layout, with label_* arrays and the truth as JSON"""
+        arrays = self.entry()
+        arrays.update({f"label_{k}": v for k, v in self.labels.items()})
+        arrays['truth'] = np.array(json.dumps(self.truth))
+        np.savez_compressed(path, **arrays)
+
+
+# ---------------------------------------------------------------- geometry
+# Kinematics run in body units (fractions of frame height) with y up and the
+# origin on the floor under the body; _place() maps to normalized image coords.
+
+def _seg(p, length, deg):
+    """Point `length` from p at angle deg (counter-clockwise from +x)"""
+    a = np.radians(deg)
+    return np.stack([p[..., 0] + length * np.cos(a), p[..., 1] + length * np.sin(a)], axis=-1)
+
+
+def _unit(v):
+    return v / np.maximum(np.linalg.norm(v, axis=-1, keepdims=True), 1e-9)
+
+
+def _perp(u):
+    """u rotated -90 degrees: 'forward' for a body facing +x with u pointing head-wards"""
+    return np.stack([u[..., 1], -u[..., 0]], axis=-1)
+
+
+def _angle(a, b, c):
+    """Angle at b (degrees), vectorized"""
+    ba, bc = a - b, c - b
+    cos = (ba * bc).sum(-1) / np.maximum(np.linalg.norm(ba, axis=-1) * np.linalg.norm(bc, axis=-1), 1e-9)
+    return np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
+
+
+def _const(n, xy):
+    return np.broadcast_to(np.asarray(xy, dtype=np.float64), (n, 2))
+
+
+def _side_view(n, j, H, foot_dir):
+    """{landmark index: (n, 2)} for the near (left) side of a body facing +x; _place() adds the far side"""
+    out = {}
+    u = _unit(j['shoulder'] - j['hip'])
+    f = _perp(u)
+    head = j['shoulder'] + u * (NECK * H) + f * (0.02 * H)
+    out[0] = head + f * (0.05 * H)
+    for k, (fw, up) in enumerate(((0.04, 0.02), (0.035, 0.02), (0.028, 0.02))):  # Eye inner/centre/outer
+        out[1 + k] = head + f * (fw * H) + u * (up * H)
+    out[7] = head - f * (0.01 * H)
+    out[9] = head + f * (0.04 * H) - u * (0.03 * H)
+
+    v = _unit(j['wrist'] - j['elbow'])
+    vp = _perp(v)
+    fd = np.broadcast_to(_unit(np.asarray(foot_dir, dtype=np.float64)), (n, 2))
+    fn = -_perp(fd)  # Top of the foot
+    out[17] = j['wrist'] + v * (0.07 * H) - vp * (0.01 * H)   # Pinky
+    out[19] = j['wrist'] + v * (0.08 * H)                      # Index
+    out[21] = j['wrist'] + v * (0.04 * H) + vp * (0.01 * H)   # Thumb
+    out[29] = j['ankle'] - fd * (0.035 * H) - fn * (0.03 * H)  # Heel
+    out[31] = j['ankle'] + fd * (0.11 * H) - fn * (0.03 * H)   # Foot index
+    for name, idx in _SIDE_JOINTS.items():
+        out[idx] = j[name]
+    return out
+
+
+def _front_view(n, j, H):
+    """{landmark index: (n, 2)} for a body facing the camera; j holds l_*/r_* joints (left at +x)"""
+    out = {}
+    mid = (j['l_shoulder'] + j['r_shoulder']) / 2
+    head = mid + np.array([0.0, NECK * H + 0.02 * H])
+    out[0] = head - np.array([0.0, 0.01 * H])
+    for k, dx in enumerate((0.012, 0.02, 0.028)):
+        out[1 + k] = head + np.array([dx * H, 0.015 * H])   # Left eye inner/centre/outer
+        out[4 + k] = head + np.array([-dx * H, 0.015 * H])
+    out[7], out[8] = head + np.array([0.045 * H, 0.01 * H]), head + np.array([-0.045 * H, 0.01 * H])
+    out[9], out[10] = head + np.array([0.015 * H, -0.035 * H]), head + np.array([-0.015 * H, -0.035 * H])
+    for side, sign, off in (('l', 1.0, 0), ('r', -1.0, 1)):
+        for name, idx in _SIDE_JOINTS.items():
+            out[idx + off] = j[f"{side}_{name}"]
+        wrist, ankle = j[f"{side}_wrist"], j[f"{side}_ankle"]
+        out[17 + off] = wrist + np.array([sign * 0.015 * H, -0.07 * H])
+        out[19 + off] = wrist + np.array([sign * 0.005 * H, -0.08 * H])
+        out[21 + off] = wrist + np.array([-sign * 0.01 * H, -0.045 * H])
+        out[29 + off] = ankle + np.array([0.0, -0.03 * H])
+        out[31 + off] = ankle + np.array([sign * 0.02 * H, -0.035 * H])
+    return out
+
+
+def _place(points, out, frame_size, H, ground=0.9, near=None):
+    """Write points into out, a zeroed (n, 33, 4) float32 block, in normalized image coordinates
+
+    The body origin maps to the frame centre on the ground line. Side views
+    give only the near side, built as the left; near='R' mirrors the body
+    (facing -x) and the labels, and the far side is the near one shifted back
+    a little for parallax.
+    """
+    fw, fh = frame_size
+    scale = np.array([-fh / fw if near == 'R' else fh / fw, -1.0], dtype=np.float32)
+    offset = np.zeros((33, 4), dtype=np.float32)
+    offset[:] = [0.5, ground, 0.0, 0.95]
+    if near is None:
+        targets = {idx: (idx,) for idx in points}
+    else:
+        near_idx, far_idx = (RIGHT, LEFT) if near == 'R' else (LEFT, RIGHT)
+        mirror = dict(zip(LEFT, near_idx))
+        far_of = dict(zip(near_idx, far_idx))
+        targets = {}
+        for idx in points:
+            idx_near = mirror.get(idx, idx)
+            targets[idx] = (idx_near, far_of[idx_near]) if idx_near in far_of else (idx_near,)
+        offset[far_idx, :2] += np.array([-0.012, 0.008], dtype=np.float32) * H * scale
+        offset[far_idx, 3] = 0.7  # MediaPipe is less sure of the far side
+    # Separate x/y columns and whole-row arithmetic: numpy is several times slower
+    # when the innermost loop is 2 or 4 elements long
+    for idx, pt in points.items():
+        x, y = pt[..., 0], pt[..., 1]
+        for target in targets[idx]:
+            out[:, target, 0] = x
+            out[:, target, 1] = y
+    rows = out.reshape(len(out), 132)
+    rows *= np.tile(np.array([scale[0], scale[1], 0.0, 0.0], dtype=np.float32), 33)
+    rows += offset.reshape(132)
+
+
+# ---------------------------------------------------------------- schedules
+
+def _rep_plan(p, seconds, rng):
+    """Rep start times and durations; every rep is followed by a rest inside the clip"""
+    n_max = max(0, int((seconds - p['lead_s']) / (p['rep_s'] * (1 - p['tempo_jitter']))) + 1)
+    durs = p['rep_s'] * (1 + p['tempo_jitter'] * rng.uniform(-1, 1, n_max))
+    starts = p['lead_s'] + np.concatenate([[0.0], np.cumsum(durs)[:-1]])
+    keep = starts + durs + p['rest_s'] <= seconds
+    return {'starts': starts[keep], 'durs': durs[keep],
+            'depth': p['depth'] + p['depth_jitter'] * rng.uniform(-1, 1, int(keep.sum()))}
+
+
+def _rep_phase(t, plan, rest_s):
+    """(rep index or -1, dip 0..1) per frame: rest at the top, then a smooth sin() excursion"""
+    starts, durs = plan['starts'], plan['durs']
+    if not len(starts):
+        return np.full(len(t), -1), np.zeros(len(t))
+    idx = np.clip(np.searchsorted(starts, t, side='right') - 1, 0, len(starts) - 1)
+    u = (t - starts[idx] - rest_s) / (durs[idx] - rest_s)
+    active = (t >= starts[0]) & (u >= 0) & (u <= 1)
+    dip = np.where(active, np.sin(np.pi * np.clip(u, 0, 1)), 0.0)
+    return np.where(active, idx, -1), dip
+
+
+def _rep_truth(plan, rest_s):
+    starts, durs = plan['starts'], plan['durs']
+    return {'reps': int(len(starts)), 'rep_start': (starts + rest_s).round(4).tolist(),
+            'rep_bottom': (starts + rest_s + (durs - rest_s) / 2).round(4).tolist(),
+            'rep_end': (starts + durs).round(4).tolist(), 'depth': plan['depth'].round(3).tolist()}
+
+
+REP_DEFAULTS = {'rep_s': 2.5, 'rest_s': 0.5, 'lead_s': 0.0, 'tempo_jitter': 0.0, 'depth_jitter': 0.0}
+
+
+# ---------------------------------------------------------------- movements
+# Each movement is (defaults, plan(p, seconds, rng), render(t, plan, p, H) -> (points, labels, near)).
+
+def _squats_render(t, plan, p, H):
+    n = len(t)
+    rep, dip = _rep_phase(t, plan, p['rest_s'])
+    depth = np.where(rep >= 0, plan['depth'][np.maximum(rep, 0)], p['depth']) if len(plan['depth']) else p['depth']
+    knee_angle = p['top'] - (p['top'] - depth) * dip
+    flex = 180.0 - knee_angle
+    lean = 0.2 * flex
+    # Valgus moves the knee back over the ankle (inward, as the side-view check sees it) by
+    # turning the shank; the thigh follows so the knee angle is unchanged
+    valgus = p['valgus'] * dip
+    kx = np.clip(SHANK * H * np.cos(np.radians(90 - lean)) - valgus, -0.95 * SHANK * H, 0.95 * SHANK * H)
+    shank_dir = np.degrees(np.arccos(kx / (SHANK * H)))
+    ankle = _const(n, (0.0, ANKLE_H * H))
+    knee = _seg(ankle, SHANK * H, shank_dir)
+    hip = _seg(knee, THIGH * H, 180 + shank_dir - knee_angle)
+    shoulder = _seg(hip, TRUNK * H, 90 - 0.5 * flex)
+    arm = -90 + 0.9 * flex  # Arms rise forward for balance
+    elbow = _seg(shoulder, UPPER_ARM * H, arm)
+    wrist = _seg(elbow, FOREARM * H, arm + 5)
+    j = {'shoulder': shoulder, 'elbow': elbow, 'wrist': wrist, 'hip': hip, 'knee': knee, 'ankle': ankle}
+    return _side_view(n, j, H, (1.0, -0.15)), {'rep': rep, 'knee_angle': _angle(hip, knee, ankle),
+                                               'valgus': valgus}, p['side']
+
+
+def _pushups_render(t, plan, p, H):
+    n = len(t)
+    rep, dip = _rep_phase(t, plan, p['rest_s'])
+    depth = np.where(rep >= 0, plan['depth'][np.maximum(rep, 0)], p['depth']) if len(plan['depth']) else p['depth']
+    elbow_angle = p['top'] - (p['top'] - depth) * dip
+    x0 = 0.25 * H  # Hands ahead of the frame centre, feet behind it
+    wrist = _const(n, (x0, 0.02 * H))
+    elbow = _seg(wrist, FOREARM * H, 90)
+    shoulder = _seg(elbow, UPPER_ARM * H, elbow_angle - 90)
+    # Feet stay where a straight body line put them at the top of the rep
+    body = (TRUNK + THIGH + SHANK) * H
+    top_shoulder = np.array([x0 + UPPER_ARM * H * math.cos(math.radians(p['top'] - 90)),
+                             0.02 * H + FOREARM * H + UPPER_ARM * H * math.sin(math.radians(p['top'] - 90))])
+    ankle_y = 0.05 * H
+    ankle = _const(n, (top_shoulder[0] - math.sqrt(body ** 2 - (top_shoulder[1] - ankle_y) ** 2), ankle_y))
+    line = TRUNK / (TRUNK + THIGH + SHANK)
+    hip = shoulder + (ankle - shoulder) * line - np.array([0.0, p['sag']])
+    knee = hip + (ankle - hip) * (THIGH / (THIGH + SHANK))
+    j = {'shoulder': shoulder, 'elbow': elbow, 'wrist': wrist, 'hip': hip, 'knee': knee, 'ankle': ankle}
+    return _side_view(n, j, H, (0.35, -0.94)), {'rep': rep, 'elbow_angle': _angle(shoulder, elbow, wrist),
+                    'hip_angle': _angle(shoulder, hip, ankle)}, p['side']
+
+
+def _situps_plan(p, seconds, rng):
+    return _rep_plan(dict(p, depth=p['top']), seconds, rng)
+
+
+def _situps_render(t, plan, p, H):
+    n = len(t)
+    rep, dip = _rep_phase(t, plan, p['rest_s'])
+    top = np.where(rep >= 0, plan['depth'][np.maximum(rep, 0)], p['top']) if len(plan['depth']) else p['top']
+    hip_angle = p['bottom'] - (p['bottom'] - top) * dip
+    thigh_dir = 20.0
+    hip = _const(n, (-0.1 * H, 0.05 * H))
+    knee = _seg(hip, THIGH * H, thigh_dir)
+    drop = (knee[0, 1] - 0.01 * H) / (SHANK * H)
+    ankle = _seg(knee, SHANK * H, -math.degrees(math.asin(min(1.0, drop))))
+    trunk_dir = thigh_dir + hip_angle
+    shoulder = _seg(hip, TRUNK * H, trunk_dir)
+    arm = trunk_dir + 180 - 15  # Arms reach along the trunk towards the knees
+    elbow = _seg(shoulder, UPPER_ARM * H, arm)
+    wrist = _seg(elbow, FOREARM * H, arm)
+    j = {'shoulder': shoulder, 'elbow': elbow, 'wrist': wrist, 'hip': hip, 'knee': knee, 'ankle': ankle}
+    return _side_view(n, j, H, (1.0, 0.0)), {'rep': rep, 'hip_angle': _angle(shoulder, hip, knee)}, p['side']
+
+
+def _plank_plan(p, seconds, rng):
+    return {}
+
+
+def _plank_render(t, plan, p, H):
+    n = len(t)
+    x0 = 0.3 * H
+    elbow = _const(n, (x0, 0.02 * H))
+    wrist = _seg(elbow, FOREARM * H, 0)
+    shoulder = _seg(elbow, UPPER_ARM * H, 90)
+    body = (TRUNK + THIGH + SHANK) * H
+    ankle_y = 0.05 * H
+    ankle = _const(n, (x0 - math.sqrt(body ** 2 - (shoulder[0, 1] - ankle_y) ** 2), ankle_y))
+    sag = p['drift'] * t / 60.0 + p['wobble'] * np.sin(2 * np.pi * t / 3.0)
+    sag = sag + np.where(t >= p['hold_s'], p['fail_sag'], 0.0)
+    hip = shoulder + (ankle - shoulder) * (TRUNK / (TRUNK + THIGH + SHANK)) - np.stack([np.zeros(n), sag], axis=-1)
+    knee = hip + (ankle - hip) * (THIGH / (THIGH + SHANK))
+    j = {'shoulder': shoulder, 'elbow': elbow, 'wrist': wrist, 'hip': hip, 'knee': knee, 'ankle': ankle}
+    return _side_view(n, j, H, (0.35, -0.94)), {'hip_angle': _angle(shoulder, hip, ankle), 'hip_sag': sag,
+                                                'holding': t < p['hold_s']}, p['side']
+
+
+def _jump_plan(p, seconds, rng):
+    plan = _rep_plan(dict(p, depth=p['flight_s'], depth_jitter=p['flight_jitter']), seconds, rng)
+    plan['flight'] = np.maximum(plan.pop('depth'), 0.05)
+    # Countermovement (0.5 s) and flight must fit in the rep
+    plan['takeoff'] = plan['starts'] + p['rest_s'] + 0.5
+    keep = plan['takeoff'] + plan['flight'] + 0.4 <= plan['starts'] + plan['durs']
+    return {k: v[keep] for k, v in plan.items()}
+
+
+def _jump_render(t, plan, p, H):
+    n = len(t)
+    takeoff, flight = plan['takeoff'], plan['flight']
+    units_per_m = H / (p['height_cm'] / 100.0)
+    rise = np.zeros(n)
+    dip = np.zeros(n)
+    tuck = np.zeros(n)
+    in_air = np.zeros(n, dtype=bool)
+    if len(takeoff):
+        i = np.clip(np.searchsorted(takeoff, t + 0.5, side='right') - 1, 0, len(takeoff) - 1)
+        tau = t - takeoff[i]
+        T = flight[i]
+        in_air = (tau >= 0) & (tau < T)
+        rise = np.where(in_air, (G * T / 2 * tau - G / 2 * tau ** 2) * units_per_m, 0.0)
+        tuck = np.where(in_air, p['tuck'] * np.sin(np.pi * np.clip(tau / T, 0, 1)), 0.0)
+        before = (tau >= -0.5) & (tau < 0)
+        after = (tau >= T) & (tau < T + 0.4)
+        dip = np.where(before, np.sin(np.pi * (tau + 0.5) / 0.5), 0.0)
+        dip = dip + np.where(after, np.sin(np.pi * (tau - T) / 0.4), 0.0)
+    flex = np.radians(90.0 * tuck + 50.0 * p['countermovement'] * dip)
+    thigh, shank = THIGH * H * np.cos(flex), SHANK * H * np.cos(flex)  # Foreshortened towards the camera
+    base = ANKLE_H * H + rise
+    j = {}
+    for side, sign in (('l', 1.0), ('r', -1.0)):
+        x = sign * HIP_W * H / 2
+        ankle_y = np.where(in_air, base + (THIGH + SHANK) * H - thigh - shank, ANKLE_H * H)
+        j[f"{side}_ankle"] = np.stack([np.full(n, x), ankle_y], axis=-1)
+        j[f"{side}_knee"] = np.stack([np.full(n, x), ankle_y + shank], axis=-1)
+        hip_y = ankle_y + shank + thigh
+        j[f"{side}_hip"] = np.stack([np.full(n, x), hip_y], axis=-1)
+        sx = sign * SHOULDER_W * H / 2
+        j[f"{side}_shoulder"] = np.stack([np.full(n, sx), hip_y + TRUNK * H], axis=-1)
+        j[f"{side}_elbow"] = j[f"{side}_shoulder"] + np.array([sign * 0.03 * H, -UPPER_ARM * H])
+        j[f"{side}_wrist"] = j[f"{side}_elbow"] + np.array([sign * 0.01 * H, -FOREARM * H])
+    return _front_view(n, j, H), {'in_air': in_air, 'rise_cm': rise / units_per_m * 100.0}, None
+
+
+def _jump_truth(plan, p):
+    flight = plan['flight']
+    return {'jumps': int(len(flight)), 'takeoff': plan['takeoff'].round(4).tolist(),
+            'landing': (plan['takeoff'] + flight).round(4).tolist(), 'flight_s': flight.round(4).tolist(),
+            'height_cm': (G * flight ** 2 / 8 * 100).round(2).tolist()}
+
+
+def _stand_render(t, plan, p, H):
+    n = len(t)
+    sway = p['sway'] * np.sin(2 * np.pi * t / p['sway_period_s'])  # Normalized frame widths
+    down = t >= p['touchdown_s'] if p['touchdown_s'] is not None else np.zeros(n, dtype=bool)
+    j = {}
+    leg = (THIGH + SHANK) * H
+    hip_y = ANKLE_H * H + leg
+    for side, sign in (('l', 1.0), ('r', -1.0)):
+        j[f"{side}_hip"] = np.stack([np.full(n, sign * HIP_W * H / 2), np.full(n, hip_y)], axis=-1)
+        sx = sign * SHOULDER_W * H / 2
+        j[f"{side}_shoulder"] = np.stack([np.full(n, sx), np.full(n, hip_y + TRUNK * H)], axis=-1)
+        j[f"{side}_elbow"] = j[f"{side}_shoulder"] + np.array([sign * 0.05 * H, -UPPER_ARM * H * 0.95])
+        j[f"{side}_wrist"] = j[f"{side}_elbow"] + np.array([sign * 0.02 * H, -FOREARM * H])
+    # Standing on the left leg; the right thigh is raised 60 degrees towards the camera until touchdown
+    lx = HIP_W * H / 2
+    j['l_knee'] = np.stack([np.full(n, lx), np.full(n, ANKLE_H * H + SHANK * H)], axis=-1)
+    j['l_ankle'] = _const(n, (lx, ANKLE_H * H))
+    raised = np.where(down, 0.0, np.radians(60.0))
+    rx = -lx
+    j['r_knee'] = np.stack([np.full(n, rx), hip_y - THIGH * H * np.cos(raised)], axis=-1)
+    j['r_ankle'] = j['r_knee'] - np.array([0.0, SHANK * H])
+    # The body pivots over the standing ankle: hips move by sway, shoulders further
+    shift = np.stack([sway * p['aspect'], np.zeros(n)], axis=-1)  # Frame widths -> body units
+    points = _front_view(n, j, H)
+    for idx in range(33):
+        lever = max(0.0, points[idx][0, 1] - ANKLE_H * H) / leg if idx not in (27, 29, 31) else 0.0
+        points[idx] = points[idx] + shift * lever
+    return points, {'hip_offset': sway, 'balance': ~down}, None
+
+
+def _stand_truth(plan, p, seconds):
+    return {'hold_s': float(min(seconds, p['touchdown_s'])) if p['touchdown_s'] is not None else float(seconds),
+            'max_hip_offset': abs(p['sway'])}
+
+
+MOVEMENTS = {
+    'squats': (dict(REP_DEFAULTS, depth=85.0, top=170.0, valgus=0.0, height=0.75), _rep_plan, _squats_render),
+    'pushups': (dict(REP_DEFAULTS, depth=60.0, top=175.0, sag=0.0, height=0.5), _rep_plan, _pushups_render),
+    'situps': (dict(REP_DEFAULTS, top=40.0, bottom=160.0, height=0.6), _situps_plan, _situps_render),
+    'plank': ({'hold_s': float('inf'), 'drift': 0.0, 'fail_sag': 0.12, 'wobble': 0.0, 'height': 0.5},
+              _plank_plan, _plank_render),
+    'vertical_jump': (dict(REP_DEFAULTS, rep_s=3.0, rest_s=1.5, flight_s=0.5, flight_jitter=0.0, tuck=1.0,
+                           countermovement=1.0, height_cm=170.0, height=0.75), _jump_plan, _jump_render),
+    'one_leg_stand': ({'sway': 0.0, 'sway_period_s': 2.5, 'touchdown_s': None, 'height': 0.75},
+                      _plank_plan, _stand_render),
+}
+SENSOR_DEFAULTS = {'noise': 0.0, 'occlusion': 0.0, 'dropout': 0.0, 'dropout_burst': 1, 'frame_jitter': 0.0,
+                   'side': 'L'}
+
+
+class MotionGenerator:
+    """One synthetic session: the movement schedule is fixed at construction
+
+    render() returns any frame range of it, chunks() the whole session piece by
+    piece. Sensor noise is seeded per rendered range, so it depends on the
+    chunking while motion and ground truth do not.
+    """
+    BLOCK = 4096
+
+    def __init__(self, movement, seconds, fps=30.0, seed=0, frame_size=(960, 540), **params):
+        if movement not in MOVEMENTS:
+            raise ValueError(f"Unknown movement: {movement} (choose from {', '.join(MOVEMENTS)})")
+        defaults, plan, self._render = MOVEMENTS[movement]
+        unknown = set(params) - set(defaults) - set(SENSOR_DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown {movement} parameters: {', '.join(sorted(unknown))}")
+        self.movement = movement
+        self.seconds = seconds
+        self.fps = fps
+        self.seed = seed
+        self.frame_size = tuple(frame_size)
+        self.params = dict(defaults, **SENSOR_DEFAULTS)
+        self.params.update(params)
+        self.params['aspect'] = self.frame_size[0] / self.frame_size[1]
+        self.n_frames = int(seconds * fps)
+        self.plan = plan(self.params, seconds, np.random.default_rng([seed, 0]))
+        self.truth = self._truth()
+        self._noise = None
+
+    def _truth(self):
+        p = self.params
+        truth = {'movement': self.movement, 'seconds': self.seconds, 'fps': self.fps, 'frames': self.n_frames,
+                 'params': {k: v for k, v in p.items() if not (isinstance(v, float) and math.isinf(v))}}
+        if self.movement == 'vertical_jump':
+            truth.update(_jump_truth(self.plan, p))
+        elif self.movement == 'one_leg_stand':
+            truth.update(_stand_truth(self.plan, p, self.seconds))
+        elif self.movement == 'plank':
+            truth['hold_s'] = float(min(self.seconds, p['hold_s']))
+        else:
+            truth.update(_rep_truth(self.plan, p['rest_s']))
+        return truth
+
+    def timestamps(self, start, stop):
+        t = np.arange(start, stop) / self.fps
+        if self.params['frame_jitter']:
+            rng = np.random.default_rng([self.seed, 1, start])
+            jitter = np.clip(rng.normal(0.0, self.params['frame_jitter'], len(t)), -0.45, 0.45)
+            t = t + jitter / self.fps
+        return t
+
+    def _noise_bank(self):
+        """Flat x, y, z, visibility jitter; blocks take slices at random landmark offsets"""
+        if self._noise is None:
+            fw, fh = self.frame_size
+            size = 2 * 33 * self.BLOCK  # Landmarks; a block can start at any of half of them
+            bank = np.zeros((size, 4), dtype=np.float32)
+            rng = np.random.default_rng([self.seed, 3])
+            bank[:, :2] = rng.standard_normal((size, 2), dtype=np.float32)
+            bank[:, :2] *= np.array([fh / fw, 1.0], dtype=np.float32) * np.float32(self.params['noise'])  # Isotropic in pixels
+            self._noise = bank.reshape(-1)
+        return self._noise
+
+    def render(self, start=0, stop=None):
+        """Frames [start, stop) as a SyntheticClip"""
+        stop = self.n_frames if stop is None else min(stop, self.n_frames)
+        p = self.params
+        t = self.timestamps(start, stop)
+        n = len(t)
+        lms = np.zeros((n, 33, 4), dtype=np.float32)
+        rng = np.random.default_rng([self.seed, 2, start])
+        # Drawing fresh gaussians per landmark would cost more than the kinematics
+        noise = self._noise_bank() if p['noise'] else None
+        parts = []
+        # Blocks small enough for the per-joint temporaries to stay in cache
+        for b in range(0, n, self.BLOCK):
+            block = lms[b:b + self.BLOCK]
+            points, labels, near = self._render(t[b:b + self.BLOCK], self.plan, p, p['height'])
+            _place(points, block, self.frame_size, p['height'], near=near)
+            if noise is not None:
+                size = block.size
+                at = 4 * int(rng.integers(0, (len(noise) - size) // 4 + 1))
+                block.reshape(-1)[:] += noise[at:at + size]
+            parts.append(labels)
+        labels = {k: np.concatenate([np.asarray(part[k]) for part in parts]) for k in parts[0]} if parts else {}
+
+        if p['occlusion']:
+            hidden = rng.random((n, 33), dtype=np.float32) < p['occlusion']
+            lms[:, :, 3] = np.where(hidden, rng.random((n, 33), dtype=np.float32) * 0.3, lms[:, :, 3])
+            lms[:, :, :2] += hidden[:, :, None] * rng.standard_normal((n, 33, 2), dtype=np.float32) * np.float32(
+                5 * max(p['noise'], 0.002))
+        detected = np.ones(n, dtype=bool)
+        if p['dropout']:
+            burst = max(1, int(p['dropout_burst']))
+            starts = rng.random(n) < p['dropout'] / burst
+            lost = np.convolve(starts, np.ones(burst), mode='full')[:n] > 0
+            detected = ~lost
+            lms[lost] = 0.0
+
+        return SyntheticClip(self.movement, lms, t, detected, labels, self.truth, self.frame_size, self.fps)
+
+    def chunks(self, chunk_frames=1800):
+        for start in range(0, self.n_frames, chunk_frames):
+            yield self.render(start, start + chunk_frames)
+
+
+def generate(movement, seconds, fps=30.0, seed=0, **params):
+    """Render a whole synthetic session (see the module docstring for parameters)"""
+    return MotionGenerator(movement, seconds, fps=fps, seed=seed, **params).render()
@@ -0,0 +1,255 @@
+"""
+Video Runner - Scores recorded clips instead of a live webcam
+
+Pose extraction goes through the PoseCache when one is given, so a clip that
+was already processed with the same settings skips inference entirely.
+"""
+
+import csv
+from concurrent.futures import ThreadPoolExecutor
+from importlib import metadata
+
+import cv2
+import numpy as np
+
+from base_exercise import FrameClock
+from utils.pose_utils import landmarks_from_array, landmarks_to_array
+from utils.pose_cache import hash_video_file, make_cache_key
+
+
+def pose_backend_name():
+    """Backend id used in cache keys (read from package metadata, no import)"""
+    try:
+        return f"mediapipe-pose-{metadata.version('mediapipe')}"
+    except metadata.PackageNotFoundError:
+        return "mediapipe-pose-unknown"
+
+
+def _run_pose(video_path, model_complexity, width, height, flip, pose_pool=None, stride=1):
+    from utils.pose_pool import create_pose
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video: {video_path}")
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    landmarks, detected, timestamps = [], [], []
+    w = h = 0
+    index = 0
+
+    pose_ctx = pose_pool.checkout() if pose_pool is not None else create_pose(model_complexity)
+    with pose_ctx as pose:
+
+        while True:
+            if index % stride:
+                # Inference stride: skip the frame without converting it
+                if not cap.grab():
+                    break
+                index += 1
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            if width and height:
+                frame = cv2.resize(frame, (width, height))
+            if flip:
+                frame = cv2.flip(frame, 1)
+            h, w = frame.shape[:2]
+
+            res = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            if res.pose_landmarks:
+                landmarks.append(landmarks_to_array(res.pose_landmarks.landmark))
+                detected.append(True)
+            else:
+                landmarks.append(np.zeros((33, 4), dtype=np.float32))
+                detected.append(False)
+            timestamps.append(index / fps)
+            index += 1
+
+    cap.release()
+    return {
+        'landmarks': np.array(landmarks, dtype=np.float32).reshape(-1, 33, 4),
+        'detected': np.array(detected, dtype=bool),
+        'timestamps': np.array(timestamps, dtype=np.float64),
+        'frame_size': np.array([w, h], dtype=np.int32),
+        'fps': np.array(fps, dtype=np.float64),
+    }
+
+
+def extract_landmarks(video_path, model_complexity=1, width=None, height=None, flip=False, cache=None,
+                      pose_pool=None, stride=1, cost=None):
+    """Landmark arrays for every frame of a video, from the cache when possible
+
+    Returns a dict with 'landmarks' (N, 33, 4), 'detected' (N,), 'timestamps' (N,),
+    'frame_size' (w, h) and 'fps'. With a pose_pool, inference borrows one of its
+    warm estimators (and uses the pool's model complexity). stride > 1 runs the
+    model on every stride-th frame only; timestamps stay on the video's clock.
+    cost (utils.session_cost.ExerciseCost) is charged the inference calls made.
+    """
+    if pose_pool is not None:
+        model_complexity = pose_pool.model_complexity
+    key = None
+    if cache is not None:
+        preprocessing = {'width': width, 'height': height, 'flip': flip}
+        if stride != 1:
+            preprocessing['stride'] = stride
+        key = make_cache_key(hash_video_file(video_path), pose_backend_name(),
+                             model_complexity, preprocessing)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+
+    entry = _run_pose(video_path, model_complexity, width, height, flip, pose_pool, stride)
+    if cost is not None:
+        cost.inferences += len(entry['detected'])
+
+    if cache is not None:
+        w, h = (int(v) for v in entry['frame_size'])
+        cache.put(key, entry['landmarks'], entry['detected'], entry['timestamps'],
+                  w, h, float(entry['fps']))
+    return entry
+
+
+def analyze_landmarks(exercise, entry, smoother=None):
+    """Feed extracted landmark arrays through an exercise using video time
+
+    smoother (e.g. utils.smoothing.LandmarkSmoother) filters each landmark
+    array on its timestamp before the exercise sees it.
+    """
+    clock = FrameClock()
+    exercise.clock = clock
+    w, h = (int(v) for v in entry['frame_size'])
+    if smoother is not None:
+        smoother.reset()
+
+    for frame_lms, ok, ts in zip(entry['landmarks'], entry['detected'], entry['timestamps']):
+        if not ok:
+            continue
+        clock.t = float(ts)
+        if smoother is not None:
+            frame_lms = smoother(frame_lms, clock.t)
+        exercise.update(landmarks_from_array(frame_lms), w, h)
+    return exercise
+
+
+def run_video(assessment, video_path, model_complexity=1, width=None, height=None, cache=None,
+              pose_pool=None, segment=False, fan_out=False):
+    """Score one recorded clip with every exercise in the assessment
+
+    segment=True treats the clip as a continuous recording of several
+    exercises: utils.segmentation splits it, the assessment's flow becomes
+    the exercises found (in order of appearance) and each gets only its own
+    stretches of the clip; assessment.segments lists them. fan_out=True
+    instead gives each frame to every exercise of the flow that could
+    plausibly be watching (utils.fan_out). With assessment.cost set, pose extraction is charged to the exercise (or to
+    'pose extraction' when several exercises share the clip).
+    """
+    cost = assessment.cost
+    bucket = None
+    if cost is not None:
+        cost.start()
+        shared = segment or fan_out or len(assessment.exercises) != 1
+        bucket = cost.switch("pose extraction" if shared else assessment.exercises[0].name)
+    entry = extract_landmarks(video_path, model_complexity, width, height, cache=cache,
+                              pose_pool=pose_pool, cost=bucket)
+    if segment:
+        _run_segments(assessment, entry, cost)
+    elif fan_out:
+        _run_fan_out(assessment, entry, cost)
+    else:
+        for exercise in assessment.exercises:
+            if cost is not None:
+                cost.switch(exercise.name).frames += len(entry['timestamps'])
+            analyze_landmarks(exercise, entry)
+    if cost is not None:
+        cost.stop()
+    if assessment.exercises:
+        assessment.current_exercise_idx = len(assessment.exercises) - 1
+        assessment.current_exercise = assessment.exercises[-1]
+    return assessment
+
+
+def _run_segments(assessment, entry, cost=None):
+    from utils.segmentation import REST, segment_entry, segment_frames
+
+    ranges = [r for r in segment_frames(segment_entry(entry), entry['timestamps']) if r[0].label != REST]
+    types = list(dict.fromkeys(segment.label for segment, _, _ in ranges))
+    assessment.setup_from_spec({'exercises': types})
+    assessment.segments = [segment for segment, _, _ in ranges]
+    exercises = dict(zip(types, assessment.exercises))
+    for segment, first, end in ranges:
+        exercise = exercises[segment.label]
+        if cost is not None:
+            cost.switch(exercise.name).frames += end - first
+        part = dict(entry)
+        for key in ('landmarks', 'detected', 'timestamps'):
+            part[key] = entry[key][first:end]
+        analyze_landmarks(exercise, part)
+
+
+def _run_fan_out(assessment, entry, cost=None):
+    from assessment_session import AssessmentSession
+    from utils.fan_out import FanOutRouter
+
+    router = FanOutRouter(AssessmentSession(assessment=assessment))
+    if cost is not None:
+        cost.switch("fan-out analysis").frames += len(entry['timestamps'])
+    w, h = (int(v) for v in entry['frame_size'])
+    for landmarks, ok, t in zip(entry['landmarks'], entry['detected'], entry['timestamps']):
+        router.push(landmarks if ok else None, float(t), w, h)
+    assessment.segments = router.segmenter.finish(float(entry['timestamps'][-1]) if len(entry['timestamps']) else 0.0)
+
+
+def load_batch_manifest(path):
+    """Read 'exercise,video_path[,target]' rows from a CSV manifest"""
+    jobs = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if not row or row[0].strip().startswith("#") or row[0].strip() == "exercise":
+                continue
+            target = int(row[2]) if len(row) > 2 and row[2].strip().isdigit() else None
+            jobs.append((row[0].strip(), row[1].strip(), target))
+    return jobs
+
+
+def run_batch(jobs, user_height_cm=170, model_complexity=1, width=None, height=None,
+              cache=None, workers=1, pose_pool=None, cost=None):
+    """Score many (exercise_type, video_path, target) jobs; returns the exercises in job order
+
+    With more than one worker, jobs share a pool of pose estimators instead of
+    building a new graph per clip. The pool grows lazily, so clips served from the
+    cache never load a model. cost (utils.session_cost.SessionCost) is charged
+    each job's thread CPU by exercise, scaled to the process CPU of the batch.
+    """
+    from assessment_flow import create_exercise
+
+    def run_job(job):
+        ex_type, video_path, target = job
+        exercise = create_exercise(ex_type, target, user_height_cm)
+        if cost is None:
+            entry = extract_landmarks(video_path, model_complexity, width, height, cache=cache,
+                                      pose_pool=pose_pool)
+            return analyze_landmarks(exercise, entry)
+        with cost.measure(exercise.name) as bucket:
+            entry = extract_landmarks(video_path, model_complexity, width, height, cache=cache,
+                                      pose_pool=pose_pool, cost=bucket)
+            bucket.frames += len(entry['timestamps'])
+            return analyze_landmarks(exercise, entry)
+
+    if pose_pool is None and workers > 1:
+        from utils.pose_pool import get_pose_pool
+        pose_pool = get_pose_pool(size=workers, model_complexity=model_complexity, prewarm=False)
+
+    if cost is not None:
+        cost.start()
+    if workers <= 1:
+        exercises = [run_job(job) for job in jobs]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            exercises = list(pool.map(run_job, jobs))
+    if cost is not None:
+        from utils.session_cost import apportion
+        cost.stop()
+        apportion([cost], *cost.process_cpu, energy_j=cost.energy_j)
+    return exercises
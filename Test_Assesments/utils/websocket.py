@@ -0,0 +1,203 @@
+"""
+WebSocket - Minimal RFC 6455 framing over asyncio streams (standard library only)
+
+Enough protocol for the landmark stream: handshake, binary/text messages,
+fragmentation, ping/pong and close. Extensions and subprotocols are not
+negotiated.
+"""
+
+import asyncio
+import base64
+import hashlib
+import os
+import struct
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+CLOSE_NORMAL = 1000
+CLOSE_PROTOCOL_ERROR = 1002
+CLOSE_POLICY_VIOLATION = 1008
+CLOSE_TOO_BIG = 1009
+
+
+class WebSocketClosed(Exception):
+    def __init__(self, code=CLOSE_NORMAL, reason=""):
+        super().__init__(f"WebSocket closed ({code}) {reason}".strip())
+        self.code = code
+        self.reason = reason
+
+
+def accept_key(key):
+    digest = hashlib.sha1((key + WS_GUID).encode("ascii")).digest()
+    return base64.b64encode(digest).decode("ascii")
+
+
+def encode_frame(opcode, payload, mask=False):
+    """One unfragmented frame; clients must mask, servers must not"""
+    n = len(payload)
+    head = bytes([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    if n < 126:
+        head += bytes([mask_bit | n])
+    elif n < 1 << 16:
+        head += bytes([mask_bit | 126]) + struct.pack("!H", n)
+    else:
+        head += bytes([mask_bit | 127]) + struct.pack("!Q", n)
+    if not mask:
+        return head + payload
+    key = os.urandom(4)
+    return head + key + _apply_mask(payload, key)
+
+
+def _apply_mask(payload, key):
+    n = len(payload)
+    if not n:
+        return b""
+    # Whole-buffer XOR through Python ints is much faster than a per-byte loop
+    stream = (key * (n // 4 + 1))[:n]
+    return (int.from_bytes(payload, "little") ^ int.from_bytes(stream, "little")).to_bytes(n, "little")
+
+
+class HeaderTooLarge(ValueError):
+    pass
+
+
+async def read_http_head(reader, limit=16384):
+    """Request/status line and lower-cased headers of an HTTP/1.1 message
+
+    Raises HeaderTooLarge past limit bytes, including heads that overrun the
+    stream's own buffer limit before the end of the head arrives.
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.LimitOverrunError:
+        raise HeaderTooLarge("HTTP header too large") from None
+    if len(head) > limit:
+        raise HeaderTooLarge("HTTP header too large")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return lines[0], headers
+
+
+def handshake_response(headers):
+    """101 response for a valid upgrade request, or None"""
+    key = headers.get("sec-websocket-key")
+    if headers.get("upgrade", "").lower() != "websocket" or not key:
+        return None
+    return ("HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept_key(key)}\r\n\r\n").encode("ascii")
+
+
+class WebSocket:
+    """Message-level connection; is_client selects masking of outgoing frames"""
+
+    def __init__(self, reader, writer, is_client=False, max_message=1 << 16):
+        self.reader = reader
+        self.writer = writer
+        self.is_client = is_client
+        self.max_message = max_message
+        self.closed = False
+
+    async def _read_frame(self):
+        b1, b2 = await self.reader.readexactly(2)
+        n = b2 & 0x7F
+        masked = b2 & 0x80
+        if n == 126:
+            n = struct.unpack("!H", await self.reader.readexactly(2))[0]
+        elif n == 127:
+            n = struct.unpack("!Q", await self.reader.readexactly(8))[0]
+        if n > self.max_message:
+            raise self._fail(CLOSE_TOO_BIG, "Message too big")
+        if bool(masked) == self.is_client:
+            # RFC 6455 5.1: clients must mask every frame, servers must not mask any
+            raise self._fail(CLOSE_PROTOCOL_ERROR, "Masked frame from server" if self.is_client
+                             else "Unmasked frame from client")
+        if masked:
+            # Mask key and payload in one read
+            data = await self.reader.readexactly(4 + n)
+            payload = _apply_mask(data[4:], data[:4])
+        else:
+            payload = await self.reader.readexactly(n) if n else b""
+        return b1 & 0x80, b1 & 0x0F, payload
+
+    async def recv(self):
+        """Next data message as (opcode, payload); answers pings, raises on close"""
+        parts = []
+        opcode = None
+        size = 0
+        while True:
+            fin, op, payload = await self._read_frame()
+            if op == OP_PING:
+                self.send(OP_PONG, payload)
+                continue
+            if op == OP_PONG:
+                continue
+            if op == OP_CLOSE:
+                code = struct.unpack("!H", payload[:2])[0] if len(payload) >= 2 else CLOSE_NORMAL
+                if not self.closed:
+                    self.close(code)
+                raise WebSocketClosed(code, payload[2:].decode("utf-8", "replace"))
+
+            if op != OP_CONTINUATION:
+                if opcode is not None:
+                    raise self._fail(CLOSE_PROTOCOL_ERROR, "Expected continuation frame")
+                opcode = op
+            elif opcode is None:
+                raise self._fail(CLOSE_PROTOCOL_ERROR, "Unexpected continuation frame")
+            if fin and not parts:
+                return opcode, payload
+            size += len(payload)
+            if size > self.max_message:
+                raise self._fail(CLOSE_TOO_BIG, "Message too big")
+            parts.append(payload)
+            if fin:
+                return opcode, b"".join(parts)
+
+    def _fail(self, code, reason):
+        """Send the close frame for a protocol failure; returns the exception to raise"""
+        self.close(code, reason)
+        return WebSocketClosed(code, reason)
+
+    def send(self, opcode, payload):
+        """Queue a message; await drain() to apply backpressure"""
+        if not self.closed:
+            self.writer.write(encode_frame(opcode, payload, mask=self.is_client))
+
+    async def drain(self):
+        await self.writer.drain()
+
+    def close(self, code=CLOSE_NORMAL, reason=""):
+        if not self.closed:
+            self.writer.write(encode_frame(OP_CLOSE, struct.pack("!H", code) + reason.encode("utf-8"),
+                                           mask=self.is_client))
+            self.closed = True
+
+
+async def connect(host, port, path="/", max_message=1 << 16):
+    """Open a client connection"""
+    reader, writer = await asyncio.open_connection(host, port)
+    key = base64.b64encode(os.urandom(16)).decode("ascii")
+    writer.write((f"GET {path} HTTP/1.1\r\n"
+                  f"Host: {host}:{port}\r\n"
+                  "Upgrade: websocket\r\n"
+                  "Connection: Upgrade\r\n"
+                  f"Sec-WebSocket-Key: {key}\r\n"
+                  "Sec-WebSocket-Version: 13\r\n\r\n").encode("ascii"))
+    status, headers = await read_http_head(reader)
+    if " 101 " not in status + " " or headers.get("sec-websocket-accept") != accept_key(key):
+        writer.close()
+        raise ConnectionError(f"WebSocket handshake failed: {status}")
+    return WebSocket(reader, writer, is_client=True, max_message=max_message)